@@ -0,0 +1,155 @@
+"""
+Vectorized analytics over the rounds in the current filter.
+
+The matching rows are loaded once into NumPy columns (score, cost, course
+code, month index); every statistic after that is an array operation, so
+the cost grows linearly with the number of rounds instead of one SQL
+aggregate per number shown.  Group-bys use a stable sort plus
+``np.add.reduceat`` / ``np.minimum.reduceat`` and ``np.bincount``.
+"""
+import numpy as np
+
+from golf_roundstore import MISSING
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class RoundColumns:
+    """Column arrays for a set of rounds; courses[course_codes[i]] is round i's course."""
+
+    def __init__(self, courses, course_codes, months, scores, costs):
+        self.courses = courses
+        self.course_codes = course_codes
+        self.months = months          # year * 12 + (month - 1), MISSING where the date is absent or irregular
+        self.scores = scores          # float64, NaN where missing
+        self.costs = costs            # float64, NaN where missing
+
+    def __len__(self):
+        return len(self.scores)
+
+
+def load_columns(conn, where_clause="", params=()):
+    """Load the rounds matching where_clause (on scores) as NumPy columns in one query."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT course, "
+        "CASE WHEN date(date) = date "
+        "THEN CAST(substr(date, 1, 4) AS INTEGER) * 12 + CAST(substr(date, 6, 2) AS INTEGER) - 1 END, "
+        "score, cost FROM scores" + where_clause,
+        params,
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        empty = np.zeros(0)
+        return RoundColumns([], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), empty, empty)
+
+    courses, months, scores, costs = zip(*rows)
+    names, codes = np.unique(np.array([c or "" for c in courses], dtype=object), return_inverse=True)
+    return RoundColumns(
+        list(names),
+        codes.astype(np.int64),
+        np.array([MISSING if m is None else m for m in months], dtype=np.int64),
+        np.array(scores, dtype=np.float64),
+        np.array(costs, dtype=np.float64),
+    )
+
+
+def summarize(cols):
+    """Count, totals, averages, spread and percentiles of score plus cost per stroke."""
+    scored = ~np.isnan(cols.scores)
+    scores = cols.scores[scored]
+    costs = cols.costs[~np.isnan(cols.costs)]
+    summary = {
+        "rounds": len(cols),
+        "total_cost": float(costs.sum()),
+        "avg_cost": float(costs.mean()) if len(costs) else 0.0,
+        "avg_score": None, "best": None, "worst": None, "std": None,
+        "cost_per_stroke": None,
+    }
+    summary.update({f"p{p}": None for p in PERCENTILES})
+    if len(scores) == 0:
+        return summary
+
+    summary["avg_score"] = float(scores.mean())
+    summary["best"] = int(scores.min())
+    summary["worst"] = int(scores.max())
+    summary["std"] = float(scores.std())
+    for p, value in zip(PERCENTILES, np.percentile(scores, PERCENTILES)):
+        summary[f"p{p}"] = float(value)
+
+    both = scored & ~np.isnan(cols.costs)
+    strokes = cols.scores[both].sum()
+    if strokes > 0:
+        summary["cost_per_stroke"] = float(cols.costs[both].sum() / strokes)
+    return summary
+
+
+def score_histogram(scores):
+    """(score values, counts) with one-stroke bins, via bincount."""
+    scores = np.asarray(scores)
+    scores = scores[~np.isnan(scores)].astype(np.int64)
+    if len(scores) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    low = scores.min()
+    counts = np.bincount(scores - low)
+    return np.arange(low, low + len(counts)), counts
+
+
+def group_by(keys, values):
+    """
+    Aggregate values per integer key.
+    Returns (unique keys, count, sum, mean, min, max); NaN values are ignored.
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    keys, values = keys[valid], values[valid]
+    if len(keys) == 0:
+        empty = np.zeros(0)
+        return keys, empty, empty, empty, empty, empty
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1))
+
+    unique = sorted_keys[starts]
+    counts = np.diff(np.append(starts, len(sorted_keys)))
+    sums = np.add.reduceat(sorted_values, starts)
+    mins = np.minimum.reduceat(sorted_values, starts)
+    maxs = np.maximum.reduceat(sorted_values, starts)
+    return unique, counts, sums, sums / counts, mins, maxs
+
+
+def course_breakdown(cols):
+    """[(course, rounds, avg score, best, avg cost)] sorted by rounds played; avg cost is None if unknown."""
+    if len(cols) == 0:
+        return []
+    codes, counts, _, means, mins, _ = group_by(cols.course_codes, cols.scores)
+    # Dense course codes make the cost totals a single bincount over the known costs
+    known = ~np.isnan(cols.costs)
+    cost_sums = np.bincount(cols.course_codes[known], weights=cols.costs[known], minlength=len(cols.courses))
+    cost_counts = np.bincount(cols.course_codes[known], minlength=len(cols.courses))
+    rows = [
+        (cols.courses[code], int(n), float(mean), int(best),
+         float(cost_sums[code] / cost_counts[code]) if cost_counts[code] else None)
+        for code, n, mean, best in zip(codes, counts, means, mins)
+    ]
+    rows.sort(key=lambda r: (-r[1], r[0]))
+    return rows
+
+
+def month_breakdown(cols):
+    """[("yyyy-mm", rounds, avg score, total cost)] in date order; rounds without a date are left out."""
+    dated = cols.months != MISSING
+    if not dated.any():
+        return []
+    months, counts, _, means, _, _ = group_by(cols.months[dated], cols.scores[dated])
+    first = cols.months[dated].min()
+    known = dated & ~np.isnan(cols.costs)
+    cost_sums = np.bincount(cols.months[known] - first, weights=cols.costs[known],
+                            minlength=cols.months[dated].max() - first + 1)
+    return [
+        (f"{m // 12:04d}-{m % 12 + 1:02d}", int(n), float(mean), float(cost_sums[m - first]))
+        for m, n, mean in zip(months, counts, means)
+    ]
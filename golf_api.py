@@ -0,0 +1,319 @@
+"""
+Local read-only JSON API over the rounds database.
+
+An asyncio HTTP/1.1 server bound to localhost, for dashboards and scripts
+that want GolfTracker data without the GUI:
+
+    GET /api/rounds?filter=2024&page=1&per_page=100
+    GET /api/stats?filter=Pebble
+    GET /api/courses?filter=2024
+    GET /api/version
+
+``filter`` means the same as in the GUI's filter box.  Queries run on a
+small pool of read-only connections in worker threads, so a slow query
+never stalls the event loop.
+
+Every response carries an ETag built from the database's data version.
+The version is checked with ``PRAGMA data_version`` on a dedicated
+connection, which changes whenever any other connection commits; while it
+is unchanged a request with a matching ``If-None-Match`` gets a bodyless
+304, and other repeats are answered from a small response cache, so
+polling costs no queries at all.
+
+Run standalone with ``python golf_api.py [--db golf_scores.db] [--port 8765]``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+from urllib.request import pathname2url
+
+from golf_analytics import load_columns, summarize, course_breakdown
+from golf_handicap import current_index
+from golf_query import FilterError, compile_filter, count_rounds, load_rounds
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+POOL_SIZE = 4
+MAX_PER_PAGE = 1000
+RESPONSE_CACHE_SIZE = 64
+MAX_HEADER_BYTES = 16384
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReadPool:
+    """A fixed set of read-only connections shared by the worker threads."""
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        uri = "file:" + pathname2url(os.path.abspath(db_path)) + "?mode=ro"
+        self.connections = queue.Queue()
+        for _ in range(size):
+            self.connections.put(sqlite3.connect(uri, uri=True, check_same_thread=False))
+
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+
+# --- Endpoints (run on worker threads; each gets a pooled connection) ---
+def _int_param(query, name, default, low, high):
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a whole number")
+    return max(low, min(high, value))
+
+
+def rounds_endpoint(conn, query):
+    filter_text = query.get("filter", [""])[0].strip()
+    page = _int_param(query, "page", 1, 1, 10 ** 9)
+    per_page = _int_param(query, "per_page", 100, 1, MAX_PER_PAGE)
+    where_clause, params = compile_filter(filter_text)
+    rows = load_rounds(conn, where_clause, params, limit=per_page, offset=(page - 1) * per_page)
+    return {
+        "filter": filter_text,
+        "page": page,
+        "per_page": per_page,
+        "total": count_rounds(conn, where_clause, params),
+        "rounds": [
+            {"id": r[0], "course": r[1], "date": r[2], "cost": r[3], "score": r[4]} for r in rows
+        ],
+    }
+
+
+def stats_endpoint(conn, query):
+    filter_text = query.get("filter", [""])[0].strip()
+    summary = summarize(load_columns(conn, *compile_filter(filter_text)))
+    summary["handicap_index"] = current_index(conn)
+    summary["filter"] = filter_text
+    return summary
+
+
+def courses_endpoint(conn, query):
+    filter_text = query.get("filter", [""])[0].strip()
+    courses = course_breakdown(load_columns(conn, *compile_filter(filter_text)))
+    return {
+        "filter": filter_text,
+        "courses": [
+            {"course": c, "rounds": n, "avg_score": avg, "best": best, "avg_cost": avg_cost}
+            for c, n, avg, best, avg_cost in courses
+        ],
+    }
+
+
+ENDPOINTS = {
+    "/api/rounds": rounds_endpoint,
+    "/api/stats": stats_endpoint,
+    "/api/courses": courses_endpoint,
+}
+
+
+class ApiServer:
+    def __init__(self, db_path, port=DEFAULT_PORT, pool_size=POOL_SIZE):
+        self.db_path = db_path
+        self.port = port
+        self.pool = ReadPool(db_path, pool_size)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="golf-api")
+        # data_version only moves when *another* connection commits, which is every writer here
+        self.version_conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.data_version = None
+        self.generation = 0
+        self.instance = uuid.uuid4().hex[:8]   # ETags from an earlier run never match
+        self.cache = OrderedDict()
+        self.server = None
+        self.writers = set()   # open client connections
+
+    def current_generation(self):
+        version = self.version_conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.data_version:
+            self.data_version = version
+            self.generation += 1
+            self.cache.clear()
+        return self.generation
+
+    def etag(self, generation, target):
+        return f'W/"{self.instance}-{generation}-{zlib.crc32(target.encode()):08x}"'
+
+    async def respond(self, method, target, headers):
+        """(status, extra headers, body) for one request."""
+        if method not in ("GET", "HEAD"):
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Only GET and HEAD are supported")
+        url = urlsplit(target)
+        generation = self.current_generation()
+
+        if url.path == "/api/version":
+            body = json.dumps({"generation": generation, "instance": self.instance}).encode()
+            return HTTPStatus.OK, {}, body
+
+        endpoint = ENDPOINTS.get(url.path.rstrip("/"))
+        if endpoint is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No such endpoint: {url.path}")
+
+        etag = self.etag(generation, target)
+        if etag in (t.strip() for t in headers.get("if-none-match", "").split(",")):
+            return HTTPStatus.NOT_MODIFIED, {"ETag": etag}, b""
+
+        body = self.cache.get(target)
+        if body is None:
+            query = parse_qs(url.query)
+
+            def run():
+                with self.pool.connection() as conn:
+                    return endpoint(conn, query)
+
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, run)
+            body = json.dumps(result).encode()
+            # Only cache if nothing was committed while the query ran
+            if self.current_generation() == generation:
+                self.cache[target] = body
+                if len(self.cache) > RESPONSE_CACHE_SIZE:
+                    self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(target)
+        return HTTPStatus.OK, {"ETag": etag}, body
+
+    async def handle(self, reader, writer):
+        self.writers.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    status, extra, body = await self.respond(method, target, headers)
+                except ApiError as e:
+                    status, extra, body = e.status, {}, json.dumps({"error": str(e)}).encode()
+                except FilterError as e:
+                    status, extra = HTTPStatus.BAD_REQUEST, {}
+                    body = json.dumps({"error": str(e)}).encode()
+                except Exception as e:
+                    status, extra = HTTPStatus.INTERNAL_SERVER_ERROR, {}
+                    body = json.dumps({"error": str(e)}).encode()
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                response = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(body)}",
+                    "Cache-Control: no-cache",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ] + [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, HOST, self.port, limit=MAX_HEADER_BYTES)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def shutdown(self):
+        """Stop listening and hang up on idle keep-alive clients."""
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        current = asyncio.current_task()
+        await asyncio.gather(*(t for t in asyncio.all_tasks() if t is not current), return_exceptions=True)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+        self.version_conn.close()
+
+
+class ApiServerThread:
+    """Runs an ApiServer on its own event loop thread, for the GUI."""
+
+    def __init__(self, db_path, port=DEFAULT_PORT):
+        self.api = ApiServer(db_path, port)
+        self.loop = asyncio.new_event_loop()
+        self.started = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="golf-api-loop", daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.api.start())
+            self.started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.api.shutdown())
+        except OSError as e:   # e.g. the port is in use
+            self.error = e
+            self.started.set()
+        finally:
+            self.loop.close()
+            self.api.close()
+
+    def start(self):
+        """Start serving; raises OSError if the server could not listen."""
+        self.thread.start()
+        self.started.wait()
+        if self.error is not None:
+            self.thread.join()
+            raise self.error
+
+    def stop(self):
+        if self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Golf Tracker data as JSON on localhost.")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    api = ApiServer(args.db, args.port)
+    print(f"Serving {args.db} on http://{HOST}:{args.port}/api/")
+    try:
+        asyncio.run(api.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
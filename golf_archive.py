@@ -0,0 +1,307 @@
+"""
+Year-partitioned archives of closed seasons.
+
+Rounds of a finished season can be moved out of golf_scores.db into their
+own database file, archive/scores_<year>.db next to it, so the hot
+database only holds the seasons still being played:
+
+    archive_seasons("golf_scores.db", before_year=2024)   # 2023 and older
+
+Each archive is written once, indexed, ANALYZEd and VACUUMed, and is only
+ever attached read-only afterwards.  The ``archives`` table in the hot
+database lists them.  Handicap history stays in the hot database, so the
+index and its history are unchanged by archiving, and so do the archived
+rounds' import fingerprints (``archived_fingerprints``), so importing an
+old export again does not bring archived rounds back as new ones.
+
+Reads go through a PartitionedReader: a separate connection on which a
+temp view named ``scores`` (and ``scorecards``) shadows the hot table
+with a UNION ALL of it and the archives a filter's date range overlaps.
+Archives are attached on demand, so a year filter reads the hot database
+and that year's file only, and unfiltered reads attach every archive the
+connection's attach limit allows.  Without archives the reader's queries
+run on the hot table directly.
+"""
+import argparse
+import os
+import sqlite3
+from datetime import date
+from urllib.request import pathname2url
+
+from golf_attachments import install_attachments
+from golf_dedupe import FINGERPRINT_EXPR, install_fingerprint
+from golf_handicap import HandicapEngine
+from golf_query import INDEXES, date_range
+
+ARCHIVE_DIR = "archive"
+
+# Catalog of archived seasons, in the hot database
+_CATALOG = """
+    CREATE TABLE IF NOT EXISTS archives (
+        year INTEGER PRIMARY KEY,
+        file TEXT NOT NULL,
+        rounds INTEGER NOT NULL
+    )
+"""
+
+# Only rounds with a proper yyyy-mm-dd date are archived; anything else stays hot
+_DATED = "date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+
+_FINGERPRINT = FINGERPRINT_EXPR.format(course="course", date="date", cost="cost", score="score")
+
+
+def install_catalog(conn):
+    conn.execute(_CATALOG)
+    install_fingerprint(conn)
+    # Seasons archived before their fingerprints were kept get them from their archive, once
+    for year, path in archived_years(conn).items():
+        if conn.execute("SELECT 1 FROM archived_fingerprints WHERE year = ? LIMIT 1", (year,)).fetchone():
+            continue
+        if not os.path.exists(path):
+            continue
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS archive", (path,))
+        try:
+            conn.execute(
+                f"INSERT OR IGNORE INTO archived_fingerprints (fingerprint, year) "
+                f"SELECT {_FINGERPRINT}, ? FROM archive.scores",
+                (year,),
+            )
+            conn.commit()
+        finally:
+            conn.execute("DETACH DATABASE archive")
+
+
+def archive_file(db_path, year):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIR, f"scores_{year}.db")
+
+
+def archived_years(conn):
+    """{year: archive file path} from the catalog (empty for a database never archived)."""
+    exists = conn.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'archives'").fetchone()
+    if not exists:
+        return {}
+    folder = os.path.dirname(os.path.abspath(conn.execute("PRAGMA main.database_list").fetchone()[2]))
+    return {year: os.path.join(folder, file) for year, file in conn.execute("SELECT year, file FROM archives")}
+
+
+# --- Archiving ---
+def _season(year):
+    return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+
+
+def _write_archive(conn, path, year):
+    """Copy a season's rounds and scorecards into its archive file (created or added to)."""
+    start, end = _season(year)
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS archive.scores ("
+            "id INTEGER PRIMARY KEY, course TEXT, date TEXT, cost INTEGER, score INTEGER)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS archive.scorecards (round_id INTEGER PRIMARY KEY, holes BLOB NOT NULL)")
+        conn.execute(
+            "INSERT OR REPLACE INTO archive.scores (id, course, date, cost, score) "
+            f"SELECT id, course, date, cost, score FROM main.scores WHERE date >= ? AND date < ? AND {_DATED}",
+            (start, end),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO archive.scorecards (round_id, holes) "
+            "SELECT c.round_id, c.holes FROM main.scorecards c JOIN main.scores s ON s.id = c.round_id "
+            f"WHERE s.date >= ? AND s.date < ? AND s.{_DATED}",
+            (start, end),
+        )
+        conn.commit()
+        return conn.execute("SELECT COUNT(*) FROM archive.scores").fetchone()[0]
+    finally:
+        conn.rollback()   # DETACH fails inside a transaction, hiding whatever went wrong
+        conn.execute("DETACH DATABASE archive")
+
+
+def _compact(path):
+    """Index, analyze and vacuum a finished archive, once; it is read-only from then on."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_date ON scores (date, id)")
+        for sql in INDEXES:
+            conn.execute(sql)
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def _remove_from_hot(conn, year, path, rounds):
+    """Delete an archived season from the hot database, keeping its handicap history, attachments and fingerprints."""
+    start, end = _season(year)
+    where = f"WHERE date >= ? AND date < ? AND {_DATED}"
+    # Deleting rounds drops their history (handicap_cleanup trigger); put it back afterwards
+    conn.execute(
+        "CREATE TEMP TABLE archived_history AS SELECT * FROM handicap_history "
+        f"WHERE round_id IN (SELECT id FROM main.scores {where})",
+        (start, end),
+    )
+    # Attachments stay in the hot database too (their files are shared, see golf_attachments)
+    conn.execute(
+        "CREATE TEMP TABLE archived_attachments AS SELECT * FROM attachments "
+        f"WHERE round_id IN (SELECT id FROM main.scores {where})",
+        (start, end),
+    )
+    # So are their fingerprints, for the duplicate check on import (see golf_dedupe)
+    conn.execute(
+        f"INSERT OR IGNORE INTO archived_fingerprints (fingerprint, year) SELECT {_FINGERPRINT}, ? "
+        f"FROM main.scores {where}",
+        (year, start, end),
+    )
+    conn.execute(f"DELETE FROM main.scores {where}", (start, end))
+    conn.execute("INSERT OR REPLACE INTO handicap_history SELECT * FROM temp.archived_history")
+    conn.execute("DROP TABLE temp.archived_history")
+    conn.execute("INSERT OR REPLACE INTO attachments SELECT * FROM temp.archived_attachments")
+    conn.execute("DROP TABLE temp.archived_attachments")
+    conn.execute(
+        "INSERT OR REPLACE INTO archives (year, file, rounds) VALUES (?, ?, ?)",
+        (year, os.path.join(ARCHIVE_DIR, os.path.basename(path)), rounds),
+    )
+
+
+def archivable_years(conn, before_year):
+    cursor = conn.execute(
+        f"SELECT DISTINCT CAST(substr(date, 1, 4) AS INTEGER) FROM main.scores WHERE date < ? AND {_DATED} ORDER BY 1",
+        (f"{before_year:04d}-01-01",),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def archive_seasons(db_path, before_year, progress=None):
+    """
+    Move every season before before_year (which may not be later than the
+    current year) into its archive file, then VACUUM the hot database.
+    Returns [(year, rounds moved)].  progress(done, total) is called per season.
+    """
+    if before_year > date.today().year:
+        raise ValueError(f"Only closed seasons can be archived; {date.today().year} is still being played.")
+    conn = sqlite3.connect(db_path, timeout=30)
+    moved = []
+    try:
+        install_catalog(conn)
+        install_attachments(conn)
+        # Tables the GUI creates, missing from a database it has never opened; the history
+        # must exist before archiving, as it is kept in the hot database for archived rounds
+        conn.execute("CREATE TABLE IF NOT EXISTS scorecards (round_id INTEGER PRIMARY KEY, holes BLOB NOT NULL)")
+        handicap = HandicapEngine(conn)
+        if handicap.needs_backfill():
+            handicap.backfill()
+        conn.commit()
+        years = archivable_years(conn, before_year)
+        for done, year in enumerate(years, 1):
+            path = archive_file(db_path, year)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            start, end = _season(year)
+            expected = conn.execute(
+                f"SELECT COUNT(*) FROM main.scores WHERE date >= ? AND date < ? AND {_DATED}", (start, end)
+            ).fetchone()[0]
+            new_file = not os.path.exists(path)
+            try:
+                total = _write_archive(conn, path, year)
+                _compact(path)
+                # The hot copy is only deleted once the archive holds every round of the season
+                verify = sqlite3.connect(path)
+                try:
+                    ok = verify.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+                    archived = verify.execute(
+                        "SELECT COUNT(*) FROM scores WHERE date >= ? AND date < ?", (start, end)
+                    ).fetchone()[0]
+                finally:
+                    verify.close()
+                if not ok or archived < expected:
+                    raise RuntimeError(f"Archive {path} failed verification; {year} was left in place.")
+            except BaseException:
+                # Leave no half-written archive behind (an existing one is only ever added to)
+                if new_file and os.path.exists(path):
+                    os.remove(path)
+                raise
+            _remove_from_hot(conn, year, path, total)
+            conn.commit()
+            moved.append((year, expected))
+            if progress:
+                progress(done, len(years))
+        if moved:
+            conn.execute("VACUUM")
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return moved
+
+
+# --- Reading ---
+class PartitionedReader:
+    """
+    A read connection whose ``scores`` and ``scorecards`` cover the hot
+    database plus the archives a date range needs.  Use only for reading.
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, uri=True)   # uri: archives are attached with mode=ro
+        self.attached = {}     # year -> schema name
+        self.omitted = 0       # archives left out of the last selection (attach limit)
+        try:
+            self.attach_limit = self.conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        except AttributeError:   # Python < 3.11
+            self.attach_limit = 10
+
+    def select(self, start=None, end=None):
+        """Make the views cover rounds dated in [start, end) (None = unbounded)."""
+        archives = archived_years(self.conn)
+        wanted = sorted(
+            year for year in archives
+            if (end is None or _season(year)[0] < end) and (start is None or _season(year)[1] > start)
+        )
+        # Too many to attach at once: the most recent seasons win
+        self.omitted = max(0, len(wanted) - self.attach_limit)
+        wanted = wanted[self.omitted:]
+        if wanted == sorted(self.attached):
+            return
+
+        for year in [y for y in self.attached if y not in wanted]:
+            self.conn.execute(f"DETACH DATABASE {self.attached.pop(year)}")
+        for year in wanted:
+            if year not in self.attached:
+                uri = "file:" + pathname2url(archives[year]) + "?mode=ro"
+                self.conn.execute(f"ATTACH DATABASE ? AS archive_{year}", (uri,))
+                self.attached[year] = f"archive_{year}"
+
+        self.conn.execute("DROP VIEW IF EXISTS temp.scores")
+        self.conn.execute("DROP VIEW IF EXISTS temp.scorecards")
+        if self.attached:
+            schemas = ["main"] + [self.attached[y] for y in sorted(self.attached)]
+            self.conn.execute("CREATE TEMP VIEW scores AS " + " UNION ALL ".join(
+                f"SELECT id, course, date, cost, score FROM {schema}.scores" for schema in schemas
+            ))
+            self.conn.execute("CREATE TEMP VIEW scorecards AS " + " UNION ALL ".join(
+                f"SELECT round_id, holes FROM {schema}.scorecards" for schema in schemas
+            ))
+
+    def select_for(self, filter_text):
+        self.select(*date_range(filter_text))
+
+    def is_archived(self, round_id):
+        return any(
+            self.conn.execute(f"SELECT 1 FROM {schema}.scores WHERE id = ?", (round_id,)).fetchone()
+            for schema in self.attached.values()
+        )
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move closed seasons into per-year archive databases.")
+    parser.add_argument("before_year", type=int, help="archive every season before this year")
+    parser.add_argument("--db", default="golf_scores.db")
+    args = parser.parse_args()
+
+    for year, rounds in archive_seasons(args.db, args.before_year):
+        print(f"{year}: {rounds} round(s) -> {archive_file(args.db, year)}")
@@ -0,0 +1,283 @@
+"""
+Scorecard photos and other files attached to rounds.
+
+Files are stored out of line, under attachments/objects/ next to the
+database, named by the SHA-256 of their content; SQLite only holds
+(round_id, sha256, name) in ``attachments``.  The same photo attached
+twice, or to two rounds, is stored once, and a file is never rewritten
+once stored:
+
+    sha = attach(conn, "golf_scores.db", round_id, "card.jpg")
+    conn.commit()
+    attachments_for(conn, round_id)             # [(sha, "card.jpg")]
+
+Deleting a round drops its rows (attachments_cleanup trigger) but not the
+files, so an undo brings the photos back; ``collect_garbage`` removes
+files nothing refers to any more.
+
+ThumbnailCache scales photos down on a small thread pool into
+attachments/thumbs/, and keeps that folder under a size budget by
+evicting the least recently used thumbnails.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ATTACHMENT_DIR = "attachments"
+OBJECT_DIR = "objects"
+THUMB_DIR = "thumbs"
+THUMB_SIZE = 128            # pixels, longest side
+THUMB_WORKERS = 2
+DEFAULT_CACHE_MB = 64
+_READ_CHUNK = 1024 * 1024
+# Files still being written carry this suffix until they are renamed into place
+PARTIAL_SUFFIX = ".partial"
+
+
+def attachment_dir(db_path):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), ATTACHMENT_DIR)
+
+
+def object_path(db_path, sha):
+    return os.path.join(attachment_dir(db_path), OBJECT_DIR, sha[:2], sha)
+
+
+def install_attachments(conn):
+    """Create the attachments table and the trigger dropping a deleted round's rows."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS attachments (
+            id INTEGER PRIMARY KEY,
+            round_id INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            name TEXT,
+            added TEXT NOT NULL,
+            UNIQUE (round_id, sha256)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attachments_sha ON attachments (sha256)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS attachments_cleanup
+        AFTER DELETE ON scores
+        BEGIN
+            DELETE FROM attachments WHERE round_id = OLD.id;
+        END
+    """)
+
+
+# --- Content store ---
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_file(db_path, source):
+    """Copy a file into the content store (once); returns its SHA-256."""
+    sha = hash_file(source)
+    target = object_path(db_path, sha)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Copy under a temporary name and rename, so a stored object is always complete
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(target), suffix=PARTIAL_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as out, open(source, "rb") as f:
+                shutil.copyfileobj(f, out, _READ_CHUNK)
+            os.replace(partial, target)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+    return sha
+
+
+def attach(conn, db_path, round_id, source):
+    """Store a file and attach it to a round; returns its SHA-256.  Callers commit."""
+    sha = store_file(db_path, source)
+    conn.execute(
+        "INSERT OR IGNORE INTO attachments (round_id, sha256, name, added) VALUES (?, ?, ?, ?)",
+        (round_id, sha, os.path.basename(source), datetime.now().isoformat(timespec="seconds")),
+    )
+    return sha
+
+
+def detach(conn, round_id, sha):
+    """Remove an attachment from a round (the file stays until collect_garbage).  Callers commit."""
+    conn.execute("DELETE FROM attachments WHERE round_id = ? AND sha256 = ?", (round_id, sha))
+
+
+def attachments_for(conn, round_id):
+    """[(sha256, name)] of a round, in the order attached."""
+    return conn.execute(
+        "SELECT sha256, name FROM attachments WHERE round_id = ? ORDER BY id", (round_id,)
+    ).fetchall()
+
+
+def rounds_with_attachments(conn):
+    """{round_id: sha256 of its first attachment}."""
+    return dict(conn.execute(
+        "SELECT round_id, sha256 FROM attachments a "
+        "WHERE id = (SELECT MIN(id) FROM attachments WHERE round_id = a.round_id)"
+    ).fetchall())
+
+
+def referenced(conn):
+    """Every SHA-256 still wanted: attached now, or kept for an undo of deleted rounds."""
+    shas = {row[0] for row in conn.execute("SELECT DISTINCT sha256 FROM attachments")}
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'undo_attachments'").fetchone():
+        shas.update(row[0] for row in conn.execute("SELECT DISTINCT sha256 FROM undo_attachments"))
+    return shas
+
+
+def collect_garbage(conn, db_path):
+    """Delete stored files (and their thumbnails) nothing refers to; returns (files, bytes) freed."""
+    keep = referenced(conn)
+    root = attachment_dir(db_path)
+    files = freed = 0
+    for folder, _dirs, names in os.walk(os.path.join(root, OBJECT_DIR)):
+        for name in names:
+            if name in keep or name.endswith(PARTIAL_SUFFIX):   # partial: store_file is still copying it
+                continue
+            path = os.path.join(folder, name)
+            freed += os.path.getsize(path)
+            os.remove(path)
+            files += 1
+    thumbs = os.path.join(root, THUMB_DIR)
+    if os.path.isdir(thumbs):
+        for name in os.listdir(thumbs):
+            if name.split("-", 1)[0] not in keep and not name.endswith(PARTIAL_SUFFIX):
+                os.remove(os.path.join(thumbs, name))
+    return files, freed
+
+
+# --- Thumbnails ---
+class ThumbnailCache:
+    """
+    Thumbnails of stored photos, made on demand by a thread pool.
+    ``get`` answers from disk only; ``request`` queues a missing thumbnail
+    and on_ready(sha, path or None if it could not be made) is called from
+    a worker thread once it is done.  Only files that are not images are
+    given up on; other failures are retried on the next request.
+    """
+
+    def __init__(self, db_path, size=THUMB_SIZE, max_mb=DEFAULT_CACHE_MB, workers=THUMB_WORKERS, on_ready=None):
+        self.db_path = db_path
+        self.size = size
+        self.max_bytes = max_mb * 1024 * 1024
+        self.on_ready = on_ready
+        self.folder = os.path.join(attachment_dir(db_path), THUMB_DIR)
+        os.makedirs(self.folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._failed = set()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="thumbnails")
+        # Least recently used first; a thumbnail's mtime is bumped whenever it is used
+        self._lru = OrderedDict()
+        self.total = 0
+        suffix = f"-{size}.png"
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith(suffix):
+                st = os.stat(os.path.join(self.folder, name))
+                entries.append((st.st_mtime, name[:-len(suffix)], st.st_size))
+        for _mtime, sha, nbytes in sorted(entries):
+            self._lru[sha] = nbytes
+            self.total += nbytes
+
+    def path(self, sha):
+        return os.path.join(self.folder, f"{sha}-{self.size}.png")
+
+    def get(self, sha):
+        """The thumbnail's path if it has been made, else None."""
+        with self._lock:
+            if sha not in self._lru:
+                return None
+            self._lru.move_to_end(sha)
+        path = self.path(sha)
+        try:
+            os.utime(path)
+        except OSError:         # evicted or removed meanwhile
+            return None
+        return path
+
+    def request(self, sha):
+        with self._lock:
+            if sha in self._lru or sha in self._pending or sha in self._failed:
+                return
+            self._pending.add(sha)
+        self._pool.submit(self._make, sha)
+
+    def _make(self, sha):
+        # Qt only here: the archive and sync tools use this module's tables without a GUI
+        from PyQt5.QtCore import Qt
+        from PyQt5.QtGui import QImage
+
+        path = None
+        unreadable = False
+        try:
+            source = object_path(self.db_path, sha)
+            image = QImage(source)
+            # A stored file never changes, so one that is not an image is not tried again
+            unreadable = image.isNull() and os.path.exists(source)
+            if not unreadable:
+                thumb = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                partial = self.path(sha) + PARTIAL_SUFFIX
+                if thumb.save(partial, "PNG"):
+                    os.replace(partial, self.path(sha))
+                    path = self.path(sha)
+                    self._added(sha, os.path.getsize(path))
+        except Exception:
+            path = None                     # e.g. a full disk; a later request tries again
+        finally:
+            with self._lock:
+                self._pending.discard(sha)
+                if unreadable:
+                    self._failed.add(sha)
+        if self.on_ready is not None:
+            self.on_ready(sha, path)
+
+    def _added(self, sha, nbytes):
+        with self._lock:
+            self.total += nbytes - self._lru.pop(sha, 0)
+            self._lru[sha] = nbytes
+            # Evict from the cold end; the newest thumbnail always stays
+            while self.total > self.max_bytes and len(self._lru) > 1:
+                old, old_bytes = self._lru.popitem(last=False)
+                self.total -= old_bytes
+                try:
+                    os.remove(self.path(old))
+                except OSError:
+                    pass
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attach files to rounds, or clean up the attachment store.")
+    parser.add_argument("files", nargs="*", help="files to attach to --round")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--round", type=int, help="round id to attach to (or list, without files)")
+    parser.add_argument("--gc", action="store_true", help="delete stored files nothing refers to")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    install_attachments(conn)
+    if args.round is not None:
+        for path in args.files:
+            print(f"{attach(conn, args.db, args.round, path)}  {path}")
+        conn.commit()
+        for sha, name in attachments_for(conn, args.round):
+            print(f"round {args.round}: {name}  {object_path(args.db, sha)}")
+    if args.gc:
+        files, freed = collect_garbage(conn, args.db)
+        print(f"Removed {files} unreferenced file(s), {freed / 1024 / 1024:.1f} MB")
+    conn.close()
@@ -0,0 +1,174 @@
+"""
+Online backups (snapshots) of the scores database.
+
+A snapshot is a page-level copy made with SQLite's online backup API
+(``Connection.backup``), a few hundred pages per step with a short pause
+between steps.  Each step holds only a brief read lock, so the GUI and
+the write-behind thread keep committing while a backup runs; if another
+connection writes mid-copy SQLite restarts the copy from a consistent
+point by itself.
+
+Snapshots are written to a temporary name, checked with ``PRAGMA
+quick_check`` and only then renamed into backups/ as
+golf_scores_<yyyymmdd-hhmmss>.db; the oldest are removed beyond the
+retention count (a second snapshot within the same second gets _2, ...):
+
+    path = create_snapshot("golf_scores.db", keep=10)
+    restore_snapshot(path, "golf_scores.db")
+
+Archive files (see golf_archive) are written once and never change, so
+they are not part of a snapshot.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from golf_changes import mark_replaced
+
+BACKUP_DIR = "backups"
+SNAPSHOT_PREFIX = "golf_scores_"
+SNAPSHOT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+DEFAULT_KEEP = 10
+PAGES_PER_STEP = 256
+STEP_PAUSE = 0.002      # seconds between steps, to let writers in
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def backup_dir(db_path):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), BACKUP_DIR)
+
+
+def list_snapshots(db_path):
+    """[(path, taken at, size in bytes)], newest first."""
+    folder = backup_dir(db_path)
+    found = []
+    if os.path.isdir(folder):
+        for name in os.listdir(folder):
+            if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(".db")):
+                continue
+            stamp, _, count = name[len(SNAPSHOT_PREFIX):-3].partition("_")
+            try:
+                taken = datetime.strptime(stamp, SNAPSHOT_TIME_FORMAT)
+                count = int(count or 1)
+            except ValueError:
+                continue
+            path = os.path.join(folder, name)
+            found.append((taken, count, path, os.path.getsize(path)))
+    found.sort(reverse=True)
+    return [(path, taken, size) for taken, _count, path, size in found]
+
+
+def quick_check(path):
+    """None if the database file passes PRAGMA quick_check, else the first problem."""
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        return str(e)
+    finally:
+        conn.close()
+    return None if result == "ok" else result
+
+
+def _copy(source, target, progress, pause):
+    def step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+        if pause:
+            time.sleep(pause)
+
+    source.backup(target, pages=PAGES_PER_STEP, progress=step)
+
+
+def prune_snapshots(db_path, keep=DEFAULT_KEEP):
+    """Delete all but the newest keep snapshots; returns the paths removed."""
+    removed = []
+    for path, _taken, _size in list_snapshots(db_path)[keep:]:
+        os.remove(path)
+        removed.append(path)
+    return removed
+
+
+def create_snapshot(db_path, keep=DEFAULT_KEEP, progress=None, pause=STEP_PAUSE):
+    """
+    Back db_path up into a new verified snapshot, then apply retention.
+    Returns the snapshot path.  progress(pages done, total pages) is called per step.
+    """
+    folder = backup_dir(db_path)
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime(SNAPSHOT_TIME_FORMAT)
+    path = os.path.join(folder, SNAPSHOT_PREFIX + stamp + ".db")
+    count = 1
+    # A second snapshot within the same second (restore takes one first) gets _2, _3, ...
+    while os.path.exists(path):
+        count += 1
+        path = os.path.join(folder, f"{SNAPSHOT_PREFIX}{stamp}_{count}.db")
+    partial = path + ".partial"
+
+    source = sqlite3.connect(db_path, timeout=30)
+    target = sqlite3.connect(partial)
+    try:
+        _copy(source, target, progress, pause)
+    finally:
+        target.close()
+        source.close()
+
+    problem = quick_check(partial)
+    if problem is not None:
+        os.remove(partial)
+        raise SnapshotError(f"The new snapshot failed its integrity check: {problem}")
+    os.replace(partial, path)
+    prune_snapshots(db_path, keep)
+    return path
+
+
+def restore_snapshot(snapshot_path, db_path, progress=None):
+    """
+    Copy a snapshot back over db_path (after checking it), in place, so open
+    connections see the restored data.  The current database is snapshotted
+    first; returns that safety snapshot's path.  The change log is restarted
+    past its pre-restore end, so other running instances reload everything.
+    """
+    problem = quick_check(snapshot_path)
+    if problem is not None:
+        raise SnapshotError(f"{os.path.basename(snapshot_path)} failed its integrity check: {problem}")
+    # Retention never drops the snapshot being restored: keep one more than there are
+    safety = create_snapshot(db_path, keep=len(list_snapshots(db_path)) + 1, pause=0)
+
+    source = sqlite3.connect(snapshot_path)
+    target = sqlite3.connect(db_path, timeout=30)
+    try:
+        last_id = 0
+        if target.execute("SELECT 1 FROM sqlite_master WHERE name = 'change_log'").fetchone():
+            last_id = target.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence "
+                                     "WHERE name = 'change_log'").fetchone()[0]
+        _copy(source, target, progress, 0)
+        mark_replaced(target, last_id)
+        target.commit()
+    finally:
+        target.close()
+        source.close()
+    return safety
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot or restore the Golf Tracker database.")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="snapshots to keep")
+    parser.add_argument("--list", action="store_true", help="list snapshots")
+    parser.add_argument("--restore", metavar="SNAPSHOT", help="restore this snapshot over --db")
+    args = parser.parse_args()
+
+    if args.list:
+        for path, taken, size in list_snapshots(args.db):
+            print(f"{taken:%Y-%m-%d %H:%M:%S}  {size / 1024 / 1024:8.1f} MB  {path}")
+    elif args.restore:
+        safety = restore_snapshot(args.restore, args.db)
+        print(f"Restored {args.restore}; the previous database was saved as {safety}")
+    else:
+        print(f"Wrote {create_snapshot(args.db, args.keep)}")
@@ -0,0 +1,128 @@
+"""
+Cross-process change detection for a shared golf_scores.db.
+
+Triggers append one row per insert/update/delete of a round to
+``change_log``.  Each app instance remembers the last change id it has
+applied and, when another connection has committed (``PRAGMA
+data_version`` moved), pulls only the newer entries.  Commits made through
+our own connection do not move data_version, so while nobody else writes
+the tracker just fast-forwards past its own entries.
+"""
+
+# Entries kept when pruning; instances further behind than this do a full reload
+CHANGE_LOG_KEEP = 50000
+
+
+def install_change_log(conn):
+    """Create change_log and the triggers that fill it (idempotent)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            round_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    """)
+    for event, op, ref in (("INSERT", "I", "NEW"), ("UPDATE", "U", "NEW"), ("DELETE", "D", "OLD")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS scores_log_{event.lower()}
+            AFTER {event} ON scores
+            BEGIN
+                INSERT INTO change_log (round_id, op) VALUES ({ref}.id, '{op}');
+            END
+        """)
+    # Scorecard edits change a round's stats without touching its scores row
+    for event, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS scorecards_log_{event.lower()}
+            AFTER {event} ON scorecards
+            BEGIN
+                INSERT INTO change_log (round_id, op) VALUES ({ref}.round_id, 'U');
+            END
+        """)
+
+
+def mark_replaced(conn, last_id):
+    """
+    Restart the log after the whole database was replaced (say, restored from a
+    backup): its entries no longer describe the data, and the ids may have gone
+    back below what trackers have seen.  The log is emptied and continues past
+    last_id with a gap, so every tracker's next poll returns FULL_RELOAD.
+    Caller commits.
+    """
+    install_change_log(conn)
+    conn.execute("DELETE FROM change_log")
+    conn.execute("INSERT INTO change_log (id, round_id, op) VALUES (?, 0, 'R')", (last_id + 2,))
+
+
+class ChangeSet:
+    """Rounds changed since the last poll, collapsed to the latest operation per round."""
+
+    def __init__(self, changed=(), deleted=()):
+        self.changed = set(changed)
+        self.deleted = set(deleted)
+
+    def __bool__(self):
+        return bool(self.changed or self.deleted)
+
+    def __len__(self):
+        return len(self.changed) + len(self.deleted)
+
+
+class ChangeTracker:
+    """Remembers the last applied change id for one connection."""
+
+    # Returned by poll() when the log no longer covers our position
+    FULL_RELOAD = "full_reload"
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_id = self.max_change_id()
+        self.last_version = self.data_version()
+
+    def data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def max_change_id(self):
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM change_log").fetchone()[0]
+
+    def poll(self):
+        """
+        ChangeSet of rounds touched by other writers since the last poll
+        (empty if none), or FULL_RELOAD if we fell behind the pruned log.
+        """
+        # Read the log position before data_version: if the version is unchanged,
+        # nobody else committed before max_id was read, so every entry up to it is ours.
+        max_id = self.max_change_id()
+        version = self.data_version()
+        if version == self.last_version:
+            self.last_id = max_id
+            return ChangeSet()
+        self.last_version = version
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MIN(id) FROM change_log")
+        min_id = cursor.fetchone()[0]
+        # A log that starts past us was pruned or restarted (mark_replaced); one that
+        # ends before us was rolled back, e.g. by restoring a database written before it
+        if (min_id is not None and min_id > self.last_id + 1) or max_id < self.last_id:
+            self.last_id = self.max_change_id()
+            return self.FULL_RELOAD
+
+        changes = ChangeSet()
+        cursor.execute("SELECT id, round_id, op FROM change_log WHERE id > ? ORDER BY id", (self.last_id,))
+        for change_id, round_id, op in cursor:
+            if op == "D":
+                changes.deleted.add(round_id)
+                changes.changed.discard(round_id)
+            else:
+                changes.changed.add(round_id)
+                changes.deleted.discard(round_id)
+            self.last_id = change_id
+        return changes
+
+    def prune(self, keep=CHANGE_LOG_KEEP):
+        """Drop all but the newest `keep` entries (caller commits)."""
+        self.conn.execute(
+            "DELETE FROM change_log WHERE id <= (SELECT MAX(id) FROM change_log) - ?", (keep,)
+        )
@@ -0,0 +1,451 @@
+"""
+Chart data and drawing, independent of Qt.
+
+Every chart is produced in two steps:
+
+    data = chart_data(conn, chart_type, filter_text, options)   # SQL + NumPy
+    draw_chart(ax, chart_type, data, options)                   # matplotlib only
+
+The on-screen Charts tab, the batch renderer and the PDF report all use
+the same two functions.  ``data`` is small, picklable and already reduced
+(e.g. LTTB-downsampled), so it can be hashed to skip unchanged charts and
+shipped to worker processes for drawing.
+"""
+import calendar
+from datetime import datetime
+
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.ticker import MaxNLocator
+
+from golf_scorecard import HOLES, DISTRIBUTION_LABELS, load_scorecards, scorecard_stats
+from golf_handicap import handicap_history
+from golf_timeseries import UNIX_EPOCH_JULIAN, rolling_mean, lttb
+from golf_analytics import load_columns, summarize, score_histogram
+from golf_query import compile_filter
+from golf_roundstore import MISSING
+
+# Chart colors ("outside", "inside"); the original defaults were ("#d6dbdf", "#d6dbdf")
+CHART_FIG_BG = "#c3c7c7"
+CHART_AX_BG = "#dbe2e9"
+
+# Most points the trend chart draws per series, whatever the number of rounds
+TREND_MAX_POINTS = 2000
+# Above this many rounds the cost/score chart is drawn as a density (hexbin) instead of points
+SCATTER_MAX_POINTS = 20000
+SCATTER_GRIDSIZE = 60
+
+# chart type -> (button label, highlight color), in Charts tab order
+CHART_TYPES = {
+    "average_score": ("Average Score", "#4CAF50"),
+    "rounds_per_course": ("Rounds per Course", "#2196F3"),
+    "best_score": ("Best Score", "#FF9800"),
+    "hole_average": ("Hole Averages", "#9C27B0"),
+    "scoring_distribution": ("Scoring", "#00BCD4"),
+    "par_splits": ("Par 3/4/5", "#795548"),
+    "handicap": ("Handicap", "#3F51B5"),
+    "trend": ("Trend", "#E91E63"),
+    "distribution": ("Distribution", "#009688"),
+    "cost_vs_score": ("Cost vs Score", "#607D8B"),
+}
+
+DEFAULT_OPTIONS = {"trend_windows": [5, 20], "trend_show_cost": True}
+
+_SCORECARD_CHARTS = ("hole_average", "scoring_distribution", "par_splits")
+
+# Per-course bar charts can be drilled into, one golf_cube dimension per click
+DRILLABLE_CHARTS = ("average_score", "rounds_per_course", "best_score")
+DRILL_ORDER = ("course", "year", "month", "weekday")
+
+
+def parse_trend_windows(text):
+    """Rolling average windows (in rounds) from text such as "5, 20"."""
+    windows = []
+    for part in text.replace(";", ",").split(","):
+        part = part.strip()
+        if part.isdigit() and int(part) > 1:
+            windows.append(int(part))
+    return sorted(set(windows))[:4]
+
+
+# --- Data ---
+def chart_data(conn, chart_type, filter_text=None, options=None, where=None):
+    """
+    Everything draw_chart needs for one chart, or None for an unknown chart type.
+    where, if given, is a (where_clause, params) pair used instead of filter_text.
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    where_clause, params = where if where is not None else compile_filter(filter_text)
+    cursor = conn.cursor()
+
+    if chart_type == "average_score":
+        cursor.execute(
+            "SELECT course, AVG(CAST(score AS INTEGER)) FROM scores" + where_clause + " GROUP BY course",
+            params,
+        )
+        results = sorted(cursor.fetchall(), key=lambda x: x[1])
+    elif chart_type == "rounds_per_course":
+        cursor.execute("SELECT course, COUNT(*) FROM scores" + where_clause + " GROUP BY course", params)
+        results = sorted(cursor.fetchall(), key=lambda x: x[1], reverse=True)
+    elif chart_type == "best_score":
+        cursor.execute(
+            "SELECT course, MIN(CAST(score AS INTEGER)) FROM scores" + where_clause + " GROUP BY course",
+            params,
+        )
+        results = sorted(cursor.fetchall(), key=lambda x: x[1])
+
+    elif chart_type in _SCORECARD_CHARTS:
+        return {"stats": scorecard_stats(load_scorecards(conn, where_clause, params))}
+
+    elif chart_type == "handicap":
+        return {"history": handicap_history(conn, where_clause, params)}
+
+    elif chart_type == "trend":
+        cursor.execute(
+            "SELECT julianday(date), CAST(score AS INTEGER), CAST(cost AS INTEGER) FROM scores"
+            + where_clause + " ORDER BY date, id",
+            params,
+        )
+        return _trend_data(np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, 3), options)
+
+    elif chart_type == "distribution":
+        cols = load_columns(conn, where_clause, params)
+        values, counts = score_histogram(cols.scores)
+        return {"values": values, "counts": counts, "summary": summarize(cols)}
+
+    elif chart_type == "cost_vs_score":
+        cursor.execute(
+            "SELECT id, CAST(cost AS INTEGER), CAST(score AS INTEGER) FROM scores" + where_clause, params
+        )
+        rows = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, 3)   # NULL -> nan
+        rows = rows[~np.isnan(rows).any(axis=1)]
+        return _scatter_data(rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2])
+
+    else:
+        return None
+
+    return {"labels": [row[0] for row in results], "values": [row[1] for row in results]}
+
+
+def cube_chart_data(cube, chart_type, path=()):
+    """
+    Data for a drillable chart answered from a golf_cube.Cube, no SQL.
+    path holds the (dimension, value) pairs clicked so far, in DRILL_ORDER;
+    the bars break the rounds down by the next dimension.  keys are the bars'
+    dimension values, for drilling further.
+    """
+    level = DRILL_ORDER[len(path)]
+    cells = cube.rollup(level, **dict(path))
+    if chart_type == "average_score":
+        values = {key: cell.avg_score for key, cell in cells.items()}
+    elif chart_type == "rounds_per_course":
+        values = {key: cell.rounds for key, cell in cells.items()}
+    else:
+        values = {key: cell.best for key, cell in cells.items()}
+    values = {key: value for key, value in values.items() if value is not None}
+
+    if level == "course":   # ranked, as the SQL version orders them
+        keys = sorted(values, key=values.get, reverse=chart_type == "rounds_per_course")
+    else:                   # chronological, unknown dates last
+        keys = sorted(values, key=lambda k: (k is None, k or 0))
+    return {
+        "labels": [_drill_label(level, key) for key in keys],
+        "values": [values[key] for key in keys],
+        "keys": keys,
+        "level": level,
+        "context": " ".join(_drill_label(dimension, value) for dimension, value in path),
+    }
+
+
+def store_scatter_data(store):
+    """Data for the cost/score chart from a golf_roundstore.RoundStore, no SQL."""
+    ids = np.frombuffer(store.ids, dtype=np.int32)
+    costs = np.frombuffer(store.costs, dtype=np.int32)
+    scores = np.frombuffer(store.scores, dtype=np.int32)
+    known = (costs != MISSING) & (scores != MISSING)
+    return _scatter_data(ids[known].astype(np.int64), costs[known].astype(np.float64),
+                         scores[known].astype(np.float64))
+
+
+def _scatter_data(ids, costs, scores):
+    """ids keep each point's round, for picking it on screen."""
+    return {"ids": ids, "x": costs, "y": scores}
+
+
+def _drill_label(dimension, value):
+    if value is None:
+        return "?"
+    if dimension == "month":
+        return calendar.month_abbr[value + 1]
+    if dimension == "weekday":
+        return calendar.day_abbr[value]
+    return str(value)
+
+
+def _trend_data(data, options):
+    """
+    Rolling stats over every round, then each series reduced with LTTB
+    to at most TREND_MAX_POINTS.  data columns: julian day, score, cost.
+    """
+    data = data[~np.isnan(data).any(axis=1)]
+    result = {"total": len(data), "points": None, "rolling": [], "cost": None}
+    if len(data) == 0:
+        return result
+
+    x = data[:, 0] - UNIX_EPOCH_JULIAN   # matplotlib date numbers
+    scores = data[:, 1]
+    costs = data[:, 2]
+    windows = options["trend_windows"]
+
+    result["points"] = lttb(x, scores, TREND_MAX_POINTS)
+    for window in windows:
+        result["rolling"].append((window,) + lttb(x, rolling_mean(scores, window), TREND_MAX_POINTS))
+    if options["trend_show_cost"]:
+        cost_window = windows[-1] if windows else 1
+        result["cost"] = (cost_window,) + lttb(x, rolling_mean(costs, cost_window), TREND_MAX_POINTS)
+    return result
+
+
+# --- Drawing ---
+def _no_data(ax, message):
+    ax.text(0.5, 0.5, message, ha="center", va="center", transform=ax.transAxes, fontsize=12)
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+
+def _label_bars(ax, bars, fontsize=9):
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(
+            f"{height:.0f}" if height == int(height) else f"{height:.2f}",
+            xy=(bar.get_x() + bar.get_width() / 2, height),
+            xytext=(0, 4),
+            textcoords="offset points",
+            ha='center',
+            va='bottom',
+            fontsize=fontsize,
+            color='black',
+            fontweight='bold'
+        )
+
+
+def draw_chart(ax, chart_type, data, options=None):
+    """
+    Draw one chart into a cleared Axes.
+    Returns the secondary (twin) Axes if the chart created one, else None.
+    """
+    if chart_type in ("average_score", "rounds_per_course", "best_score"):
+        _draw_course_bars(ax, chart_type, data)
+    elif chart_type in _SCORECARD_CHARTS:
+        _draw_scorecard_chart(ax, chart_type, data["stats"])
+    elif chart_type == "handicap":
+        _draw_handicap_chart(ax, data["history"])
+    elif chart_type == "trend":
+        return _draw_trend_chart(ax, data)
+    elif chart_type == "distribution":
+        _draw_distribution_chart(ax, data)
+    elif chart_type == "cost_vs_score":
+        _draw_scatter_chart(ax, data)
+    return None
+
+
+def _draw_course_bars(ax, chart_type, data):
+    if chart_type == "average_score":
+        title = "Average Score per Course"
+        ylabel = "Average Score"
+        bar_color = "#4CAF50"
+    elif chart_type == "rounds_per_course":
+        title = "Number of Rounds per Course"
+        ylabel = "Rounds Played"
+        bar_color = "#2196F3"
+        ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    else:
+        title = "Best Score per Course"
+        ylabel = "Best Score"
+        bar_color = "#FF9800"
+
+    level = data.get("level", "course")
+    if level != "course":   # drilled down from a course bar
+        title = title.replace("per Course", f"per {level.capitalize()}")
+        title += f" - {data['context']}"
+
+    courses = data["labels"]
+    bars = ax.bar(courses, data["values"], color=bar_color, edgecolor='black')
+
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.set_xticks(range(len(courses)))
+    ax.set_xticklabels(courses, rotation=45, ha="right", fontsize=9)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    # Add value labels
+    _label_bars(ax, bars)
+
+
+def _draw_scorecard_chart(ax, chart_type, stats):
+    """Per-hole, scoring distribution and par 3/4/5 charts from scorecard stats."""
+    if stats["holes"] == 0:
+        _no_data(ax, "No scorecards recorded")
+        return
+
+    if chart_type == "hole_average":
+        labels = [str(h + 1) for h in range(HOLES)]
+        values = [0 if v != v else v for v in stats["hole_avg"]]  # NaN → 0 for unplayed holes
+        bars = ax.bar(labels, values, color="#9C27B0", edgecolor="black")
+        ax.plot(labels, stats["hole_par"], "k_", markersize=18, markeredgewidth=2, label="Par")
+        ax.legend(loc="upper right", fontsize=9)
+        title = f"Average Strokes per Hole ({stats['rounds']} scorecards)"
+        ylabel = "Average Strokes"
+        ax.set_xlabel("Hole", fontsize=12)
+
+    elif chart_type == "scoring_distribution":
+        colors = ["#1B5E20", "#4CAF50", "#90A4AE", "#FFB74D", "#FF7043", "#C62828"]
+        bars = ax.bar(DISTRIBUTION_LABELS, stats["distribution"], color=colors, edgecolor="black")
+        ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+        title = f"Scoring Distribution ({stats['holes']} holes)"
+        ylabel = "Holes"
+
+    else:  # par_splits
+        pars = sorted(stats["par_avgs"])
+        labels = [f"Par {p}" for p in pars]
+        bars = ax.bar(labels, [stats["par_avgs"][p] for p in pars], color="#795548", edgecolor="black")
+        for bar, p in zip(bars, pars):
+            ax.annotate(f"{stats['par_avgs'][p] - p:+.2f}",
+                        xy=(bar.get_x() + bar.get_width() / 2, bar.get_height() / 2),
+                        ha="center", va="center", fontsize=10, color="white", fontweight="bold")
+        title = "Average Strokes on Par 3 / 4 / 5"
+        ylabel = "Average Strokes"
+
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    _label_bars(ax, bars, fontsize=8)
+
+
+def _draw_trend_chart(ax, data):
+    """Score (and optionally cost) against date with rolling averages."""
+    if data["points"] is None:
+        _no_data(ax, "No rounds to plot")
+        return None
+
+    px, py = data["points"]
+    ax.scatter(px, py, s=10, color="#90A4AE", alpha=0.6, label="Score")
+
+    line_colors = ["#4CAF50", "#3F51B5", "#E91E63", "#FF9800"]
+    for (window, rx, ry), color in zip(data["rolling"], line_colors):
+        ax.plot(rx, ry, color=color, linewidth=2, label=f"{window}-round avg")
+
+    twin = None
+    if data["cost"] is not None:
+        twin = ax.twinx()
+        cost_window, cx, cy = data["cost"]
+        label = f"Cost ({cost_window}-round avg)" if cost_window > 1 else "Cost"
+        twin.plot(cx, cy, color="#8D6E63", linestyle="--", linewidth=1.5, label=label)
+        twin.set_ylabel("Cost ($)", fontsize=12)
+        twin.legend(loc="upper left", fontsize=9)
+
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+    total = data["total"]
+    shown = f"{len(px):,} of {total:,}" if len(px) < total else f"{total:,}"
+    ax.set_title(f"Score Trend ({shown} rounds shown)", fontsize=14, fontweight='bold')
+    ax.set_ylabel("Score", fontsize=12)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(loc="upper right", fontsize=9)
+    return twin
+
+
+def _draw_distribution_chart(ax, data):
+    """Histogram of scores with mean, median and the P10-P90 band."""
+    values, counts, summary = data["values"], data["counts"], data["summary"]
+    if len(values) == 0:
+        _no_data(ax, "No rounds to plot")
+        return
+
+    ax.axvspan(summary["p10"], summary["p90"], color="#FFE082", alpha=0.4, label="P10-P90")
+    ax.bar(values, counts, width=1.0, color="#009688", edgecolor="black", linewidth=0.5)
+    ax.axvline(summary["avg_score"], color="#C62828", linewidth=2,
+               label=f"Mean {summary['avg_score']:.1f}")
+    ax.axvline(summary["p50"], color="#283593", linewidth=2, linestyle="--",
+               label=f"Median {summary['p50']:.0f}")
+
+    ax.set_title(f"Score Distribution ({summary['rounds']:,} rounds, std dev {summary['std']:.1f})",
+                 fontsize=14, fontweight='bold')
+    ax.set_xlabel("Score", fontsize=12)
+    ax.set_ylabel("Rounds", fontsize=12)
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(loc="upper right", fontsize=9)
+
+
+def _draw_scatter_chart(ax, data):
+    """Each round's score against its cost (a density above SCATTER_MAX_POINTS), with a fitted line."""
+    x, y = data["x"], data["y"]
+    if len(x) == 0:
+        _no_data(ax, "No rounds with both a cost and a score")
+        return
+
+    # Rasterized: a million points or hexagons are one image in an SVG or PDF, not a million shapes
+    if len(x) > SCATTER_MAX_POINTS:
+        # Costs and scores are whole numbers; a finer grid than one column per dollar or one
+        # row per stroke (hexbin interleaves 2 * ny rows) leaves empty stripes between them
+        gridsize = (max(1, min(SCATTER_GRIDSIZE, int(np.ptp(x)))),
+                    max(1, min(SCATTER_GRIDSIZE, int(np.ptp(y)) // 2)))
+        ax.hexbin(x, y, gridsize=gridsize, bins="log", mincnt=1, cmap="viridis",
+                  linewidths=0, rasterized=True)
+        kind = "density, log scale"
+    else:
+        ax.scatter(x, y, s=14, color="#607D8B", alpha=0.5, edgecolors="none", rasterized=True)
+        kind = "rounds"
+
+    title = f"Cost vs Score ({len(x):,} {kind})"
+    if len(x) > 1 and np.ptp(x) > 0 and np.ptp(y) > 0:
+        slope, intercept = np.polyfit(x, y, 1)
+        ends = np.array([x.min(), x.max()])
+        ax.plot(ends, slope * ends + intercept, color="#E91E63", linewidth=2,
+                label=f"Fit: {slope * 100:+.1f} strokes per $100")
+        title += f", r = {np.corrcoef(x, y)[0, 1]:.2f}"
+        ax.legend(loc="upper right", fontsize=9)
+
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel("Cost ($)", fontsize=12)
+    ax.set_ylabel("Score", fontsize=12)
+    ax.grid(linestyle='--', alpha=0.5)
+
+
+def _parse_date(text):
+    """A round's date, or None when it is not ISO -- dropped like julianday()'s NULLs."""
+    try:
+        return datetime.strptime(text, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def _draw_handicap_chart(ax, history):
+    """Handicap index over time, with each round's differential behind it."""
+    points = [(when, diff, idx) for when, diff, idx in
+              ((_parse_date(d), diff, idx) for d, diff, idx in history) if when is not None]
+    indexed = [(d, idx) for d, _, idx in points if idx is not None]
+    if not indexed:
+        _no_data(ax, "At least 3 rounds are needed for a handicap index")
+        return
+
+    ax.scatter([p[0] for p in points], [p[1] for p in points],
+               s=12, color="#90A4AE", alpha=0.7, label="Score Differential")
+    ax.step([d for d, _ in indexed], [i for _, i in indexed], where="post",
+            color="#3F51B5", linewidth=2, label="Handicap Index")
+
+    latest = indexed[-1]
+    ax.annotate(f"{latest[1]:.1f}", xy=latest, xytext=(6, 0), textcoords="offset points",
+                va="center", fontsize=10, fontweight="bold", color="#3F51B5")
+
+    ax.set_title("Handicap Index Over Time", fontsize=14, fontweight='bold')
+    ax.set_ylabel("Index / Differential", fontsize=12)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(loc="upper right", fontsize=9)
+    for label in ax.get_xticklabels():
+        label.set_rotation(30)
+        label.set_ha("right")
@@ -0,0 +1,149 @@
+"""
+Parquet and Arrow IPC (Feather v2) export/import of the rounds table.
+
+Rows are streamed from the SQLite cursor in record batches with typed
+columns: course as a dictionary-encoded string, date as date32, cost as
+int32 and score as int16.  The course dictionary is built once up front so
+every batch shares it (required by the Arrow IPC file format).
+
+pyarrow is optional; ``available()`` says whether these formats can be used.
+"""
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+
+from golf_dedupe import ImportSummary, insert_rounds
+
+BATCH_SIZE = 65536
+
+FORMATS = {
+    "parquet": "Parquet Files (*.parquet)",
+    "feather": "Feather / Arrow IPC Files (*.feather *.arrow)",
+}
+
+
+def available():
+    return pa is not None
+
+
+def rounds_schema():
+    return pa.schema([
+        ("course", pa.dictionary(pa.int32(), pa.string())),
+        ("date", pa.date32()),
+        ("cost", pa.int32()),
+        ("score", pa.int16()),
+    ])
+
+
+def format_for_path(path):
+    return "parquet" if path.lower().endswith(".parquet") else "feather"
+
+
+def _to_date32(dates):
+    """'yyyy-mm-dd' strings to a date32 array; unparseable dates become nulls."""
+    strings = pa.array(dates, type=pa.string())
+    try:
+        return strings.cast(pa.date32())
+    except pa.ArrowInvalid:
+        valid = []
+        for d in dates:
+            try:
+                valid.append(pa.scalar(d, pa.string()).cast(pa.date32()).as_py())
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                valid.append(None)
+        return pa.array(valid, type=pa.date32())
+
+
+def export_rounds(conn, path, fmt=None, batch_size=BATCH_SIZE):
+    """Stream every round to a Parquet or Feather file; returns the number of rows written."""
+    fmt = fmt or format_for_path(path)
+    schema = rounds_schema()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT DISTINCT COALESCE(course, '') FROM scores ORDER BY 1")
+    dictionary = [row[0] for row in cursor.fetchall()]
+    codes = {course: i for i, course in enumerate(dictionary)}
+    dictionary = pa.array(dictionary, type=pa.string())
+
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+        write = writer.write_batch
+    else:
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        writer = pa.ipc.new_file(path, schema, options=options)
+        write = writer.write_batch
+
+    written = 0
+    try:
+        # Rowid order streams the table sequentially; sorting by date here would
+        # cost a random row lookup per round, and readers can sort cheaply themselves
+        cursor.execute(
+            "SELECT COALESCE(course, ''), date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
+            "FROM scores ORDER BY id"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            courses, dates, costs, scores = zip(*rows)
+            batch = pa.record_batch([
+                pa.DictionaryArray.from_arrays(
+                    pa.array([codes[c] for c in courses], type=pa.int32()), dictionary
+                ),
+                _to_date32(dates),
+                pa.array(costs, type=pa.int32()),
+                pa.array(scores, type=pa.int16()),
+            ], schema=schema)
+            write(batch)
+            written += len(rows)
+    finally:
+        writer.close()
+    return written
+
+
+def iter_batches(path, batch_size=BATCH_SIZE):
+    """Record batches from a Parquet or Feather file, without loading it whole."""
+    if format_for_path(path) == "parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    else:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+
+def read_round_batches(path, batch_size=BATCH_SIZE):
+    """
+    Yield lists of (course, 'yyyy-mm-dd', cost, score) tuples from a columnar file.
+    Column names are matched case-insensitively so files from other tools work too.
+    """
+    for batch in iter_batches(path, batch_size):
+        names = {name.lower(): i for i, name in enumerate(batch.schema.names)}
+        missing = [c for c in ("course", "date", "cost", "score") if c not in names]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+        course = batch.column(names["course"])
+        if pa.types.is_dictionary(course.type):
+            course = course.dictionary_decode()
+        date = batch.column(names["date"])
+        if not pa.types.is_string(date.type):
+            date = date.cast(pa.date32()).cast(pa.string())
+        cost = batch.column(names["cost"]).cast(pa.int64())
+        score = batch.column(names["score"]).cast(pa.int64())
+
+        yield list(zip(course.to_pylist(), date.to_pylist(), cost.to_pylist(), score.to_pylist()))
+
+
+def import_rounds(conn, path, batch_size=BATCH_SIZE):
+    """
+    Insert every round from a columnar file that is not already recorded (caller commits).
+    Returns a golf_dedupe.ImportSummary.
+    """
+    summary = ImportSummary()
+    for rows in read_round_batches(path, batch_size):
+        insert_rounds(conn, rows, summary)
+    return summary
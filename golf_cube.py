@@ -0,0 +1,330 @@
+"""
+In-memory aggregate cube of rounds.
+
+Rounds are aggregated into cells by year x month x weekday x course, each
+cell holding the round count plus count, sum, min and max of score and of
+cost, as dense NumPy arrays.  Any roll-up (per course, per year of one
+course, per month of one season, ...) is then a slice and a reduction of
+those arrays, with no SQL, and results are memoized until the cube
+changes:
+
+    cube = Cube.from_store(store)                  # one vectorized pass
+    cube.rollup("year", course="Pebble Beach")     # {2023: Cell, 2024: Cell}
+    cube.add("Pebble Beach", "2025-05-01", 95, 82)
+
+Rounds without a proper yyyy-mm-dd date go into the year None, month and
+weekday UNKNOWN bucket, so course totals match SQL aggregates.  Removing
+a round cannot tighten a cell's min/max again; remove() reports that and
+the owner rebuilds the cube.
+"""
+import argparse
+import sqlite3
+import time
+from datetime import date
+
+import numpy as np
+
+from golf_query import compile_filter, rounds_cursor
+from golf_roundstore import FETCH_ROWS, MISSING, RoundStore
+
+DIMENSIONS = ("year", "month", "weekday", "course")
+UNKNOWN_MONTH = 12      # months are 0-11
+UNKNOWN_WEEKDAY = 7     # weekdays are 0-6, Monday first
+
+_SUMS = ("rounds", "score_n", "score_sum", "cost_n", "cost_sum")
+_MINS = ("score_min", "cost_min")
+_MAXES = ("score_max", "cost_max")
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class Cell:
+    """Aggregates of one roll-up bucket."""
+    __slots__ = ("rounds", "score_n", "score_sum", "best", "worst", "cost_n", "cost_sum", "cost_min", "cost_max")
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @property
+    def avg_score(self):
+        return self.score_sum / self.score_n if self.score_n else None
+
+    @property
+    def avg_cost(self):
+        return self.cost_sum / self.cost_n if self.cost_n else None
+
+    def __repr__(self):
+        return f"Cell(rounds={self.rounds}, avg_score={self.avg_score}, best={self.best})"
+
+
+def _date_keys(ordinals):
+    """(year, month, weekday) arrays for date ordinals, MISSING -> (0, UNKNOWN_MONTH, UNKNOWN_WEEKDAY)."""
+    known = ordinals != MISSING
+    days = np.where(known, ordinals - _EPOCH_ORDINAL, 0).astype("datetime64[D]")
+    years = np.where(known, days.astype("datetime64[Y]").astype(np.int64) + 1970, 0)
+    months = np.where(known, days.astype("datetime64[M]").astype(np.int64) % 12, UNKNOWN_MONTH)
+    weekdays = np.where(known, (ordinals - 1) % 7, UNKNOWN_WEEKDAY)   # ordinal 1 was a Monday
+    return years, months, weekdays
+
+
+class Cube:
+    """Dense year x month x weekday x course cells; years and courses grow as rounds arrive."""
+
+    def __init__(self):
+        self.years = []          # year index -> year (None for undated rounds)
+        self.courses = []        # course index -> name
+        self._year_index = {}
+        self._course_index = {}
+        self.cells = {}
+        for name in _SUMS:
+            self.cells[name] = np.zeros((0, 13, 8, 0), dtype=np.int64)
+        for name in _MINS:
+            self.cells[name] = np.full((0, 13, 8, 0), np.iinfo(np.int64).max, dtype=np.int64)
+        for name in _MAXES:
+            self.cells[name] = np.full((0, 13, 8, 0), np.iinfo(np.int64).min, dtype=np.int64)
+        self._memo = {}
+
+    # --- Building ---
+    @classmethod
+    def from_store(cls, store):
+        """Aggregate every round of a golf_roundstore.RoundStore in one pass."""
+        cube = cls()
+        course_map = np.array([cube._course(name) for name in store.course_names], dtype=np.int64)
+        cube._add_columns(
+            np.frombuffer(store.dates, dtype=np.int32).astype(np.int64),
+            course_map[np.frombuffer(store.course_ids, dtype=np.int32)] if len(store) else np.zeros(0, np.int64),
+            np.frombuffer(store.costs, dtype=np.int32).astype(np.int64),
+            np.frombuffer(store.scores, dtype=np.int32).astype(np.int64),
+        )
+        return cube
+
+    @classmethod
+    def load(cls, conn, where_clause="", params=()):
+        """Aggregate the rounds matching where_clause, streamed in chunks."""
+        cube = cls()
+        cursor = rounds_cursor(conn, where_clause, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            chunk = RoundStore()
+            chunk.extend(rows)   # the budget does not matter for one chunk
+            cube.merge(cls.from_store(chunk))
+        return cube
+
+    def _year(self, year):
+        index = self._year_index.get(year)
+        if index is None:
+            index = self._year_index[year] = len(self.years)
+            self.years.append(year)
+        return index
+
+    def _course(self, name):
+        index = self._course_index.get(name)
+        if index is None:
+            index = self._course_index[name] = len(self.courses)
+            self.courses.append(name)
+        return index
+
+    def _grow(self):
+        """Extend the cell arrays to the current number of years and courses."""
+        shape = self.cells["rounds"].shape
+        extra_years, extra_courses = len(self.years) - shape[0], len(self.courses) - shape[3]
+        if extra_years <= 0 and extra_courses <= 0:
+            return
+        pad = ((0, max(extra_years, 0)), (0, 0), (0, 0), (0, max(extra_courses, 0)))
+        for name, cells in self.cells.items():
+            if name in _SUMS:
+                fill = 0
+            elif name in _MINS:
+                fill = np.iinfo(np.int64).max
+            else:
+                fill = np.iinfo(np.int64).min
+            self.cells[name] = np.pad(cells, pad, constant_values=fill)
+
+    def _add_columns(self, ordinals, course_indexes, costs, scores):
+        years, months, weekdays = _date_keys(ordinals)
+        unique_years, year_codes = np.unique(np.where(ordinals == MISSING, -1, years), return_inverse=True)
+        year_map = np.array([self._year(None if y == -1 else int(y)) for y in unique_years], dtype=np.int64)
+        self._grow()
+        if not len(ordinals):
+            return
+        flat = np.ravel_multi_index(
+            (year_map[year_codes.reshape(-1)], months, weekdays, course_indexes), self.cells["rounds"].shape
+        )
+        c = {name: cells.reshape(-1) for name, cells in self.cells.items()}
+        np.add.at(c["rounds"], flat, 1)
+        for prefix, values in (("score", scores), ("cost", costs)):
+            known = values != MISSING
+            at, values = flat[known], values[known]
+            np.add.at(c[prefix + "_n"], at, 1)
+            np.add.at(c[prefix + "_sum"], at, values)
+            np.minimum.at(c[prefix + "_min"], at, values)
+            np.maximum.at(c[prefix + "_max"], at, values)
+        self._memo.clear()
+
+    def merge(self, other):
+        """Add another cube's rounds to this one."""
+        year_map = np.array([self._year(y) for y in other.years], dtype=np.int64)
+        course_map = np.array([self._course(c) for c in other.courses], dtype=np.int64)
+        self._grow()
+        if not other.cells["rounds"].size:
+            return
+        target = np.ix_(year_map, np.arange(13), np.arange(8), course_map)
+        for name, cells in other.cells.items():
+            if name in _SUMS:
+                self.cells[name][target] += cells
+            elif name in _MINS:
+                self.cells[name][target] = np.minimum(self.cells[name][target], cells)
+            else:
+                self.cells[name][target] = np.maximum(self.cells[name][target], cells)
+        self._memo.clear()
+
+    # --- Incremental updates ---
+    def _cell_of(self, course, date_text, create):
+        try:
+            day = date.fromisoformat(date_text) if date_text else None
+            if day is not None and day.isoformat() != date_text:
+                day = None
+        except (TypeError, ValueError):
+            day = None
+        if create:
+            year, course_index = self._year(day.year if day else None), self._course(course)
+            self._grow()
+        else:
+            year = self._year_index.get(day.year if day else None)
+            course_index = self._course_index.get(course)
+            if year is None or course_index is None:
+                return None
+        if day is None:
+            return year, UNKNOWN_MONTH, UNKNOWN_WEEKDAY, course_index
+        return year, day.month - 1, day.weekday(), course_index
+
+    def add(self, course, date_text, cost, score):
+        cell = self._cell_of(course, date_text, create=True)
+        c = self.cells
+        c["rounds"][cell] += 1
+        for prefix, value in (("score", score), ("cost", cost)):
+            if value is None:
+                continue
+            c[prefix + "_n"][cell] += 1
+            c[prefix + "_sum"][cell] += value
+            c[prefix + "_min"][cell] = min(c[prefix + "_min"][cell], value)
+            c[prefix + "_max"][cell] = max(c[prefix + "_max"][cell], value)
+        self._memo.clear()
+
+    def remove(self, course, date_text, cost, score):
+        """
+        Take a round out again.  Returns False if the cube can no longer be
+        kept exact (the round was not in it, or held a cell's min or max);
+        the cube should then be rebuilt.
+        """
+        cell = self._cell_of(course, date_text, create=False)
+        c = self.cells
+        if cell is None or c["rounds"][cell] == 0:
+            return False
+        c["rounds"][cell] -= 1
+        self._memo.clear()
+        exact = True
+        for prefix, value in (("score", score), ("cost", cost)):
+            if value is None:
+                continue
+            c[prefix + "_n"][cell] -= 1
+            c[prefix + "_sum"][cell] -= value
+            if c[prefix + "_n"][cell] == 0:
+                c[prefix + "_min"][cell] = np.iinfo(np.int64).max
+                c[prefix + "_max"][cell] = np.iinfo(np.int64).min
+            elif value in (c[prefix + "_min"][cell], c[prefix + "_max"][cell]):
+                exact = False
+        return exact
+
+    # --- Queries ---
+    def _axis_index(self, dimension, value):
+        if dimension == "year":
+            return self._year_index.get(value)
+        if dimension == "course":
+            return self._course_index.get(value)
+        if dimension == "month":
+            return UNKNOWN_MONTH if value is None else value
+        return UNKNOWN_WEEKDAY if value is None else value
+
+    def _axis_value(self, dimension, index):
+        if dimension == "year":
+            return self.years[index]
+        if dimension == "course":
+            return self.courses[index]
+        if dimension == "month":
+            return None if index == UNKNOWN_MONTH else index
+        return None if index == UNKNOWN_WEEKDAY else index
+
+    def rollup(self, by, **fixed):
+        """
+        {value of dimension by: Cell} for the rounds matching fixed, e.g.
+        rollup("month", course="X", year=2024).  Months and weekdays are 0-based
+        (None = unknown).  Empty buckets are left out.
+        """
+        key = (by, tuple(sorted(fixed.items())))
+        result = self._memo.get(key)
+        if result is not None:
+            return result
+
+        index = []
+        for dimension in DIMENSIONS:
+            if dimension in fixed:
+                i = self._axis_index(dimension, fixed[dimension])
+                if i is None:
+                    self._memo[key] = {}
+                    return {}
+                index.append(slice(i, i + 1))
+            else:
+                index.append(slice(None))
+        index = tuple(index)
+        axis = DIMENSIONS.index(by)
+        others = tuple(a for a in range(len(DIMENSIONS)) if a != axis)
+
+        reduced = {}
+        for name, cells in self.cells.items():
+            part = cells[index]
+            if name in _SUMS:
+                reduced[name] = part.sum(axis=others)
+            elif name in _MINS:
+                reduced[name] = part.min(axis=others, initial=np.iinfo(np.int64).max)
+            else:
+                reduced[name] = part.max(axis=others, initial=np.iinfo(np.int64).min)
+
+        offset = index[axis].start or 0
+        result = {}
+        for i in np.flatnonzero(reduced["rounds"]):
+            score_n, cost_n = int(reduced["score_n"][i]), int(reduced["cost_n"][i])
+            result[self._axis_value(by, offset + int(i))] = Cell((
+                int(reduced["rounds"][i]), score_n, int(reduced["score_sum"][i]),
+                int(reduced["score_min"][i]) if score_n else None,
+                int(reduced["score_max"][i]) if score_n else None,
+                cost_n, int(reduced["cost_sum"][i]),
+                int(reduced["cost_min"][i]) if cost_n else None,
+                int(reduced["cost_max"][i]) if cost_n else None,
+            ))
+        self._memo[key] = result
+        return result
+
+    def nbytes(self):
+        return sum(cells.nbytes for cells in self.cells.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the rounds cube and time a few roll-ups.")
+    parser.add_argument("filter", nargs="?", default="")
+    parser.add_argument("--db", default="golf_scores.db")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    start = time.perf_counter()
+    cube = Cube.load(conn, *compile_filter(args.filter))
+    built = time.perf_counter() - start
+    print(f"{len(cube.years)} year(s) x {len(cube.courses)} course(s), "
+          f"{cube.nbytes() / 1024:.0f} KB, built in {built * 1000:.1f} ms")
+    for by, fixed in (("course", {}), ("year", {"course": cube.courses[0]} if cube.courses else {}), ("month", {})):
+        start = time.perf_counter()
+        cells = cube.rollup(by, **fixed)
+        print(f"rollup({by!r}, {fixed}): {len(cells)} bucket(s) in {(time.perf_counter() - start) * 1e6:.0f} us")
@@ -0,0 +1,159 @@
+"""
+Duplicate-free importing of rounds.
+
+Every round has a fingerprint: its course (trimmed, lower case), date, cost
+and score as one normalized string.  It is a virtual generated column on
+``scores`` with an index, so SQLite keeps it right on every write path
+(GUI, writer thread, bulk edits, other instances) without any triggers.
+
+Imports insert a row only when no round with the same fingerprint exists,
+one index probe per row, which makes re-importing a file a no-op.  Rounds
+moved out to archive files keep their fingerprints in the hot database
+(``archived_fingerprints``, see golf_archive), so they count too.  Rounds
+entered by hand are not checked: two identical rounds on the same day are
+unusual but possible.
+"""
+import itertools
+
+# SQLite has no hash function, so the fingerprint is the normalized content itself
+FINGERPRINT_EXPR = (
+    "lower(trim({course})) || '|' || trim({date}) || '|' || "
+    "CAST({cost} AS INTEGER) || '|' || CAST({score} AS INTEGER)"
+)
+
+_STAGED = FINGERPRINT_EXPR.format(course="i.course", date="i.date", cost="i.cost", score="i.score")
+
+# Fingerprints of the rounds in archived seasons, which are no longer in scores
+ARCHIVED_FINGERPRINTS = (
+    "CREATE TABLE IF NOT EXISTS archived_fingerprints ("
+    "fingerprint TEXT PRIMARY KEY, year INTEGER NOT NULL) WITHOUT ROWID"
+)
+
+# Staged rows not recorded yet; the first of any repeats within the batch wins
+_INSERT_NEW = (
+    "INSERT INTO scores (course, date, cost, score) "
+    "SELECT i.course, i.date, i.cost, i.score FROM temp.import_rows i "
+    "WHERE i.seq IN (SELECT MIN(i.seq) FROM temp.import_rows i GROUP BY " + _STAGED + ") "
+    "AND NOT EXISTS (SELECT 1 FROM scores s WHERE s.fingerprint = " + _STAGED + ") "
+    "AND NOT EXISTS (SELECT 1 FROM archived_fingerprints a WHERE a.fingerprint = " + _STAGED + ") "
+    "ORDER BY i.seq"
+)
+
+# Newly inserted rounds sharing a course and day with an older round that has another cost or score
+_CONFLICTS = (
+    "SELECT COUNT(*) FROM scores n WHERE n.id > ?1 AND EXISTS ("
+    "SELECT 1 FROM scores s WHERE s.date = n.date AND s.id <= ?2 "
+    "AND lower(trim(s.course)) = lower(trim(n.course)) AND s.fingerprint IS NOT n.fingerprint)"
+)
+
+# Rows are staged and inserted in chunks of this many
+CHUNK_SIZE = 50000
+
+
+def install_fingerprint(conn):
+    """Add the fingerprint column, its index and archived_fingerprints to an older database (caller commits)."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(scores)")]
+    if "fingerprint" not in columns:
+        conn.execute(
+            "ALTER TABLE scores ADD COLUMN fingerprint TEXT GENERATED ALWAYS AS ("
+            + FINGERPRINT_EXPR.format(course="course", date="date", cost="cost", score="score")
+            + ") VIRTUAL"
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_fingerprint ON scores (fingerprint)")
+    conn.execute(ARCHIVED_FINGERPRINTS)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_archived_fingerprints_year ON archived_fingerprints (year)")
+
+
+class ImportSummary:
+    """What an import did.  conflicting rounds were inserted but look like edits of an existing round."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.skipped = 0        # already recorded (or repeated within the file)
+        self.conflicting = 0
+        self.invalid = 0
+        self.first_date = None  # earliest date inserted, for the handicap recompute
+        self.last_existing_id = None   # rounds up to here were there before the import
+
+    def merge(self, other):
+        """Add another summary's counts (e.g. one file's) to this one."""
+        self.inserted += other.inserted
+        self.skipped += other.skipped
+        self.conflicting += other.conflicting
+        self.invalid += other.invalid
+        if other.first_date is not None and (self.first_date is None or other.first_date < self.first_date):
+            self.first_date = other.first_date
+
+    def message(self):
+        lines = [f"Imported {self.inserted} round(s)."]
+        if self.skipped:
+            lines.append(f"Skipped {self.skipped} round(s) already recorded.")
+        if self.conflicting:
+            lines.append(f"{self.conflicting} imported round(s) share a course and date with a "
+                         f"different existing round; check them for edits.")
+        if self.invalid:
+            lines.append(f"Ignored {self.invalid} row(s) with missing or invalid values.")
+        return "\n".join(lines)
+
+
+def clean_round(row):
+    """(course, date, cost, score) with whitespace stripped and whole numbers, or None if unusable."""
+    try:
+        course, date = row[0].strip(), row[1].strip()
+        cost, score = int(float(row[2])), int(float(row[3]))
+    except (AttributeError, IndexError, TypeError, ValueError, OverflowError):
+        return None
+    if not course or not date:
+        return None
+    return course, date, cost, score
+
+
+def _clean_rows(rows, summary):
+    for row in rows:
+        row = clean_round(row)
+        if row is None:
+            summary.invalid += 1
+        else:
+            yield row
+
+
+def insert_rounds(conn, rows, summary=None):
+    """
+    Insert (course, date, cost, score) rows that are not already recorded (caller commits).
+    Returns an ImportSummary (the one passed in, if any, updated in place).
+
+    Rows are staged in a temp table and inserted set-wise, one fingerprint
+    index probe per row, rather than with one INSERT statement per row.
+    """
+    summary = summary or ImportSummary()
+    cursor = conn.cursor()
+    if summary.last_existing_id is None:
+        install_fingerprint(conn)
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM scores")
+        summary.last_existing_id = cursor.fetchone()[0]
+    cursor.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS import_rows (seq INTEGER PRIMARY KEY, course, date, cost, score)"
+    )
+
+    clean = _clean_rows(rows, summary)
+    while True:
+        chunk = list(itertools.islice(clean, CHUNK_SIZE))
+        if not chunk:
+            break
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM scores")
+        before = cursor.fetchone()[0]
+        cursor.execute("DELETE FROM temp.import_rows")
+        cursor.executemany("INSERT INTO temp.import_rows (course, date, cost, score) VALUES (?, ?, ?, ?)", chunk)
+        cursor.execute(_INSERT_NEW)
+        inserted = cursor.rowcount
+        summary.inserted += inserted
+        summary.skipped += len(chunk) - inserted
+        if inserted:
+            cursor.execute("SELECT MIN(date) FROM scores WHERE id > ?", (before,))
+            first = cursor.fetchone()[0]
+            if summary.first_date is None or first < summary.first_date:
+                summary.first_date = first
+            cursor.execute(_CONFLICTS, (before, summary.last_existing_id))
+            summary.conflicting += cursor.fetchone()[0]
+    cursor.execute("DELETE FROM temp.import_rows")
+    return summary
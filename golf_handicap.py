@@ -0,0 +1,237 @@
+"""
+World Handicap System style index, maintained incrementally.
+
+Every round gets a score differential from its course rating and slope;
+the handicap index after a round is the average of the best 8 of the last
+20 differentials (fewer, with an adjustment, while the record is short).
+Results live in the ``handicap_history`` table, one row per round.
+
+Rounds are ordered by (date, id).  A change to one round only affects the
+indexes from that round onwards, so add/update/delete seed a 20 round
+sliding window from the stored differentials just before the change and
+recompute the suffix.  For the usual case (a new latest round) that is a
+single row.  ``backfill`` computes the whole history in one linear pass.
+Rounds moved out to archive files (see golf_archive) keep their history
+rows; recomputing walks them in date order along with the rounds still in
+``scores``, using their stored differentials, so a round backdated into an
+archived season gets the window of the rounds around it.
+"""
+from bisect import bisect_left, insort
+from collections import deque
+
+WINDOW = 20
+MAX_INDEX = 54.0
+DEFAULT_RATING = 72.0
+DEFAULT_SLOPE = 113
+
+# Rounds on record -> (lowest differentials used, adjustment), WHS rule 5.2
+_DIFFERENTIALS_USED = {
+    3: (1, -2.0), 4: (1, -1.0), 5: (1, 0.0), 6: (2, -1.0), 7: (2, 0.0), 8: (2, 0.0),
+    9: (3, 0.0), 10: (3, 0.0), 11: (3, 0.0), 12: (4, 0.0), 13: (4, 0.0), 14: (4, 0.0),
+    15: (5, 0.0), 16: (5, 0.0), 17: (6, 0.0), 18: (6, 0.0), 19: (7, 0.0), 20: (8, 0.0),
+}
+
+
+def score_differential(score, rating, slope):
+    """(113 / slope) x (score - course rating), rounded to the nearest tenth."""
+    return round((113.0 / slope) * (score - rating), 1)
+
+
+class HandicapWindow:
+    """
+    The last 20 differentials in date order, mirrored in a sorted list so the
+    best-N average is a slice instead of a sort on every round.
+    """
+
+    def __init__(self, differentials=()):
+        self.recent = deque()
+        self.ordered = []
+        for d in differentials:
+            self.push(d)
+
+    def push(self, differential):
+        self.recent.append(differential)
+        insort(self.ordered, differential)
+        if len(self.recent) > WINDOW:
+            oldest = self.recent.popleft()
+            del self.ordered[bisect_left(self.ordered, oldest)]
+
+    def index(self):
+        """Current handicap index, or None with fewer than 3 rounds."""
+        used = _DIFFERENTIALS_USED.get(len(self.recent))
+        if used is None:
+            return None
+        count, adjustment = used
+        value = sum(self.ordered[:count]) / count + adjustment
+        return min(round(value, 1), MAX_INDEX)
+
+
+class HandicapEngine:
+    """Keeps ``handicap_history`` in step with ``scores``; callers commit."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.create_tables()
+
+    def create_tables(self):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS courses (
+                name TEXT PRIMARY KEY,
+                rating REAL NOT NULL,
+                slope INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS handicap_history (
+                round_id INTEGER PRIMARY KEY,
+                date TEXT NOT NULL,
+                differential REAL NOT NULL,
+                handicap_index REAL
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_handicap_date ON handicap_history (date, round_id)"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scores_date ON scores (date, id)")
+        # Deleted rounds drop out of the history however they are deleted (bulk, other tools)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS handicap_cleanup
+            AFTER DELETE ON scores
+            BEGIN
+                DELETE FROM handicap_history WHERE round_id = OLD.id;
+            END
+        """)
+
+    # --- Course ratings ---
+    def course_ratings(self):
+        """{course: (rating, slope)} for every course played or rated."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT s.course, c.rating, c.slope
+            FROM (SELECT DISTINCT course FROM scores WHERE course IS NOT NULL
+                  UNION SELECT name FROM courses) AS s
+            LEFT JOIN courses c ON c.name = s.course
+            ORDER BY s.course COLLATE NOCASE
+        """)
+        return {
+            course: (rating if rating is not None else DEFAULT_RATING,
+                     slope if slope is not None else DEFAULT_SLOPE)
+            for course, rating, slope in cursor.fetchall()
+        }
+
+    def set_course_rating(self, course, rating, slope):
+        """Store rating/slope and recompute from the course's first round."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO courses (name, rating, slope) VALUES (?, ?, ?)",
+            (course, float(rating), int(slope)),
+        )
+        cursor.execute(
+            "SELECT date, id FROM scores WHERE course = ? ORDER BY date, id LIMIT 1", (course,)
+        )
+        first = cursor.fetchone()
+        if first:
+            self.round_changed(*first)
+
+    # --- Incremental maintenance ---
+    def round_changed(self, date, round_id):
+        """Recompute every index from round (date, round_id) onwards."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT differential FROM handicap_history "
+            "WHERE date < ? OR (date = ? AND round_id < ?) "
+            "ORDER BY date DESC, round_id DESC LIMIT ?",
+            (date, date, round_id, WINDOW - 1),
+        )
+        seed = [row[0] for row in cursor.fetchall()]
+        seed.reverse()
+        self._recompute(HandicapWindow(seed), (date, round_id))
+
+    def round_deleted(self, date, round_id):
+        self.conn.execute("DELETE FROM handicap_history WHERE round_id = ?", (round_id,))
+        self.round_changed(date, round_id)
+
+    def backfill(self):
+        """
+        Rebuild the full history in one ordered pass over scores.  History of
+        rounds no longer in scores (archived seasons) is kept and walked with them.
+        """
+        self.conn.execute("DELETE FROM handicap_history WHERE round_id IN (SELECT id FROM scores)")
+        self._recompute(HandicapWindow())
+
+    def needs_backfill(self):
+        """True if some round has no history row."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM scores s LEFT JOIN handicap_history h ON h.round_id = s.id "
+            "WHERE h.round_id IS NULL)"
+        )
+        return bool(cursor.fetchone()[0])
+
+    def _recompute(self, window, start=None):
+        """Push every round from (date, round_id) start on (all if None) through window, storing the indexes."""
+        scores_where = archived_where = ""
+        params = ()
+        if start is not None:
+            # Row values, so both halves are index range scans that the merge keeps in order
+            scores_where = "WHERE (s.date, s.id) >= (?, ?)"
+            archived_where = "AND (h.date, h.round_id) >= (?, ?)"
+            params = tuple(start) * 2
+        # Archived rounds are only in the history: their stored differential stands in for the score
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT s.id, s.date, s.score, "
+            f"COALESCE(c.rating, {DEFAULT_RATING}), COALESCE(c.slope, {DEFAULT_SLOPE}), NULL "
+            "FROM scores s LEFT JOIN courses c ON c.name = s.course "
+            f"{scores_where} "
+            "UNION ALL "
+            "SELECT h.round_id, h.date, NULL, NULL, NULL, h.differential FROM handicap_history h "
+            f"WHERE h.round_id NOT IN (SELECT id FROM scores) {archived_where} "
+            "ORDER BY 2, 1",
+            params,
+        )
+
+        def history_rows():
+            for round_id, date, score, rating, slope, archived in cursor:
+                if archived is None:
+                    differential = score_differential(float(score), rating, slope or DEFAULT_SLOPE)
+                else:
+                    differential = archived
+                window.push(differential)
+                yield round_id, date, differential, window.index()
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO handicap_history (round_id, date, differential, handicap_index) "
+            "VALUES (?, ?, ?, ?)",
+            history_rows(),
+        )
+
+    # --- Queries ---
+    def current_index(self):
+        return current_index(self.conn)
+
+    def history(self, where_clause="", params=()):
+        return handicap_history(self.conn, where_clause, params)
+
+
+def current_index(conn):
+    """The handicap index after the latest round, or None."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT handicap_index FROM handicap_history ORDER BY date DESC, round_id DESC LIMIT 1"
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def handicap_history(conn, where_clause="", params=()):
+    """[(date, differential, index)] in date order; where_clause filters on scores."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT date, differential, handicap_index FROM handicap_history "
+        "WHERE round_id IN (SELECT id FROM scores" + where_clause + ") "
+        "ORDER BY date, round_id",
+        params,
+    )
+    return cursor.fetchall()
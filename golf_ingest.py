@@ -0,0 +1,143 @@
+"""
+Importing many CSV exports at once.
+
+Files are parsed and validated in worker processes (one file per task);
+the calling thread is the only writer.  It inserts each file's rows
+through golf_dedupe.insert_rounds as the file finishes parsing, committing
+file by file so the GUI's own writes are never locked out for the whole
+import, and recomputes handicaps once at the end:
+
+    summary, files = ingest_files("golf_scores.db", glob.glob("exports/*.csv"))
+
+CSV files have a header row followed by course, date, cost, score columns,
+as written by Export CSV.
+"""
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from golf_dedupe import ImportSummary, clean_round, install_fingerprint, insert_rounds
+from golf_handicap import HandicapEngine
+
+
+class FileResult:
+    """How one file went; error is set (and nothing imported) if it could not be read."""
+
+    def __init__(self, path, summary=None, error=None):
+        self.path = path
+        self.summary = summary or ImportSummary()
+        self.error = error
+
+    def describe(self):
+        name = os.path.basename(self.path)
+        if self.error:
+            return f"{name}: {self.error}"
+        s = self.summary
+        text = f"{name}: {s.inserted} imported, {s.skipped} already recorded"
+        if s.invalid:
+            text += f", {s.invalid} invalid"
+        return text
+
+
+def parse_csv_file(path):
+    """
+    Read and validate one export (runs in a worker process).
+    Returns (path, clean rows, invalid row count, error message or None).
+    """
+    rows = []
+    invalid = 0
+    try:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            next(reader, None)   # header
+            for row in reader:
+                if not row:
+                    continue
+                row = clean_round(row)
+                if row is None:
+                    invalid += 1
+                else:
+                    rows.append(row)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return path, [], 0, str(e)
+    return path, rows, invalid, None
+
+
+def csv_files_in(folder):
+    return sorted(glob.glob(os.path.join(folder, "*.csv")))
+
+
+def _parsed(paths, workers):
+    """Yield parse_csv_file results as files finish, parsing in parallel when it pays off."""
+    if len(paths) == 1 or workers == 1:
+        for path in paths:
+            yield parse_csv_file(path)
+        return
+    # spawn, not fork: the GUI calls this from a thread of a running Qt process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(parse_csv_file, path) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def ingest_files(db_path, paths, workers=None, progress=None):
+    """
+    Import every file into db_path, one transaction per file.
+    Returns (ImportSummary for all files, [FileResult] in completion order).
+    progress, if given, is called as progress(files done, total files).
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    total = ImportSummary()
+    results = []
+    try:
+        install_fingerprint(conn)
+        total.last_existing_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM scores").fetchone()[0]
+        conn.commit()
+
+        for done, (path, rows, invalid, error) in enumerate(_parsed(list(paths), workers), 1):
+            result = FileResult(path, error=error)
+            if error is None:
+                result.summary.last_existing_id = total.last_existing_id
+                result.summary.invalid = invalid
+                try:
+                    insert_rounds(conn, rows, result.summary)
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+                total.merge(result.summary)
+            results.append(result)
+            if progress:
+                progress(done, len(paths))
+    finally:
+        # Files already committed still need their handicaps, even if a later one failed
+        try:
+            if total.first_date is not None:
+                HandicapEngine(conn).round_changed(total.first_date, 0)
+                conn.commit()
+        finally:
+            conn.close()
+    return total, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a folder (or list) of Golf Tracker CSV exports.")
+    parser.add_argument("paths", nargs="+", help="CSV files or folders of them")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    files = []
+    for p in args.paths:
+        files += csv_files_in(p) if os.path.isdir(p) else [p]
+    summary, results = ingest_files(args.db, files, args.workers,
+                                    progress=lambda done, total: print(f"{done}/{total} files", end="\r"))
+    print()
+    for result in results:
+        print(result.describe())
+    print(summary.message())
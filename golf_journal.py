@@ -0,0 +1,173 @@
+"""
+Bulk edits of many rounds with a single undo entry.
+
+Each bulk operation runs as one ``executemany`` inside the caller's
+transaction and first copies the affected rows (including any packed
+scorecard) into ``undo_journal`` under one ``undo_batches`` entry;
+deleted rounds' attachment rows go to ``undo_attachments``.
+``undo`` restores the most recent batch the same way.  Callers commit.
+"""
+from datetime import datetime
+
+# Undo history kept in the database
+MAX_UNDO_BATCHES = 20
+
+# SQLite's default bound parameter limit is 999 on older builds
+_CHUNK = 500
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for i in range(0, len(ids), _CHUNK):
+        yield ids[i:i + _CHUNK]
+
+
+class UndoJournal:
+    def __init__(self, conn):
+        self.conn = conn
+        self.create_tables()
+
+    def create_tables(self):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS undo_batches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT NOT NULL,
+                created TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS undo_journal (
+                batch_id INTEGER NOT NULL,
+                round_id INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                course TEXT,
+                date TEXT,
+                cost,
+                score,
+                holes BLOB
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_undo_batch ON undo_journal (batch_id)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS undo_attachments (
+                batch_id INTEGER NOT NULL,
+                round_id INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                name TEXT,
+                added TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_undo_attachments_batch ON undo_attachments (batch_id)")
+
+    def _snapshot(self, round_ids, op, label):
+        """Copy the current rows into a new batch; returns the earliest date touched."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "INSERT INTO undo_batches (label, created) VALUES (?, ?)",
+            (label, datetime.now().isoformat(timespec="seconds")),
+        )
+        batch_id = cursor.lastrowid
+        first_date = None
+        for chunk in _chunks(round_ids):
+            cursor.execute(
+                "INSERT INTO undo_journal (batch_id, round_id, op, course, date, cost, score, holes) "
+                "SELECT ?, s.id, ?, s.course, s.date, s.cost, s.score, c.holes "
+                "FROM scores s LEFT JOIN scorecards c ON c.round_id = s.id "
+                f"WHERE s.id IN ({','.join('?' * len(chunk))})",
+                (batch_id, op) + tuple(chunk),
+            )
+            if op == "D":
+                cursor.execute(
+                    "INSERT INTO undo_attachments (batch_id, round_id, sha256, name, added) "
+                    f"SELECT ?, round_id, sha256, name, added FROM attachments WHERE round_id IN ({','.join('?' * len(chunk))})",
+                    (batch_id,) + tuple(chunk),
+                )
+            cursor.execute(
+                f"SELECT MIN(date) FROM scores WHERE id IN ({','.join('?' * len(chunk))})", tuple(chunk)
+            )
+            chunk_first = cursor.fetchone()[0]
+            if chunk_first is not None and (first_date is None or chunk_first < first_date):
+                first_date = chunk_first
+
+        # Trim old history
+        cursor.execute(
+            "DELETE FROM undo_journal WHERE batch_id <= ?", (batch_id - MAX_UNDO_BATCHES,)
+        )
+        cursor.execute("DELETE FROM undo_attachments WHERE batch_id <= ?", (batch_id - MAX_UNDO_BATCHES,))
+        cursor.execute("DELETE FROM undo_batches WHERE id <= ?", (batch_id - MAX_UNDO_BATCHES,))
+        return first_date
+
+    # --- Bulk operations (each returns the earliest date affected, or None) ---
+    def delete_rounds(self, round_ids):
+        first_date = self._snapshot(round_ids, "D", f"Delete {len(round_ids)} round(s)")
+        self.conn.executemany("DELETE FROM scores WHERE id = ?", ((i,) for i in round_ids))
+        return first_date
+
+    def rename_course(self, round_ids, course):
+        first_date = self._snapshot(round_ids, "U", f"Rename course of {len(round_ids)} round(s)")
+        self.conn.executemany(
+            "UPDATE scores SET course = ? WHERE id = ?", ((course, i) for i in round_ids)
+        )
+        return first_date
+
+    def adjust_cost(self, round_ids, mode, amount):
+        """mode is 'add' (amount may be negative), 'set' or 'scale'; costs stay whole dollars >= 0."""
+        expressions = {
+            "add": "cost + ?",
+            "set": "?",
+            "scale": "cost * ?",
+        }
+        first_date = self._snapshot(round_ids, "U", f"Adjust cost of {len(round_ids)} round(s)")
+        self.conn.executemany(
+            f"UPDATE scores SET cost = MAX(0, CAST(ROUND({expressions[mode]}) AS INTEGER)) WHERE id = ?",
+            ((amount, i) for i in round_ids),
+        )
+        return first_date
+
+    # --- Undo ---
+    def last_label(self):
+        row = self.conn.execute("SELECT label FROM undo_batches ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def undo(self):
+        """Restore the latest batch; returns (label, earliest date affected) or None."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, label FROM undo_batches ORDER BY id DESC LIMIT 1")
+        batch = cursor.fetchone()
+        if batch is None:
+            return None
+        batch_id, label = batch
+
+        cursor.execute(
+            "SELECT round_id, op, course, date, cost, score, holes FROM undo_journal WHERE batch_id = ?",
+            (batch_id,),
+        )
+        rows = cursor.fetchall()
+        deleted = [r for r in rows if r[1] == "D"]
+        updated = [r for r in rows if r[1] == "U"]
+
+        # Deleted rounds come back with their original ids (and scorecards and attachments)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO scores (id, course, date, cost, score) VALUES (?, ?, ?, ?, ?)",
+            ((r[0], r[2], r[3], r[4], r[5]) for r in deleted),
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO scorecards (round_id, holes) VALUES (?, ?)",
+            ((r[0], r[6]) for r in deleted if r[6] is not None),
+        )
+        cursor.execute(
+            "INSERT OR IGNORE INTO attachments (round_id, sha256, name, added) "
+            "SELECT round_id, sha256, name, added FROM undo_attachments WHERE batch_id = ?",
+            (batch_id,),
+        )
+        self.conn.executemany(
+            "UPDATE scores SET course = ?, date = ?, cost = ?, score = ? WHERE id = ?",
+            ((r[2], r[3], r[4], r[5], r[0]) for r in updated),
+        )
+
+        cursor.execute("DELETE FROM undo_journal WHERE batch_id = ?", (batch_id,))
+        cursor.execute("DELETE FROM undo_attachments WHERE batch_id = ?", (batch_id,))
+        cursor.execute("DELETE FROM undo_batches WHERE id = ?", (batch_id,))
+        dates = [r[3] for r in rows if r[3] is not None]
+        return label, (min(dates) if dates else None)
@@ -0,0 +1,272 @@
+"""
+Filter strings and round queries shared by the GUI and the headless tools.
+
+A filter is a space separated list of terms, all of which must match:
+
+    pebble                      course name contains "pebble"
+    2024  2024-06  2024-06-15   played in that year / month / day
+    course:pebble  course:"pebble beach"  course="Pebble Beach" (exact)
+    year:2024  year:2022..2024  year>=2023
+    date:2024-03..2024-06  date<2024-07-01
+    score<80  score:70..79  cost>=100  cost:50
+
+Bare words that are not dates are joined into one course term, so the
+old single-value filters mean what they always did.  compile_filter turns
+the terms into a WHERE clause on ``scores`` plus its parameters; every
+predicate is written so that it can be answered from an index (date
+ranges rather than strftime(), course names looked up in the course
+index), and check_plans verifies that against a real database.
+"""
+import argparse
+import re
+import sqlite3
+from datetime import date, timedelta
+
+FIELDS = ("course", "year", "date", "score", "cost")
+
+# field, operator and value; a term without a known operator is a bare word
+_TERM = re.compile(r'(?:([A-Za-z]+)(:|<=|>=|<|>|=))?("[^"]*"?|\S+)')
+_DATE = re.compile(r"^\d{4}(-\d{2}(-\d{2})?)?$")
+
+# Indexes the compiled predicates rely on (the handicap and archive tables create the date one too)
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_scores_date ON scores (date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_scores_course ON scores (course)",
+    "CREATE INDEX IF NOT EXISTS idx_scores_score ON scores (score)",
+    "CREATE INDEX IF NOT EXISTS idx_scores_cost ON scores (cost)",
+)
+
+# One filter per kind of predicate, for check_plans
+PLAN_CHECKS = (
+    "pebble", "course:\"pebble beach\"", 'course="Pebble Beach"',
+    "2024", "2024-06", "2024-06-15", "year:2022..2024", "year>=2023", "date<2024-07-01",
+    "score<80", "score:70..79", "score=72", "cost>=100", "cost:50..",
+)
+
+
+class FilterError(ValueError):
+    """A filter string that cannot be understood; the message says why."""
+
+
+def install_indexes(conn):
+    """Create the indexes filters use, if missing (caller commits)."""
+    for sql in INDEXES:
+        conn.execute(sql)
+
+
+# --- Compiling ---
+def _date_bounds(text):
+    """[start, end) date strings covering a yyyy, yyyy-mm or yyyy-mm-dd prefix."""
+    if not _DATE.match(text):
+        raise FilterError(f"{text!r} is not a date (use yyyy, yyyy-mm or yyyy-mm-dd)")
+    parts = [int(p) for p in text.split("-")]
+    if len(parts) == 1:
+        return f"{parts[0]:04d}-01-01", f"{parts[0] + 1:04d}-01-01"
+    if len(parts) == 2:
+        year, month = parts
+        if not 1 <= month <= 12:
+            raise FilterError(f"{text!r} is not a month")
+        following = f"{year + 1:04d}-01" if month == 12 else f"{year:04d}-{month + 1:02d}"
+        return f"{year:04d}-{month:02d}-01", following + "-01"
+    try:
+        day = date.fromisoformat(text)
+    except ValueError:
+        raise FilterError(f"{text!r} is not a date")
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
+def _split_range(field, value):
+    """(low, high) of a "a..b" value; either side may be empty, a plain value is both."""
+    if ".." in value:
+        low, high = value.split("..", 1)
+        if not low and not high:
+            raise FilterError(f"{field}: a range needs at least one end")
+        return low or None, high or None
+    return value, value
+
+
+def _date_term(field, op, value):
+    if field == "year" and not all(re.match(r"^\d{4}$", v) for v in value.split("..") if v):
+        raise FilterError(f"year: {value!r} is not a year")
+    if op == ":":
+        low, high = _split_range(field, value)
+        conditions, params = [], []
+        if low is not None:
+            conditions.append("date >= ?")
+            params.append(_date_bounds(low)[0])
+        if high is not None:
+            conditions.append("date < ?")
+            params.append(_date_bounds(high)[1])
+        return conditions, params
+    start, end = _date_bounds(value)
+    if op == "=":
+        return ["date >= ?", "date < ?"], [start, end]
+    return {
+        "<": (["date < ?"], [start]),
+        "<=": (["date < ?"], [end]),
+        ">": (["date >= ?"], [end]),
+        ">=": (["date >= ?"], [start]),
+    }[op]
+
+
+def _number(field, text):
+    try:
+        return int(text) if re.match(r"^-?\d+$", text) else float(text)
+    except ValueError:
+        raise FilterError(f"{field}: {text!r} is not a number")
+
+
+def _number_term(field, op, value):
+    if op == ":":
+        low, high = _split_range(field, value)
+        conditions, params = [], []
+        if low is not None and low == high:
+            return [f"{field} = ?"], [_number(field, low)]
+        if low is not None:
+            conditions.append(f"{field} >= ?")
+            params.append(_number(field, low))
+        if high is not None:
+            conditions.append(f"{field} <= ?")
+            params.append(_number(field, high))
+        return conditions, params
+    return [f"{field} {op} ?"], [_number(field, value)]
+
+
+def _course_term(op, value):
+    # The matching names are looked up once in the course index (a covering
+    # scan of the distinct names); the rounds are then fetched by name.
+    if op == "=":
+        match, param = "course = ? COLLATE NOCASE", value
+    elif op == ":":
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        match, param = "course LIKE ? ESCAPE '\\'", f"%{escaped}%"
+    else:
+        raise FilterError(f"course{op}{value}: course only supports ':' (contains) and '=' (exact)")
+    return [f"course IN (SELECT DISTINCT course FROM scores WHERE {match})"], [param]
+
+
+def _compile(filter_text):
+    """([condition], [param]) for a filter string, one parameter per condition."""
+    conditions, params, words = [], [], []
+    for field, op, value in _TERM.findall((filter_text or "").strip()):
+        if value.startswith('"'):
+            if len(value) < 2 or not value.endswith('"'):
+                raise FilterError(f"Unclosed quote in {value!r}")
+            value = value[1:-1]
+        field = field.lower()
+        if not field:
+            if _DATE.match(value):
+                term = _date_term("date", "=", value)
+            elif re.match(r"^[A-Za-z]+(:|[<>]=?|=)$", value):
+                raise FilterError(f"{value} needs a value")
+            else:
+                words.append(value)
+                continue
+        elif field not in FIELDS:
+            raise FilterError(f"Unknown field {field!r}; use one of: {', '.join(FIELDS)}")
+        elif not value:
+            raise FilterError(f"{field}{op} needs a value")
+        elif field == "course":
+            term = _course_term(op, value)
+        elif field in ("year", "date"):
+            term = _date_term(field, op, value)
+        else:
+            term = _number_term(field, op, value)
+        conditions += term[0]
+        params += term[1]
+    if words:
+        term = _course_term(":", " ".join(words))
+        conditions = term[0] + conditions
+        params = term[1] + params
+    return conditions, params
+
+
+def compile_filter(filter_text):
+    """
+    WHERE clause (" WHERE ..." or "") and params for a filter string.
+    Raises FilterError for anything it cannot parse.
+    """
+    conditions, params = _compile(filter_text)
+    if not conditions:
+        return "", ()
+    return " WHERE " + " AND ".join(conditions), tuple(params)
+
+
+def date_range(filter_text):
+    """
+    (start, end) dates the filter limits rounds to, start inclusive and end
+    exclusive, either None when unbounded; used to pick archive partitions.
+    """
+    conditions, params = _compile(filter_text)
+    start = end = None
+    for condition, param in zip(conditions, params):
+        if condition == "date >= ?":
+            start = param if start is None else max(start, param)
+        elif condition == "date < ?":
+            end = param if end is None else min(end, param)
+    return start, end
+
+
+def check_plans(conn, filters=PLAN_CHECKS):
+    """
+    (filter, plan step) pairs for every step of a filtered query that scans
+    ``scores`` row by row; empty when every predicate is index-backed.  The
+    only scan allowed is of a covering index, as for the course name lookup,
+    which never reads the table itself.
+    """
+    problems = []
+    for filter_text in filters:
+        where_clause, params = compile_filter(filter_text)
+        cursor = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM scores" + where_clause, params)
+        for row in cursor.fetchall():
+            detail = row[-1]
+            if re.match(r"^SCAN (TABLE )?scores\b", detail) and "USING COVERING INDEX" not in detail:
+                problems.append((filter_text, detail))
+    return problems
+
+
+def count_rounds(conn, where_clause="", params=()):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM scores" + where_clause, params)
+    return cursor.fetchone()[0]
+
+
+def rounds_cursor(conn, where_clause="", params=(), limit=None, offset=0):
+    """An executed cursor over (id, course, date, cost, score) rows in date order."""
+    sql = (
+        "SELECT id, course, date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
+        "FROM scores" + where_clause + " ORDER BY date ASC, id ASC"
+    )
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params = tuple(params) + (int(limit), int(offset))
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    return cursor
+
+
+def load_rounds(conn, where_clause="", params=(), limit=None, offset=0):
+    """(id, course, date, cost, score) rows in date order, optionally one page of them."""
+    return rounds_cursor(conn, where_clause, params, limit, offset).fetchall()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the SQL a Golf Tracker filter compiles to.")
+    parser.add_argument("filter", nargs="?", help="filter text; omit with --check-plans")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--check-plans", action="store_true",
+                        help="check that every kind of filter predicate is answered from an index "
+                             "(exit status 1 if any scans the table)")
+    args = parser.parse_args()
+
+    if args.check_plans:
+        conn = sqlite3.connect(args.db)
+        install_indexes(conn)
+        conn.commit()
+        problems = check_plans(conn)
+        for filter_text, detail in problems:
+            print(f"{filter_text}: {detail}")
+        print(f"{len(PLAN_CHECKS) - len({f for f, _ in problems})}/{len(PLAN_CHECKS)} filters index-backed")
+        raise SystemExit(1 if problems else 0)
+    where_clause, params = compile_filter(args.filter)
+    print("SELECT ... FROM scores" + where_clause)
+    print(params)
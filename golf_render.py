@@ -0,0 +1,207 @@
+"""
+Headless batch rendering of chart packs (PNG / SVG), without Qt.
+
+Every (chart type x filter) cell is prepared in the calling process with
+golf_charts.chart_data and hashed.  Cells whose hash matches the one
+recorded in the output directory's manifest are skipped; the rest are
+drawn on Agg figures by a ProcessPoolExecutor.  File names are
+deterministic, so a pack can be re-rendered in place:
+
+    <chart type>__<filter slug or "all">.<format>
+
+Run from the command line:
+
+    python golf_render.py OUT_DIR [--db golf_scores.db] [--format png svg] [--by-course]
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from golf_charts import CHART_TYPES, CHART_FIG_BG, CHART_AX_BG, DEFAULT_OPTIONS, chart_data, draw_chart
+
+# Bump when drawing changes, so existing packs are re-rendered
+RENDER_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+FORMATS = ("png", "svg")
+FIGURE_SIZE = (10, 6)
+DPI = 100
+
+
+def filter_slug(filter_text):
+    """File name part for a filter: "Pebble Beach" -> "pebble-beach", none -> "all"."""
+    if not filter_text:
+        return "all"
+    slug = re.sub(r"[^a-z0-9]+", "-", filter_text.lower()).strip("-")
+    return slug or "filter-" + hashlib.sha1(filter_text.encode("utf-8")).hexdigest()[:8]
+
+
+def chart_file_name(chart_type, filter_text, fmt):
+    return f"{chart_type}__{filter_slug(filter_text)}.{fmt}"
+
+
+def default_filters(conn, by_course=False):
+    """All rounds, each year played and optionally each course."""
+    filters = [None]
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT substr(date, 1, 4) FROM scores WHERE date IS NOT NULL ORDER BY 1")
+    filters += [row[0] for row in cursor.fetchall() if row[0] and row[0].isdigit()]
+    if by_course:
+        cursor.execute("SELECT DISTINCT course FROM scores WHERE course IS NOT NULL AND course != '' ORDER BY 1")
+        filters += [row[0] for row in cursor.fetchall()]
+    return filters
+
+
+# --- Content hash ---
+def _feed(digest, value):
+    """Feed a chart_data value into a hash, independent of dict order."""
+    if isinstance(value, np.ndarray):
+        digest.update(f"A{value.dtype.str}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"D")
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"L{len(value)}".encode())
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, np.generic):
+        _feed(digest, value.item())
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def data_hash(chart_type, data, options):
+    digest = hashlib.sha256()
+    _feed(digest, (RENDER_VERSION, chart_type, options, CHART_FIG_BG, CHART_AX_BG, FIGURE_SIZE, DPI))
+    _feed(digest, data)
+    return digest.hexdigest()
+
+
+# --- Worker ---
+def render_job(job):
+    """Draw one chart to every requested format (runs in a worker process)."""
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # Fixed SVG element ids, so unchanged charts give identical files
+    matplotlib.rcParams["svg.hashsalt"] = "golf-tracker"
+
+    fig = Figure(figsize=FIGURE_SIZE, dpi=DPI, facecolor=CHART_FIG_BG)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.set_facecolor(CHART_AX_BG)
+    draw_chart(ax, job["chart_type"], job["data"], job["options"])
+    if job["filter"]:
+        title = ax.get_title()
+        ax.set_title(f"{title} ({job['filter']})" if title else job["filter"])
+    fig.tight_layout()
+
+    written = []
+    for fmt, path in job["paths"].items():
+        # ...and no timestamps in the metadata
+        metadata = {"Date": None} if fmt == "svg" else {"Software": None}
+        fig.savefig(path, format=fmt, facecolor=fig.get_facecolor(), metadata=metadata)
+        written.append(path)
+    return written
+
+
+# --- Driver ---
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def render_all(db_path, out_dir, chart_types=None, filters=None, formats=("png",), options=None,
+               workers=None, force=False, by_course=False, progress=None):
+    """
+    Render every chart type for every filter into out_dir.
+    Returns (files written, charts skipped because their data was unchanged).
+    progress, if given, is called as progress(done, total).
+    """
+    chart_types = list(chart_types or CHART_TYPES)
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported format(s): {', '.join(unknown)}")
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Aggregation happens here, on one connection; workers only draw
+    conn = sqlite3.connect(db_path)
+    try:
+        if filters is None:
+            filters = default_filters(conn, by_course)
+        manifest = _load_manifest(out_dir)
+        jobs = []
+        skipped = 0
+        for filter_text in filters:
+            for chart_type in chart_types:
+                data = chart_data(conn, chart_type, filter_text, options)
+                if data is None:
+                    raise ValueError(f"Unknown chart type: {chart_type}")
+                paths = {fmt: os.path.join(out_dir, chart_file_name(chart_type, filter_text, fmt)) for fmt in formats}
+                key = os.path.basename(next(iter(paths.values()))).rsplit(".", 1)[0]
+                digest = data_hash(chart_type, data, options)
+                if not force and manifest.get(key) == digest and all(os.path.exists(p) for p in paths.values()):
+                    skipped += 1
+                    continue
+                jobs.append({
+                    "key": key, "hash": digest, "chart_type": chart_type, "filter": filter_text,
+                    "data": data, "options": options, "paths": paths,
+                })
+    finally:
+        conn.close()
+
+    written = []
+    if jobs:
+        # spawn, not fork: the GUI calls this from a thread of a running Qt process
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {pool.submit(render_job, job): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                written += future.result()
+                manifest[job["key"]] = job["hash"]
+                if progress:
+                    progress(done, len(jobs))
+        _save_manifest(out_dir, manifest)
+    return written, skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render Golf Tracker chart packs.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--chart", action="append", choices=list(CHART_TYPES), help="chart type (repeatable)")
+    parser.add_argument("--filter", action="append", help="filter text (repeatable); default: all + each year")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["png"])
+    parser.add_argument("--by-course", action="store_true", help="also render one set per course")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--force", action="store_true", help="re-render unchanged charts")
+    args = parser.parse_args()
+
+    files, skipped = render_all(
+        args.db, args.out_dir, args.chart, args.filter, args.format,
+        workers=args.workers, force=args.force, by_course=args.by_course,
+    )
+    print(f"Wrote {len(files)} file(s); {skipped} chart(s) unchanged.")
@@ -0,0 +1,266 @@
+"""
+Multi-page PDF season / course reports.
+
+A report is one summary page (the stats bar numbers plus per-course and
+per-month tables), the course bar charts, the trend and distribution
+plots, and every matching round as a paginated table:
+
+    build_report("golf_scores.db", "season_2024.pdf", season=2024)
+
+The summary and chart sections are aggregated concurrently on a thread
+pool, each thread with its own read connection (SQLite and NumPy release
+the GIL while they work); pages are then drawn in order into one PdfPages
+file.  The rounds table is streamed from the cursor one page at a time and
+each page's figure is dropped once written, so memory stays flat however
+many rounds match.
+"""
+import argparse
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import matplotlib
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+
+from golf_analytics import load_columns, summarize, course_breakdown, month_breakdown
+from golf_charts import CHART_FIG_BG, CHART_AX_BG, DEFAULT_OPTIONS, chart_data, draw_chart
+from golf_handicap import handicap_history
+from golf_scorecard import load_scorecards, scorecard_stats
+
+PAGE_SIZE = (11, 8.5)        # US letter, landscape (inches)
+ROWS_PER_COLUMN = 50         # the rounds table is printed two columns per page
+TABLE_FONT_SIZE = 7.5
+CHART_SECTIONS = ("average_score", "rounds_per_course", "best_score", "trend", "distribution")
+SECTION_WORKERS = 4
+
+
+def report_scope(season=None, course=None):
+    """(title, where_clause, params) for a season and/or course report."""
+    conditions, params, parts = [], [], []
+    if season:
+        # A date range rather than strftime() so the date index is used
+        conditions.append("date >= ? AND date < ?")
+        params += [f"{int(season):04d}-01-01", f"{int(season) + 1:04d}-01-01"]
+        parts.append(f"{int(season)} Season")
+    if course:
+        conditions.append("course = ?")
+        params.append(course)
+        parts.append(course)
+    where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return " - ".join(parts) or "All Rounds", where_clause, tuple(params)
+
+
+# --- Section data (runs on worker threads) ---
+def _summary_data(conn, where_clause, params):
+    cols = load_columns(conn, where_clause, params)
+    history = handicap_history(conn, where_clause, params)
+    return {
+        "summary": summarize(cols),
+        "courses": course_breakdown(cols),
+        "months": month_breakdown(cols),
+        "cards": scorecard_stats(load_scorecards(conn, where_clause, params)),
+        "handicap": history[-1][2] if history else None,
+    }
+
+
+def _section_data(db_path, section, where, options):
+    conn = sqlite3.connect(db_path)
+    try:
+        if section == "summary":
+            return _summary_data(conn, *where)
+        return chart_data(conn, section, options=options, where=where)
+    finally:
+        conn.close()
+
+
+# --- Pages ---
+def _new_page():
+    return Figure(figsize=PAGE_SIZE, facecolor="white")
+
+
+def _page_header(fig, title, subtitle, page_number):
+    fig.text(0.05, 0.95, title, fontsize=16, fontweight="bold", va="top")
+    fig.text(0.05, 0.915, subtitle, fontsize=10, color="#555555", va="top")
+    fig.text(0.95, 0.03, f"Page {page_number}", fontsize=8, color="#555555", ha="right")
+
+
+class _TextLines(Artist):
+    """
+    Fixed-pitch lines drawn straight to the renderer.  A Text artist measures
+    every character of every line before drawing it, which dominates the
+    time of a long rounds table; monospaced rows need no measuring.
+    """
+
+    def __init__(self, x, y, lines, fontsize=TABLE_FONT_SIZE, linespacing=1.25):
+        super().__init__()
+        self.x, self.y = x, y              # top left, in figure coordinates
+        self.lines = lines
+        self.linespacing = linespacing
+        self.prop = FontProperties(family="monospace", weight="medium", size=fontsize)
+
+    def draw(self, renderer):
+        gc = renderer.new_gc()
+        gc.set_foreground("black")
+        x, y = self.figure.transFigure.transform((self.x, self.y))
+        step = renderer.points_to_pixels(self.prop.get_size_in_points() * self.linespacing)
+        if renderer.flipy():
+            # Raster backends measure y from the top
+            y, step = renderer.get_canvas_width_height()[1] - y, -step
+        for i, line in enumerate(self.lines, 1):
+            renderer.draw_text(gc, x, y - i * step, line, self.prop, 0)
+        gc.restore()
+
+
+def _text_columns(fig, top, columns, rows, fontsize=9):
+    """
+    Draw a table as one multi-line text object per column; a few text
+    artists per page instead of one per cell keeps large reports fast.
+    columns is [(heading, x, align)], rows are tuples of strings.
+    """
+    for i, (heading, x, align) in enumerate(columns):
+        lines = [heading, "-" * len(heading)] + [row[i] for row in rows]
+        fig.text(x, top, "\n".join(lines), fontsize=fontsize, family="monospace",
+                 ha=align, va="top", linespacing=1.35)
+
+
+def _summary_page(fig, data):
+    summary, cards = data["summary"], data["cards"]
+
+    def fmt(value, spec, prefix=""):
+        return "--" if value is None else f"{prefix}{value:{spec}}"
+
+    metrics = [
+        ("Total Rounds", str(summary["rounds"])),
+        ("Total Cost", fmt(summary["total_cost"], ",.0f", "$")),
+        ("Avg Cost", fmt(summary["avg_cost"], ",.0f", "$")),
+        ("Avg Score", fmt(summary["avg_score"], ".1f")),
+        ("Lowest Score", fmt(summary["best"], "")),
+        ("Highest Score", fmt(summary["worst"], "")),
+        ("Median", fmt(summary["p50"], ".0f")),
+        ("Std Dev", fmt(summary["std"], ".1f")),
+        ("P10-P90", "--" if summary["p10"] is None else f"{summary['p10']:.0f}-{summary['p90']:.0f}"),
+        ("$/Stroke", fmt(summary["cost_per_stroke"], ".2f", "$")),
+        ("Handicap Index", fmt(data["handicap"], ".1f")),
+    ]
+    if cards["holes"]:
+        metrics += [
+            ("Avg Putts", f"{cards['putts_avg']:.1f}"),
+            ("FIR", fmt(cards["fairway_pct"], ".0f") + ("%" if cards["fairway_pct"] is not None else "")),
+            ("GIR", f"{cards['gir_pct']:.0f}%"),
+        ]
+    _text_columns(fig, 0.85, [("Metric", 0.05, "left"), ("Value", 0.30, "right")], metrics, fontsize=10)
+
+    courses = [
+        (course[:28], str(n), f"{avg:.1f}", str(best), fmt(avg_cost, ",.0f", "$"))
+        for course, n, avg, best, avg_cost in data["courses"][:30]
+    ]
+    _text_columns(fig, 0.85, [
+        ("Course", 0.36, "left"), ("Rounds", 0.66, "right"), ("Avg", 0.72, "right"),
+        ("Best", 0.78, "right"), ("Avg $", 0.86, "right"),
+    ], courses)
+    if len(data["courses"]) > 30:
+        fig.text(0.36, 0.08, f"... {len(data['courses']) - 30} more courses", fontsize=8)
+
+    months = [(m, str(n), f"{avg:.1f}", f"${cost:,.0f}") for m, n, avg, cost in data["months"][-12:]]
+    _text_columns(fig, 0.45, [
+        ("Month", 0.05, "left"), ("Rounds", 0.19, "right"), ("Avg", 0.24, "right"), ("Cost", 0.31, "right"),
+    ], months)
+
+
+def _chart_page(fig, chart_type, data, options):
+    fig.set_facecolor(CHART_FIG_BG)
+    ax = fig.add_axes([0.08, 0.12, 0.84, 0.70])
+    ax.set_facecolor(CHART_AX_BG)
+    draw_chart(ax, chart_type, data, options)
+
+
+def _round_pages(pdf, conn, title, where_clause, params, first_page):
+    """Stream the matching rounds into table pages; returns the number of pages written."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM scores" + where_clause, params)
+    total = cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT date, course, CAST(score AS INTEGER), CAST(cost AS INTEGER) FROM scores"
+        + where_clause + " ORDER BY date, id",
+        params,
+    )
+
+    heading = f"{'Date':<11}{'Course':<27}{'Score':>5}{'Cost':>7}"
+    pages = 0
+    shown = 0
+    # Core (unembedded) PDF fonts: no glyph subsetting per page.  They come in
+    # medium and bold only, hence the default weight.
+    with matplotlib.rc_context({"pdf.use14corefonts": True, "font.weight": "medium"}):
+        while True:
+            rows = cursor.fetchmany(2 * ROWS_PER_COLUMN)
+            if not rows:
+                break
+            fig = _new_page()
+            _page_header(fig, title, f"Rounds {shown + 1}-{shown + len(rows)} of {total}", first_page + pages)
+            lines = [
+                f"{d or '':<11}{(c or '')[:26]:<27}{'' if s is None else s:>5}"
+                f"{'' if cost is None else '$' + str(cost):>7}"
+                for d, c, s, cost in rows
+            ]
+            for x, block in ((0.05, lines[:ROWS_PER_COLUMN]), (0.52, lines[ROWS_PER_COLUMN:])):
+                if block:
+                    fig.add_artist(_TextLines(x, 0.88, [heading, "-" * len(heading)] + block))
+            pdf.savefig(fig)
+            shown += len(rows)
+            pages += 1
+    return pages
+
+
+def build_report(db_path, path, season=None, course=None, options=None, progress=None):
+    """
+    Write the PDF report for a season and/or course to path; returns the page count.
+    progress, if given, is called as progress(done, total) as each section is written.
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    title, where_clause, params = report_scope(season, course)
+    subtitle = f"Golf Tracker report generated {date.today():%Y-%m-%d}"
+    where = (where_clause, params)
+    sections = ("summary",) + CHART_SECTIONS
+
+    with ThreadPoolExecutor(max_workers=SECTION_WORKERS) as pool, \
+            PdfPages(path, metadata={"Title": f"Golf Tracker - {title}"}) as pdf:
+        futures = [pool.submit(_section_data, db_path, section, where, options) for section in sections]
+
+        # Pages go out in section order as each section's data arrives
+        page = 1
+        for done, (section, future) in enumerate(zip(sections, futures), 1):
+            data = future.result()
+            fig = _new_page()
+            if section == "summary":
+                _summary_page(fig, data)
+            else:
+                _chart_page(fig, section, data, options)
+            _page_header(fig, title, subtitle, page)
+            pdf.savefig(fig, facecolor=fig.get_facecolor())
+            page += 1
+            if progress:
+                progress(done, len(sections) + 1)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            page += _round_pages(pdf, conn, title, where_clause, params, page)
+            if progress:
+                progress(len(sections) + 1, len(sections) + 1)
+        finally:
+            conn.close()
+    return page - 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a Golf Tracker PDF report.")
+    parser.add_argument("path")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--season", type=int, help="year, e.g. 2024")
+    parser.add_argument("--course", help="exact course name")
+    args = parser.parse_args()
+
+    pages = build_report(args.db, args.path, args.season, args.course)
+    print(f"Wrote {pages} page(s) to {args.path}")
@@ -0,0 +1,208 @@
+"""
+Compact in-memory store for rounds.
+
+A list of (id, course, date, cost, score) tuples costs a few hundred bytes
+per round: the tuple, a boxed int per number and a str per date.  A
+RoundStore keeps each column in a typed ``array('i')`` instead (id, date
+as a proleptic Gregorian ordinal, cost, score, and an index into a table
+of interned course names), which is 20 bytes per round, so ten million
+rounds fit in about 200 MB:
+
+    store = RoundStore.load(conn, *compile_filter("2024"))
+    for r in store:
+        print(r.date, r.course, r.score)
+    print(f"{store.bytes_per_round():.1f} bytes/round")
+
+Rows are read back through RoundView objects (``__slots__``, created on
+access), so nothing per round is boxed until it is looked at.  A store is
+given a memory budget; loading stops at the budget and sets ``truncated``.
+"""
+import argparse
+import sqlite3
+import sys
+from array import array
+from datetime import date
+
+from golf_query import compile_filter, rounds_cursor
+
+# Stands for NULL in the integer columns
+MISSING = -2 ** 31
+
+DEFAULT_BUDGET_MB = 256
+FETCH_ROWS = 5000
+
+
+class RoundView:
+    """One round of a RoundStore, read on demand."""
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+
+    @property
+    def id(self):
+        return self._store.ids[self._i]
+
+    @property
+    def course(self):
+        return self._store.course_names[self._store.course_ids[self._i]]
+
+    @property
+    def date(self):
+        return self._store.date_text(self._i)
+
+    @property
+    def cost(self):
+        value = self._store.costs[self._i]
+        return None if value == MISSING else value
+
+    @property
+    def score(self):
+        value = self._store.scores[self._i]
+        return None if value == MISSING else value
+
+    def as_tuple(self):
+        """(id, course, date, cost, score), the row shape load_rounds returns."""
+        return self.id, self.course, self.date, self.cost, self.score
+
+    def __repr__(self):
+        return f"RoundView{self.as_tuple()!r}"
+
+
+class RoundStore:
+    """Column arrays for a set of rounds, in the order they were added."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.ids = array("i")
+        self.dates = array("i")        # date.toordinal(), MISSING if absent or irregular
+        self.costs = array("i")
+        self.scores = array("i")
+        self.course_ids = array("i")
+        self.course_names = []         # course id -> name (None allowed)
+        self._course_index = {}
+        self.irregular_dates = {}      # row -> date text that does not round-trip as yyyy-mm-dd
+        self.truncated = False         # rounds were left out to stay within the budget
+
+    @classmethod
+    def load(cls, conn, where_clause="", params=(), budget_mb=DEFAULT_BUDGET_MB):
+        """Stream the rounds matching where_clause (in date order) into a new store."""
+        store = cls(budget_mb)
+        cursor = rounds_cursor(conn, where_clause, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            if not store.extend(rows):
+                store.truncated = cursor.fetchone() is not None
+                break
+        return store
+
+    def intern_course(self, name):
+        course_id = self._course_index.get(name)
+        if course_id is None:
+            course_id = self._course_index[name] = len(self.course_names)
+            self.course_names.append(name)
+        return course_id
+
+    def _ordinal(self, i, date_text):
+        """date_text as stored for row i; text that is not a plain yyyy-mm-dd date is kept aside."""
+        ordinal = MISSING
+        if date_text:
+            try:
+                day = date.fromisoformat(date_text)
+                if day.isoformat() == date_text:
+                    ordinal = day.toordinal()
+            except (TypeError, ValueError):
+                pass
+        self.irregular_dates.pop(i, None)
+        if ordinal == MISSING and date_text is not None:
+            self.irregular_dates[i] = date_text
+        return ordinal
+
+    def course_id(self, name):
+        """Id of an interned course name, or None if no round has had it."""
+        return self._course_index.get(name)
+
+    def append(self, round_id, course, date_text, cost, score):
+        self.dates.append(self._ordinal(len(self.ids), date_text))
+        self.ids.append(round_id)
+        self.costs.append(MISSING if cost is None else cost)
+        self.scores.append(MISSING if score is None else score)
+        self.course_ids.append(self.intern_course(course))
+
+    # --- Patching (the owner mirrors single-round edits instead of reloading) ---
+    def index_of(self, round_id):
+        """Row of a round, or None if the store does not hold it."""
+        try:
+            return self.ids.index(round_id)
+        except ValueError:
+            return None
+
+    def replace(self, i, round_id, course, date_text, cost, score):
+        self.ids[i] = round_id
+        self.dates[i] = self._ordinal(i, date_text)
+        self.costs[i] = MISSING if cost is None else cost
+        self.scores[i] = MISSING if score is None else score
+        self.course_ids[i] = self.intern_course(course)
+
+    def remove(self, i):
+        for column in (self.ids, self.dates, self.costs, self.scores, self.course_ids):
+            del column[i]
+        if self.irregular_dates:
+            self.irregular_dates = {j - (j > i): text for j, text in self.irregular_dates.items() if j != i}
+
+    def extend(self, rows):
+        """Add (id, course, date, cost, score) rows; returns False once over budget."""
+        for row in rows:
+            self.append(*row)
+        return self.nbytes() <= self.budget_bytes
+
+    def date_text(self, i):
+        ordinal = self.dates[i]
+        if ordinal == MISSING:
+            return self.irregular_dates.get(i)
+        return date.fromordinal(ordinal).isoformat()
+
+    # --- Size ---
+    def nbytes(self):
+        """Memory held by the store, measured (arrays include their spare capacity)."""
+        size = sum(sys.getsizeof(a) for a in (self.ids, self.dates, self.costs, self.scores, self.course_ids))
+        size += sys.getsizeof(self.course_names) + sys.getsizeof(self._course_index)
+        size += sum(sys.getsizeof(name) for name in self.course_names)
+        size += sys.getsizeof(self.irregular_dates)
+        size += sum(sys.getsizeof(text) for text in self.irregular_dates.values())
+        return size
+
+    def bytes_per_round(self):
+        return self.nbytes() / len(self) if len(self) else 0.0
+
+    # --- Sequence ---
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("round index out of range")
+        return RoundView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield RoundView(self, i)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load rounds into a RoundStore and report its size.")
+    parser.add_argument("filter", nargs="?", default="")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("--budget-mb", type=float, default=DEFAULT_BUDGET_MB)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    store = RoundStore.load(conn, *compile_filter(args.filter), budget_mb=args.budget_mb)
+    print(f"{len(store)} round(s), {len(store.course_names)} course(s), "
+          f"{store.nbytes() / 1024 / 1024:.1f} MB, {store.bytes_per_round():.1f} bytes/round"
+          + (" (stopped at the memory budget)" if store.truncated else ""))
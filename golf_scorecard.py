@@ -0,0 +1,147 @@
+"""
+Hole-by-hole scorecards stored as fixed-width packed records.
+
+A round's detail is one 72 byte BLOB (18 holes x 4 bytes) in the
+``scorecards`` table instead of 18+ separate rows.  Each hole is packed as:
+
+    par (uint8) | strokes (uint8) | putts (uint8) | flags (uint8)
+
+A stroke count of 0 means the hole was not played (e.g. a 9 hole round).
+Analytics decode many records at once with NumPy, so per-hole averages
+over 100k rounds are a handful of array operations.
+"""
+import numpy as np
+
+HOLES = 18
+FIELDS = 4                      # par, strokes, putts, flags
+RECORD_SIZE = HOLES * FIELDS    # bytes per round
+
+PAR, STROKES, PUTTS, FLAGS = range(FIELDS)
+
+FLAG_FAIRWAY = 0x01      # fairway hit
+FLAG_GIR = 0x02          # green in regulation
+FLAG_NO_FAIRWAY = 0x04   # no fairway to hit (par 3s)
+
+DEFAULT_PARS = [4, 4, 3, 4, 5, 4, 3, 4, 5, 4, 4, 3, 4, 5, 4, 3, 4, 5]
+
+# Buckets for the scoring distribution chart, keyed by strokes relative to par
+DISTRIBUTION_LABELS = ["Eagle-", "Birdie", "Par", "Bogey", "Double", "Triple+"]
+
+
+def pack_scorecard(holes):
+    """
+    Pack a list of 18 (par, strokes, putts, fairway, gir) tuples into bytes.
+    ``fairway`` may be None when the hole has no fairway to hit.
+    """
+    if len(holes) != HOLES:
+        raise ValueError(f"A scorecard needs {HOLES} holes, got {len(holes)}")
+
+    record = bytearray(RECORD_SIZE)
+    for i, (par, strokes, putts, fairway, gir) in enumerate(holes):
+        flags = 0
+        if fairway is None:
+            flags |= FLAG_NO_FAIRWAY
+        elif fairway:
+            flags |= FLAG_FAIRWAY
+        if gir:
+            flags |= FLAG_GIR
+        # bytearray rejects anything outside 0..255 with a ValueError
+        record[i * FIELDS:(i + 1) * FIELDS] = bytes((int(par), int(strokes), int(putts), flags))
+    return bytes(record)
+
+
+def unpack_scorecard(blob):
+    """Inverse of pack_scorecard: returns 18 (par, strokes, putts, fairway, gir) tuples."""
+    if blob is None or len(blob) != RECORD_SIZE:
+        raise ValueError("Not a packed scorecard record")
+
+    holes = []
+    for i in range(HOLES):
+        par, strokes, putts, flags = blob[i * FIELDS:(i + 1) * FIELDS]
+        fairway = None if flags & FLAG_NO_FAIRWAY else bool(flags & FLAG_FAIRWAY)
+        holes.append((par, strokes, putts, fairway, bool(flags & FLAG_GIR)))
+    return holes
+
+
+def scorecard_total(blob):
+    """Total strokes for a packed record, or None if any hole is unplayed."""
+    strokes = np.frombuffer(blob, dtype=np.uint8).reshape(HOLES, FIELDS)[:, STROKES]
+    if (strokes == 0).any():
+        return None
+    return int(strokes.sum())
+
+
+def decode_records(blobs):
+    """
+    Decode many packed records in one go.
+    Returns a uint8 array of shape (rounds, 18, 4); malformed blobs are skipped.
+    """
+    good = [b for b in blobs if b is not None and len(b) == RECORD_SIZE]
+    if not good:
+        return np.zeros((0, HOLES, FIELDS), dtype=np.uint8)
+    return np.frombuffer(b"".join(good), dtype=np.uint8).reshape(len(good), HOLES, FIELDS)
+
+
+def load_scorecards(conn, where_clause="", params=()):
+    """Fetch and decode every scorecard whose round matches where_clause (on scores)."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT holes FROM scorecards WHERE round_id IN (SELECT id FROM scores" + where_clause + ")",
+        params,
+    )
+    return decode_records([row[0] for row in cursor.fetchall()])
+
+
+def scorecard_stats(cards):
+    """
+    Vectorized summary of decoded scorecards (see decode_records).
+    Every value is computed over played holes only.
+    """
+    stats = {
+        "rounds": len(cards),
+        "holes": 0,
+        "hole_avg": np.full(HOLES, np.nan),
+        "hole_par": np.zeros(HOLES),
+        "putts_avg": None,
+        "fairway_pct": None,
+        "gir_pct": None,
+        "par_avgs": {},
+        "distribution": np.zeros(len(DISTRIBUTION_LABELS), dtype=np.int64),
+    }
+    if len(cards) == 0:
+        return stats
+
+    par = cards[:, :, PAR].astype(np.int16)
+    strokes = cards[:, :, STROKES].astype(np.int16)
+    putts = cards[:, :, PUTTS].astype(np.int16)
+    flags = cards[:, :, FLAGS]
+    played = strokes > 0
+
+    holes_played = int(played.sum())
+    stats["holes"] = holes_played
+    if holes_played == 0:
+        return stats
+
+    # Per-hole averages (column-wise over rounds that played the hole)
+    per_hole_n = played.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats["hole_avg"] = np.where(per_hole_n > 0, (strokes * played).sum(axis=0) / per_hole_n, np.nan)
+        stats["hole_par"] = np.where(per_hole_n > 0, (par * played).sum(axis=0) / per_hole_n, 0)
+
+    stats["putts_avg"] = float(putts[played].sum()) / holes_played * HOLES
+
+    fairway_holes = played & ((flags & FLAG_NO_FAIRWAY) == 0)
+    if fairway_holes.any():
+        stats["fairway_pct"] = 100.0 * ((flags & FLAG_FAIRWAY) != 0)[fairway_holes].mean()
+    stats["gir_pct"] = 100.0 * ((flags & FLAG_GIR) != 0)[played].mean()
+
+    # Par 3/4/5 splits: average strokes on each hole type
+    for p in (3, 4, 5):
+        mask = played & (par == p)
+        if mask.any():
+            stats["par_avgs"][p] = float(strokes[mask].mean())
+
+    # Scoring distribution: eagle or better .. triple bogey or worse
+    to_par = np.clip(strokes[played] - par[played], -2, 3) + 2
+    stats["distribution"] = np.bincount(to_par, minlength=len(DISTRIBUTION_LABELS))
+    return stats
@@ -0,0 +1,231 @@
+"""
+Streaming quantile sketches of scores.
+
+A KLLSketch (Karnin, Lang and Liberty) keeps a few hundred of the values
+it has seen, in levels: items on level h stand for 2**h values each.
+When a level fills up it is sorted and every other item (from a random
+start) moves up a level, so the sketch stays small however many values
+are added, and any quantile is within about 1.7/k in rank of the exact
+one.  Two sketches merge by concatenating their levels and compacting,
+with the same guarantee.  Nothing is ever sorted beyond one level.
+
+CourseSketches keeps one sketch per course and merges them for the whole
+view, which is what the table's percentile bands are drawn from:
+
+    sketches = CourseSketches.from_store(store)
+    low, high = sketches.bands(10)              # best and worst 10% cut-offs
+    sketches.add("Pebble Beach", 78)
+
+KLL has no deletions: after a round is removed or edited its course is
+marked stale, and the owner re-sketches just that course from a store of
+the current rounds (``refresh``) before the next read.
+"""
+import argparse
+import random
+import sqlite3
+import sys
+
+import numpy as np
+
+from golf_query import compile_filter
+from golf_roundstore import MISSING, RoundStore
+
+DEFAULT_K = 200
+_C = 2 / 3      # each level is this much smaller than the one above it
+
+
+class KLLSketch:
+    """Approximate quantiles of a stream of numbers in O(k) memory."""
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [[]]
+        self._random = random.Random(seed)
+
+    def _capacity(self, h):
+        return max(2, int(self.k * _C ** (len(self.levels) - h - 1)) + 1)
+
+    def _size(self):
+        return sum(len(level) for level in self.levels)
+
+    def _full(self):
+        return self._size() > sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compress(self):
+        """Compact the lowest level over its capacity, until the sketch fits."""
+        while self._full():
+            for h, level in enumerate(self.levels):
+                if len(level) >= self._capacity(h):
+                    break
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            level.sort()
+            keep = [level.pop()] if len(level) % 2 else []   # odd one out stays behind
+            self.levels[h + 1].extend(level[self._random.getrandbits(1)::2])
+            self.levels[h] = keep
+
+    def update(self, value):
+        self.levels[0].append(value)
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def update_many(self, values):
+        """Add many values, a level's worth at a time."""
+        values = list(values)
+        step = max(self._capacity(0), 1)
+        for i in range(0, len(values), step):
+            chunk = values[i:i + step]
+            self.levels[0].extend(chunk)
+            self.n += len(chunk)
+            self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one (in place); returns self."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+        self.n += other.n
+        self._compress()
+        return self
+
+    # --- Queries ---
+    def _weighted(self):
+        """(value, weight) of every retained item, by value."""
+        return sorted((value, 1 << h) for h, level in enumerate(self.levels) for value in level)
+
+    def quantile(self, q):
+        """A value with about q of the values at or below it (None if empty)."""
+        if self.n == 0:
+            return None
+        items = self._weighted()
+        target = q * sum(weight for _v, weight in items)
+        seen = 0
+        for value, weight in items:
+            seen += weight
+            if seen >= target:
+                return value
+        return items[-1][0]
+
+    def rank(self, value):
+        """Estimated fraction of the values at or below value."""
+        if self.n == 0:
+            return 0.0
+        items = self._weighted()
+        total = sum(weight for _v, weight in items)
+        return sum(weight for v, weight in items if v <= value) / total
+
+    def retained(self):
+        return self._size()
+
+    def __len__(self):
+        return self.n
+
+
+def _known_scores(store):
+    """(scores, course ids) of a RoundStore's rounds that have a score, as numpy views."""
+    scores = np.frombuffer(store.scores, dtype=np.int32)
+    course_ids = np.frombuffer(store.course_ids, dtype=np.int32)
+    known = scores != MISSING
+    return scores[known], course_ids[known]
+
+
+class CourseSketches:
+    """A score sketch per course, merged on demand for all courses together."""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.courses = {}
+        self._overall = None
+        self.stale = set()      # courses a round was removed from or changed in; refresh to be exact again
+
+    @classmethod
+    def from_store(cls, store, k=DEFAULT_K):
+        """Sketch the scores of every round in a golf_roundstore.RoundStore, course by course."""
+        sketches = cls(k)
+        scores, course_ids = _known_scores(store)
+        # Group by course with one stable sort, then feed each course its slice
+        order = np.argsort(course_ids, kind="stable")
+        scores, course_ids = scores[order], course_ids[order]
+        bounds = np.flatnonzero(np.diff(course_ids)) + 1
+        for chunk_ids, chunk in zip(np.split(course_ids, bounds), np.split(scores, bounds)):
+            if len(chunk):
+                sketch = sketches._sketch(store.course_names[chunk_ids[0]])
+                sketch.update_many(chunk.tolist())
+        return sketches
+
+    @classmethod
+    def from_rows(cls, rows, k=DEFAULT_K):
+        """From (course, score) pairs."""
+        sketches = cls(k)
+        for course, score in rows:
+            sketches.add(course, score)
+        return sketches
+
+    def refresh(self, store):
+        """Re-sketch the stale courses from a store holding the current rounds; the rest are kept."""
+        if not self.stale:
+            return
+        scores, course_ids = _known_scores(store)
+        for course in self.stale:
+            self.courses.pop(course, None)
+            course_id = store.course_id(course)
+            if course_id is not None:
+                chunk = scores[course_ids == course_id]
+                if len(chunk):
+                    self._sketch(course).update_many(chunk.tolist())
+        self.stale = set()
+        self._overall = None
+
+    def remove(self, course):
+        """A round of course was removed or changed (KLL cannot take it out; see refresh)."""
+        self.stale.add(course)
+
+    def _sketch(self, course):
+        sketch = self.courses.get(course)
+        if sketch is None:
+            sketch = self.courses[course] = KLLSketch(self.k)
+        return sketch
+
+    def add(self, course, score):
+        if score is None or course in self.stale:   # the refresh will pick it up
+            return
+        self._sketch(course).update(score)
+        self._overall = None
+
+    def overall(self):
+        if self._overall is None:
+            self._overall = KLLSketch(self.k)
+            for sketch in self.courses.values():
+                self._overall.merge(sketch)
+        return self._overall
+
+    def bands(self, percent, course=None):
+        """
+        (low, high) score cut-offs of the best and worst percent of rounds,
+        overall or for one course; (None, None) without scores.
+        """
+        sketch = self.overall() if course is None else self.courses.get(course)
+        if sketch is None or len(sketch) == 0:
+            return None, None
+        return sketch.quantile(percent / 100), sketch.quantile(1 - percent / 100)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sketched score percentiles with exact ones.")
+    parser.add_argument("filter", nargs="?", default="")
+    parser.add_argument("--db", default="golf_scores.db")
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    args = parser.parse_args()
+
+    store = RoundStore.load(sqlite3.connect(args.db), *compile_filter(args.filter), budget_mb=sys.maxsize >> 20)
+    sketches = CourseSketches.from_store(store, args.k)
+    overall = sketches.overall()
+    scores = np.sort(np.frombuffer(store.scores, dtype=np.int32))
+    scores = scores[scores != MISSING]
+    print(f"{overall.n} score(s) in {overall.retained()} retained item(s), {len(sketches.courses)} course sketch(es)")
+    for p in (1, 10, 25, 50, 75, 90, 99):
+        exact = scores[min(len(scores) - 1, max(0, int(np.ceil(p / 100 * len(scores))) - 1))] if len(scores) else None
+        print(f"p{p:<3} sketch {overall.quantile(p / 100)}  exact {exact}")
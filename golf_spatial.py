@@ -0,0 +1,116 @@
+"""
+Nearest-point lookups for charts with very many points.
+
+GridIndex buckets the points into a uniform grid once, with one argsort;
+each bucket's points are then a contiguous slice of that order.  A query
+only looks at the buckets within a radius of the cursor, so hovering
+over a million-point scatter costs the same as over a hundred points.
+Distances are measured on screen: the caller passes the current pixels
+per data unit on each axis, so zooming or resizing needs no rebuild.
+
+    index = GridIndex(costs, scores)
+    hit = index.nearest(120.3, 84.9, sx=2.5, sy=8.0, radius=6)
+    if hit is not None:
+        i, pixels, ties = hit       # ties: points at exactly the same spot
+"""
+import argparse
+import time
+
+import numpy as np
+
+# Points per bucket the grid aims for (fewer buckets on small data)
+TARGET_PER_CELL = 16
+MAX_CELLS = 1024        # per axis
+
+
+class GridIndex:
+    def __init__(self, x, y, cells=None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        n = len(self.x)
+        if cells is None:
+            cells = int(np.sqrt(n / TARGET_PER_CELL)) if n else 1
+        self.cells = max(1, min(MAX_CELLS, cells))
+
+        if n:
+            self.x0, self.y0 = self.x.min(), self.y.min()
+            span_x, span_y = self.x.max() - self.x0, self.y.max() - self.y0
+        else:
+            self.x0 = self.y0 = 0.0
+            span_x = span_y = 0.0
+        # A little over the span, so the largest value still falls in the last bucket
+        self.cell_w = (span_x or 1.0) / self.cells * (1 + 1e-9)
+        self.cell_h = (span_y or 1.0) / self.cells * (1 + 1e-9)
+
+        keys = self._column(self.x) * self.cells + self._row(self.y)
+        self.order = np.argsort(keys)
+        # starts[k]: where bucket k begins in order (bucket k holds order[starts[k]:starts[k + 1]])
+        self.starts = np.zeros(self.cells * self.cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=self.cells * self.cells), out=self.starts[1:])
+
+    def _column(self, x):
+        return np.clip(((x - self.x0) // self.cell_w).astype(np.int64), 0, self.cells - 1)
+
+    def _row(self, y):
+        return np.clip(((y - self.y0) // self.cell_h).astype(np.int64), 0, self.cells - 1)
+
+    def __len__(self):
+        return len(self.x)
+
+    def within(self, qx, qy, rx, ry):
+        """Indexes of the points in the buckets touching the box qx +- rx, qy +- ry."""
+        if not len(self.x):
+            return np.empty(0, dtype=np.int64)
+        c0, c1 = self._column(np.array([qx - rx, qx + rx]))
+        r0, r1 = self._row(np.array([qy - ry, qy + ry]))
+        # Buckets of one grid column are adjacent in order: one slice per column
+        slices = [self.order[self.starts[c * self.cells + r0]:self.starts[c * self.cells + r1 + 1]]
+                  for c in range(c0, c1 + 1)]
+        return np.concatenate(slices)
+
+    def nearest(self, qx, qy, sx=1.0, sy=1.0, radius=np.inf):
+        """
+        (index, distance, ties) of the point nearest (qx, qy), distance in units
+        where one data unit is sx wide and sy high (e.g. pixels); None if no
+        point is within radius.  ties counts the points at that same distance.
+        """
+        if not len(self.x):
+            return None
+        if np.isfinite(radius):
+            candidates = self.within(qx, qy, radius / sx, radius / sy)
+        else:
+            candidates = np.arange(len(self.x))
+        if not len(candidates):
+            return None
+        d2 = ((self.x[candidates] - qx) * sx) ** 2 + ((self.y[candidates] - qy) * sy) ** 2
+        best = int(np.argmin(d2))
+        if d2[best] > radius * radius:
+            return None
+        return int(candidates[best]), float(np.sqrt(d2[best])), int(np.count_nonzero(d2 == d2[best]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time GridIndex builds and hover queries on random rounds.")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    x = rng.integers(0, 300, args.points).astype(float)       # cost
+    y = rng.normal(88, 8, args.points).round()                # score
+    start = time.perf_counter()
+    index = GridIndex(x, y)
+    print(f"built {len(index):,} points into {index.cells}x{index.cells} buckets "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    qx, qy = rng.uniform(0, 300, args.queries), rng.uniform(60, 120, args.queries)
+    start = time.perf_counter()
+    hits = [index.nearest(a, b, sx=2.5, sy=8.0, radius=6) for a, b in zip(qx, qy)]
+    per_query = (time.perf_counter() - start) / args.queries
+    print(f"{per_query * 1e6:.0f} us per query, {sum(h is not None for h in hits)} of {args.queries} hit")
+
+    # Spot-check against brute force
+    for a, b, hit in list(zip(qx, qy, hits))[:50 if args.points else 0]:
+        d = np.hypot((x - a) * 2.5, (y - b) * 8.0)
+        assert (hit is None) == (d.min() > 6) and (hit is None or np.isclose(hit[1], d.min()))
+    print("matches brute force")
@@ -0,0 +1,408 @@
+"""
+Two-way sync between copies of golf_scores.db (say a laptop and a desktop).
+
+Every round gets a random 128-bit uuid, the same in every copy, plus a
+version (a random 64-bit number, new on every change) and a modified time,
+in ``sync_rows``.  Deleted rounds leave a tombstone row behind.  Triggers
+keep it all up to date on every write path, and also keep ``sync_buckets``:
+per month of play, the XOR of the versions of its rows.  Two copies hold
+the same rounds for a month exactly when those hashes match, so a sync
+compares a few hundred bucket hashes and only reads the rows of the months
+that differ:
+
+    report = sync_databases("golf_scores.db", "/media/usb/golf_scores.db")
+    print(report.message())
+
+Rows changed on both sides are resolved last-writer-wins on the modified
+time (ties by version) and listed in the report as conflicts.  The first
+sync between two copies has no common point to tell a change on both sides
+from a change on one, so it resolves the same way but lists no conflicts.  A round
+found on one side only, with the same course, date, cost and score as a
+round found on the other side only (e.g. copied over by CSV before), is
+taken to be the same round rather than added twice.  Seasons archived on
+either side (see golf_archive) are left out.
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+from golf_archive import archived_years
+from golf_dedupe import install_fingerprint
+from golf_handicap import HandicapEngine
+
+SYNC_FILE = "golf_scores_sync.db"   # the copy kept in a sync folder
+
+# Milliseconds since the Unix epoch, in SQL
+_NOW = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+_BUCKET = "COALESCE(substr({date}, 1, 7), '')"
+_NEW_UUID = "lower(hex(randomblob(16)))"
+
+
+def _xor(a, b):
+    # SQLite has no XOR operator; | and & of two's complement integers give it exactly
+    return f"(({a}) | ({b})) - (({a}) & ({b}))"
+
+
+_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS sync_rows (
+        uuid TEXT PRIMARY KEY,
+        round_id INTEGER UNIQUE,          -- NULL once deleted (a tombstone)
+        bucket TEXT NOT NULL,             -- yyyy-mm of the round's date
+        version INTEGER NOT NULL,
+        modified INTEGER NOT NULL,        -- ms since the epoch
+        deleted INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    # Covers the per-bucket version lists, so comparing a month does not read the rows
+    "CREATE INDEX IF NOT EXISTS idx_sync_rows_bucket ON sync_rows (bucket, uuid, version)",
+    "CREATE TABLE IF NOT EXISTS sync_buckets (bucket TEXT PRIMARY KEY, hash INTEGER NOT NULL, rows INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS sync_meta (key TEXT PRIMARY KEY, value)",
+    "CREATE TABLE IF NOT EXISTS sync_peers (peer TEXT PRIMARY KEY, last_sync INTEGER NOT NULL)",
+)
+
+_ADD_TO_BUCKET = (
+    "INSERT INTO sync_buckets (bucket, hash, rows) VALUES (NEW.bucket, NEW.version, 1) "
+    f"ON CONFLICT (bucket) DO UPDATE SET hash = {_xor('hash', 'NEW.version')}, rows = rows + 1;"
+)
+_REMOVE_FROM_BUCKET = (
+    f"UPDATE sync_buckets SET hash = {_xor('hash', 'OLD.version')}, rows = rows - 1 WHERE bucket = OLD.bucket;"
+)
+
+_TRIGGERS = (
+    # Bucket hashes follow sync_rows, however it is written
+    ("sync_bucket_add", "AFTER INSERT ON sync_rows", _ADD_TO_BUCKET),
+    ("sync_bucket_move", "AFTER UPDATE OF version, bucket ON sync_rows", _REMOVE_FROM_BUCKET + _ADD_TO_BUCKET),
+    ("sync_bucket_remove", "AFTER DELETE ON sync_rows", _REMOVE_FROM_BUCKET),
+    # sync_rows follows scores
+    ("sync_scores_insert", "AFTER INSERT ON scores",
+     "INSERT INTO sync_rows (uuid, round_id, bucket, version, modified) "
+     f"VALUES ({_NEW_UUID}, NEW.id, {_BUCKET.format(date='NEW.date')}, random(), {_NOW});"),
+    ("sync_scores_update", "AFTER UPDATE OF course, date, cost, score ON scores",
+     f"UPDATE sync_rows SET bucket = {_BUCKET.format(date='NEW.date')}, version = random(), modified = {_NOW} "
+     "WHERE round_id = NEW.id;"),
+    ("sync_scores_delete", "AFTER DELETE ON scores",
+     f"UPDATE sync_rows SET round_id = NULL, deleted = 1, version = random(), modified = {_NOW} "
+     "WHERE round_id = OLD.id;"),
+) + tuple(
+    # A scorecard is part of its round
+    (f"sync_scorecards_{event.lower()}", f"AFTER {event} ON scorecards",
+     f"UPDATE sync_rows SET version = random(), modified = {_NOW} WHERE round_id = {ref}.round_id;")
+    for event, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+)
+
+
+def install_sync(conn):
+    """Create the sync tables and triggers, giving existing rounds their uuids (caller commits)."""
+    conn.execute("CREATE TABLE IF NOT EXISTS scorecards (round_id INTEGER PRIMARY KEY, holes BLOB NOT NULL)")
+    new = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_rows'").fetchone() is None
+    for statement in _TABLES:
+        conn.execute(statement)
+    for name, event, body in _TRIGGERS:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+    conn.execute(f"INSERT OR IGNORE INTO sync_meta (key, value) VALUES ('db_id', {_NEW_UUID})")
+    if new:
+        conn.execute(
+            "INSERT INTO sync_rows (uuid, round_id, bucket, version, modified) "
+            f"SELECT {_NEW_UUID}, id, {_BUCKET.format(date='date')}, random(), {_NOW} FROM scores"
+        )
+
+
+class SyncReport:
+    """What a sync did; conflicts are (uuid, kept row, discarded row) for rounds changed on both sides."""
+
+    def __init__(self):
+        self.buckets = 0            # months compared
+        self.differing = 0          # months whose rows were read
+        self.pulled = 0             # rounds added or changed here
+        self.pushed = 0             # rounds added or changed in the other copy
+        self.deleted_here = 0
+        self.deleted_there = 0
+        self.matched = 0            # identical rounds recorded separately on both sides, now linked
+        self.conflicts = []
+        self.first_sync = False     # no earlier sync with this copy, so no conflicts can be told apart
+        self.skipped_years = []     # archived seasons, not synced
+        self.handicap_from = {}     # "here"/"there" -> date the handicap history was recomputed from
+        self.seconds = 0.0          # the sync itself
+        self.handicap_seconds = 0.0
+
+    def message(self):
+        lines = [f"Compared {self.buckets} month(s); {self.differing} differed ({self.seconds:.2f} s)."]
+        lines.append(f"Received {self.pulled} round(s), sent {self.pushed}.")
+        if self.deleted_here or self.deleted_there:
+            lines.append(f"Deleted {self.deleted_here} round(s) here and {self.deleted_there} in the other copy.")
+        if self.matched:
+            lines.append(f"Linked {self.matched} round(s) that were already in both copies.")
+        if self.conflicts:
+            lines.append(f"{len(self.conflicts)} round(s) were changed in both copies; the later change was kept:")
+            for _uuid, kept, lost in self.conflicts[:20]:
+                lines.append(f"  kept {_describe(kept)}, discarded {_describe(lost)}")
+        if self.first_sync and self.differing:
+            lines.append("First sync with this copy: where the copies differed the later change was kept, "
+                         "without checking for changes made in both.")
+        if self.handicap_from:
+            lines.append("Recomputed the handicap history " + " and ".join(
+                f"{side} from {day}" for side, day in sorted(self.handicap_from.items())
+            ) + f" ({self.handicap_seconds:.1f} s).")
+        if self.skipped_years:
+            lines.append("Archived seasons were not synced: " + ", ".join(map(str, self.skipped_years)) + ".")
+        return "\n".join(lines)
+
+
+def _describe(row):
+    if row["deleted"]:
+        return "a deletion"
+    return f"{row['course']} {row['date']} score {row['score']} ${row['cost']}"
+
+
+# --- Sync ---
+_ROWS = (
+    "SELECT r.uuid, r.round_id, r.bucket, r.version, r.modified, r.deleted, "
+    "s.course, s.date, s.cost, s.score, s.fingerprint, c.holes "
+    "FROM {db}.sync_rows r LEFT JOIN {db}.scores s ON s.id = r.round_id "
+    "LEFT JOIN {db}.scorecards c ON c.round_id = r.round_id WHERE r.uuid IN ({marks})"
+)
+_COLUMNS = ("uuid", "round_id", "bucket", "version", "modified", "deleted",
+            "course", "date", "cost", "score", "fingerprint", "holes")
+
+
+def _versions(conn, db, bucket):
+    return dict(conn.execute(f"SELECT uuid, version FROM {db}.sync_rows WHERE bucket = ?", (bucket,)))
+
+
+def _rows(conn, db, uuids):
+    """Full rows for the given uuids (those db has, in any bucket), by uuid."""
+    uuids = list(uuids)
+    rows = {}
+    for i in range(0, len(uuids), 500):   # stay under SQLite's bound parameter limit
+        chunk = uuids[i:i + 500]
+        for row in conn.execute(_ROWS.format(db=db, marks=",".join("?" * len(chunk))), chunk):
+            rows[row[0]] = dict(zip(_COLUMNS, row))
+    return rows
+
+
+def _copy_row(conn, db, source, target):
+    """Make db's copy of a round (target, None if it has none) match source."""
+    if source["deleted"]:
+        if target is None:
+            conn.execute(
+                f"INSERT INTO {db}.sync_rows (uuid, round_id, bucket, version, modified, deleted) "
+                "VALUES (?, NULL, ?, ?, ?, 1)",
+                (source["uuid"], source["bucket"], source["version"], source["modified"]),
+            )
+            return
+        if not target["deleted"]:
+            conn.execute(f"DELETE FROM {db}.scores WHERE id = ?", (target["round_id"],))
+    else:
+        values = (source["course"], source["date"], source["cost"], source["score"])
+        if target is not None and not target["deleted"]:
+            round_id = target["round_id"]
+            conn.execute(f"UPDATE {db}.scores SET course = ?, date = ?, cost = ?, score = ? WHERE id = ?",
+                         values + (round_id,))
+        else:
+            if target is not None:   # revive a tombstone under the new row's uuid
+                conn.execute(f"DELETE FROM {db}.sync_rows WHERE uuid = ?", (source["uuid"],))
+            round_id = conn.execute(
+                f"INSERT INTO {db}.scores (course, date, cost, score) VALUES (?, ?, ?, ?)", values
+            ).lastrowid
+        if source["holes"] is None:
+            conn.execute(f"DELETE FROM {db}.scorecards WHERE round_id = ?", (round_id,))
+        else:
+            conn.execute(f"INSERT OR REPLACE INTO {db}.scorecards (round_id, holes) VALUES (?, ?)",
+                         (round_id, source["holes"]))
+        conn.execute(f"UPDATE {db}.sync_rows SET uuid = ? WHERE round_id = ?", (source["uuid"], round_id))
+    # The writes above stamped the row as a fresh local change; it is the source's version
+    conn.execute(
+        f"UPDATE {db}.sync_rows SET bucket = ?, version = ?, modified = ?, deleted = ? WHERE uuid = ?",
+        (source["bucket"], source["version"], source["modified"], source["deleted"], source["uuid"]),
+    )
+
+
+def _match_same_rounds(local, remote):
+    """Pair live rounds present on one side only that have the same fingerprint; returns [(local, remote)]."""
+    by_fingerprint = {}
+    for uuid, row in local.items():
+        if uuid not in remote and not row["deleted"]:
+            by_fingerprint.setdefault(row["fingerprint"], []).append(row)
+    pairs = []
+    for uuid, row in remote.items():
+        if uuid not in local and not row["deleted"]:
+            candidates = by_fingerprint.get(row["fingerprint"])
+            if candidates:
+                pairs.append((candidates.pop(), row))
+    return pairs
+
+
+def _sync_bucket(conn, bucket, last_sync, report, touched):
+    # Only rounds whose versions differ are read in full.  A round moved to another month
+    # on one side is found there too, and is settled by whichever of its buckets comes first.
+    local_versions, remote_versions = _versions(conn, "main", bucket), _versions(conn, "remote", bucket)
+    differing = {uuid for uuid in local_versions.keys() | remote_versions.keys()
+                 if local_versions.get(uuid) != remote_versions.get(uuid)}
+    local = _rows(conn, "main", differing)
+    remote = _rows(conn, "remote", differing)
+
+    for mine, theirs in _match_same_rounds(local, remote):
+        # Same round recorded in both copies: give ours their uuid, then treat it as any shared round
+        conn.execute("UPDATE main.sync_rows SET uuid = ? WHERE uuid = ?", (theirs["uuid"], mine["uuid"]))
+        del local[mine["uuid"]]
+        mine["uuid"] = theirs["uuid"]
+        local[mine["uuid"]] = mine
+        report.matched += 1
+
+    for uuid in local.keys() | remote.keys():
+        mine, theirs = local.get(uuid), remote.get(uuid)
+        if mine is None or theirs is None:
+            winner, loser = mine or theirs, None
+        elif mine["version"] == theirs["version"]:
+            continue
+        elif (mine["modified"], mine["version"]) > (theirs["modified"], theirs["version"]):
+            winner, loser = mine, theirs
+        else:
+            winner, loser = theirs, mine
+        pushing = winner is mine
+        db = "remote" if pushing else "main"
+
+        if loser is not None and _content(winner) == _content(loser):
+            pass   # same round, only the version differs
+        elif winner["deleted"]:
+            if loser is not None and not loser["deleted"]:
+                if pushing:
+                    report.deleted_there += 1
+                else:
+                    report.deleted_here += 1
+        elif pushing:
+            report.pushed += 1
+        else:
+            report.pulled += 1
+        if (loser is not None and last_sync is not None and _content(winner) != _content(loser)
+                and min(mine["modified"], theirs["modified"]) > last_sync):
+            report.conflicts.append((uuid, winner, loser))
+
+        if loser is None or _content(winner) != _content(loser):
+            for day in (winner["date"], loser and loser["date"]):
+                if day and (touched.get(db) is None or day < touched[db]):
+                    touched[db] = day
+        _copy_row(conn, db, winner, loser)
+
+
+def _content(row):
+    if row["deleted"]:
+        return None
+    return row["course"], row["date"], row["cost"], row["score"], row["holes"]
+
+
+def _buckets(conn, db, skip_years):
+    return {
+        bucket: hash_ for bucket, hash_ in conn.execute(f"SELECT bucket, hash FROM {db}.sync_buckets WHERE rows > 0")
+        if not (bucket[:4].isdigit() and int(bucket[:4]) in skip_years)
+    }
+
+
+def _prepare(path):
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, course TEXT, date TEXT, cost INTEGER, score INTEGER)"
+        )
+        install_fingerprint(conn)
+        install_sync(conn)
+        conn.commit()
+        return conn.execute("SELECT value FROM sync_meta WHERE key = 'db_id'").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def sync_databases(db_path, other_path):
+    """Bring db_path and other_path to the same rounds; returns a SyncReport."""
+    start = time.perf_counter()
+    report = SyncReport()
+    local_id, remote_id = _prepare(db_path), _prepare(other_path)
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    touched = {}
+    try:
+        conn.execute("ATTACH DATABASE ? AS remote", (other_path,))
+        skip = set(archived_years(conn))
+        remote_conn = sqlite3.connect(other_path)
+        try:
+            skip |= set(archived_years(remote_conn))
+        finally:
+            remote_conn.close()
+        report.skipped_years = sorted(skip)
+
+        row = conn.execute("SELECT last_sync FROM main.sync_peers WHERE peer = ?", (remote_id,)).fetchone()
+        # None on a first sync: without a common base every difference would look like a conflict
+        last_sync = row[0] if row else None
+        report.first_sync = row is None
+        local, remote = _buckets(conn, "main", skip), _buckets(conn, "remote", skip)
+        report.buckets = len(local.keys() | remote.keys())
+        differing = sorted(b for b in local.keys() | remote.keys() if local.get(b) != remote.get(b))
+        report.differing = len(differing)
+        for bucket in differing:
+            _sync_bucket(conn, bucket, last_sync, report, touched)
+
+        now = conn.execute(f"SELECT {_NOW}").fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO main.sync_peers (peer, last_sync) VALUES (?, ?)", (remote_id, now))
+        conn.execute("INSERT OR REPLACE INTO remote.sync_peers (peer, last_sync) VALUES (?, ?)", (local_id, now))
+        conn.commit()   # one transaction over both files
+        conn.execute("DETACH DATABASE remote")
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    report.seconds = time.perf_counter() - start
+
+    # Handicap history from the earliest round each side received
+    start = time.perf_counter()
+    for db, side, path in (("main", "here", db_path), ("remote", "there", other_path)):
+        if touched.get(db):
+            side_conn = sqlite3.connect(path, timeout=30)
+            try:
+                HandicapEngine(side_conn).round_changed(touched[db], 0)
+                side_conn.commit()
+            finally:
+                side_conn.close()
+            report.handicap_from[side] = touched[db]
+    report.handicap_seconds = time.perf_counter() - start
+    return report
+
+
+def sync_with_folder(db_path, folder):
+    """Sync with the shared copy in folder (e.g. a cloud drive), creating it on first use."""
+    shared = os.path.join(folder, SYNC_FILE)
+    if not os.path.exists(shared):
+        _prepare(db_path)
+        source = sqlite3.connect(db_path, timeout=30)
+        target = sqlite3.connect(shared)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        # The copy is a database of its own: it needs its own id
+        conn = sqlite3.connect(shared)
+        try:
+            conn.execute(f"UPDATE sync_meta SET value = {_NEW_UUID} WHERE key = 'db_id'")
+            conn.execute("DELETE FROM sync_peers")
+            conn.commit()
+        finally:
+            conn.close()
+    return sync_databases(db_path, shared)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two-way sync of two Golf Tracker databases.")
+    parser.add_argument("other", help="the other database file, or a sync folder")
+    parser.add_argument("--db", default="golf_scores.db")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.other):
+        result = sync_with_folder(args.db, args.other)
+    else:
+        result = sync_databases(args.db, args.other)
+    print(result.message())
@@ -0,0 +1,65 @@
+"""
+Time-series helpers for the trend chart.
+
+Rolling statistics are computed with cumulative sums, and long series are
+reduced with Largest-Triangle-Three-Buckets (LTTB) so the canvas only ever
+draws a few thousand points, however many rounds match the filter.
+"""
+import numpy as np
+
+# Unix epoch as a julian day: SQLite julianday() -> matplotlib date numbers
+UNIX_EPOCH_JULIAN = 2440587.5
+
+
+def rolling_mean(values, window):
+    """
+    Trailing mean over the last `window` samples.
+    The first window-1 points average what is available so the line starts at the first round.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window <= 1 or len(values) == 0:
+        return values.copy()
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    idx = np.arange(1, len(values) + 1)
+    lower = np.maximum(idx - window, 0)
+    return (sums[idx] - sums[lower]) / (idx - lower)
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+    x must be sorted.  Returns every index when len(x) <= threshold.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # First and last points are always kept; the rest is split into equal buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for b in range(threshold - 2):
+        start, end = edges[b], edges[b + 1]
+        # Average of the next bucket is the third triangle vertex
+        next_start, next_end = end, (edges[b + 2] if b + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bx = x[start:end]
+        by = y[start:end]
+        areas = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        keep[b + 1] = a
+    return keep
+
+
+def lttb(x, y, threshold):
+    """Downsample (x, y) to at most `threshold` points with LTTB."""
+    idx = lttb_indices(x, y, threshold)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
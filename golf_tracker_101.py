@@ -1,63 +1,417 @@
 import sys
 import sqlite3
-import re
 import json
 import os
 import platform
+import threading
+import html
 import csv # Can remove this if I don't want to use the import feature any longer
 from datetime import date, datetime
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.ticker import MaxNLocator
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from PyQt5.QtCore import Qt, QDate, QPropertyAnimation
-from PyQt5.QtGui import QColor, QIntValidator, QPixmap, QPalette
+from PyQt5.QtCore import Qt, QDate, QEvent, QPropertyAnimation, QTimer, QFileSystemWatcher, QObject, pyqtSignal
+from PyQt5.QtGui import QColor, QCursor, QIcon, QIntValidator, QKeySequence, QPixmap, QPixmapCache, QPalette
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
     QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox,
     QDateEdit, QAction, QCompleter, QAbstractItemView, QTabWidget, QComboBox, QFrame, QSizePolicy,
-    QGraphicsOpacityEffect
+    QGraphicsOpacityEffect, QCheckBox, QInputDialog, QAbstractButton, QMenu, QStyledItemDelegate, QToolButton, QToolTip
 )
+from golf_scorecard import (
+    HOLES, DEFAULT_PARS, pack_scorecard, unpack_scorecard, scorecard_total,
+    load_scorecards, scorecard_stats
+)
+from golf_handicap import HandicapEngine
+from golf_changes import ChangeTracker, install_change_log
+from golf_journal import UndoJournal
+from golf_writer import WriteBehindQueue
+from golf_dedupe import install_fingerprint
+import golf_columnar
+import golf_render
+import golf_report
+import golf_api
+import golf_ingest
+import golf_archive
+import golf_backup
+import golf_sync
+import golf_attachments
+import golf_watchdog
+from golf_query import FilterError, compile_filter, install_indexes
+from golf_roundstore import DEFAULT_BUDGET_MB, RoundStore
+from golf_cube import Cube
+from golf_sketch import CourseSketches
+from golf_analytics import load_columns, summarize, course_breakdown, month_breakdown
+from golf_charts import (
+    CHART_TYPES, CHART_FIG_BG, CHART_AX_BG, DRILLABLE_CHARTS, DRILL_ORDER,
+    chart_data, cube_chart_data, draw_chart, parse_trend_windows, store_scatter_data
+)
+from golf_spatial import GridIndex
+
+# How often to check for commits from other app instances (the file watcher usually fires first)
+CHANGE_POLL_MS = 2000
+# How soon to retry showing the writer's commit while our own connection is mid-transaction
+COMMIT_RETRY_MS = 50
+# Above this many changed rounds a full reload is cheaper than patching the table
+INCREMENTAL_REFRESH_LIMIT = 2000
+# How often to check whether a scheduled backup is due
+BACKUP_CHECK_MS = 60 * 60 * 1000
+# Photo thumbnails in the edit panel (the table's fit its rows)
+PHOTO_STRIP_PX = 48
+# How close (in screen pixels) the cursor must be to a cost/score point to pick it
+SCATTER_PICK_PX = 6
 
 DB_FILE = "golf_scores.db"
 
+class WriteResultBridge(QObject):
+    """Carries write-behind results from the writer thread to the GUI thread."""
+    batch_done = pyqtSignal(list)
+
+
+class BackgroundTask(QObject):
+    """Runs a function on a worker thread and reports back to the GUI thread via signals."""
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            result = self.fn(self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.done.emit(result)
+
+
+class RefreshScheduler(QObject):
+    """
+    Coalesces UI refreshes.  Callers mark parts of the window dirty; every
+    dirty part is redrawn once, in dependency order, when control returns
+    to the event loop.  A burst of edits or imports costs one table load,
+    one stats pass, one chart draw and one autocomplete rebuild.
+    """
+    # Flush order: the table first, since highlighting reads its rows
+    PARTS = ("table", "stats", "highlight", "chart", "autocomplete")
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self.dirty = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.flush)
+
+    def mark(self, *parts):
+        self.dirty.update(parts)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Redraw everything marked so far (also usable directly when the result is needed now)."""
+        self.timer.stop()
+        dirty, self.dirty = self.dirty, set()
+        w = self.window
+        for part in self.PARTS:
+            if part not in dirty:
+                continue
+            if part == "table":
+                w.reload_table()
+            elif part == "stats":
+                w.update_stats(w.current_filter)
+            elif part == "highlight":
+                w.apply_row_highlighting()
+            elif part == "chart":
+                w.update_charts(w.current_filter)
+            else:
+                w.refresh_autocomplete()
+
+
+class StallActionFilter(QObject):
+    """
+    Tells the stall watchdog what the user last did (a click or key press and
+    the widget it went to), so a stall can be put down to the action behind it.
+    Installed on the application only while stall detection is on.
+    """
+    def __init__(self, watchdog, parent=None):
+        super().__init__(parent)
+        self.watchdog = watchdog
+        self.last_event = None
+
+    def eventFilter(self, obj, event):
+        kind = event.type()
+        if kind in (QEvent.MouseButtonRelease, QEvent.KeyPress) and obj.isWidgetType():
+            # An unhandled event is offered to each parent in turn; the first (innermost) widget names it
+            seen = (kind, event.timestamp())
+            if seen != self.last_event:
+                self.last_event = seen
+                if kind == QEvent.MouseButtonRelease:
+                    self.watchdog.set_action(f"click {self.describe(obj, event)}")
+                else:
+                    key = QKeySequence(int(event.modifiers()) | event.key()).toString()
+                    self.watchdog.set_action(f"key {key} in {self.describe(obj, event)}")
+        return False
+
+    @staticmethod
+    def describe(widget, event):
+        if isinstance(widget, QMenu):
+            action = widget.actionAt(event.pos()) if event.type() == QEvent.MouseButtonRelease else None
+            return f"menu '{action.text()}'" if action is not None else "menu"
+        if isinstance(widget, QAbstractButton) and widget.text():
+            return f"'{widget.text()}'"
+        # Viewports and other inner widgets are named after the widget they belong to
+        while widget.parentWidget() is not None and type(widget) is QWidget:
+            widget = widget.parentWidget()
+        return widget.objectName() or type(widget).__name__
+
+
+class ThumbnailBridge(QObject):
+    """Carries finished thumbnails from the thumbnail pool to the GUI thread."""
+    ready = pyqtSignal(str, object)
+
+
+class PhotoDelegate(QStyledItemDelegate):
+    """Draws a round's first photo at the end of its Course cell, once the thumbnail exists."""
+    def __init__(self, window):
+        super().__init__(window.table)
+        self.window = window
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        try:
+            round_id = int(index.sibling(index.row(), 0).data(Qt.DisplayRole))
+        except (TypeError, ValueError):
+            return
+        sha = self.window.photo_rounds.get(round_id)
+        if sha is None:
+            return
+        # Only visible rows are painted, so only their thumbnails are ever made or loaded
+        pix = self.window.thumbnail_pixmap(sha, option.rect.height() - 4)
+        if pix is not None:
+            rect = option.rect
+            painter.drawPixmap(rect.right() - pix.width() - 2, rect.top() + (rect.height() - pix.height()) // 2, pix)
+
+
+# --- Themes ---
+THEMES = {
+    "light": {
+        "bg": "#FFFFFF", "fg": "#111111", "alt_row": "#E0E0E0", "grid": "#BFBFBF",
+        "header_bg": "#EAEAEA", "header_fg": "#111111",
+        "stats_bg": "#FFFFFF", "stats_fg": "#111111",
+        "filtered_bg": "#FF4444", "filtered_fg": "#FFFFFF",   # bright red
+        "row_bg": "#FFFFFF", "row_alt_bg": "#E0E0E0",
+        "about_bg": "#fdfdfd", "about_fg": "#222", "accent": "#2E8B57",
+        "button": "#2E8B57", "button_hover": "#3CB371",
+    },
+    "dark": {
+        "bg": "#121212", "fg": "#EEEEEE", "alt_row": "#D9D9D9", "grid": "#B0B0B0",
+        "header_bg": "#1E1E1E", "header_fg": "#EEEEEE",
+        "stats_bg": "#3b3636", "stats_fg": "#FFFFFF",
+        "filtered_bg": "#B22222", "filtered_fg": "#FFFFFF",   # dark red (Firebrick)
+        "row_bg": "#121212", "row_alt_bg": "#1E1E1E",
+        "about_bg": "#202020", "about_fg": "#ddd", "accent": "#77DD77",
+        "button": "#3CB371", "button_hover": "#2E8B57",
+    },
+}
+
+# Widgets are matched by object name; state changes flip dynamic properties
+# ("filtered", "selected") instead of setting new stylesheets
+STYLESHEET = """
+QTableWidget#roundsTable {{
+    background-color: {bg};
+    color: {fg};
+    gridline-color: {grid};
+    selection-background-color: #3CB371;
+    selection-color: white;
+    border: none;
+}}
+QTableWidget#roundsTable QHeaderView::section {{
+    background-color: {header_bg};
+    color: {header_fg};
+    border: 1px solid {grid};
+    padding: 4px;
+    font-weight: bold;
+}}
+QLabel#statsBar {{
+    background-color: {stats_bg};
+    color: {stats_fg};
+    font-size: 14px;
+    padding: 4px 6px;
+    border: 1px solid #B7950B;
+}}
+QLabel#statsBar[filtered="true"] {{
+    background-color: {filtered_bg};
+    color: {filtered_fg};
+}}
+QDialog#aboutDialog {{
+    background-color: {about_bg};
+    border: 2px solid {accent};
+    border-radius: 12px;
+}}
+QDialog#aboutDialog QLabel {{
+    color: {about_fg};
+}}
+QDialog#aboutDialog QLabel#aboutTitle {{
+    color: {accent};
+}}
+QDialog#aboutDialog QPushButton {{
+    background-color: {button};
+    color: white;
+    padding: 6px 16px;
+    border-radius: 8px;
+}}
+QDialog#aboutDialog QPushButton:hover {{
+    background-color: {button_hover};
+}}
+"""
+
+# Selected chart button, in the chart's own color
+CHART_BUTTON_STYLE = (
+    'QPushButton#chart_{chart_type}[selected="true"] '
+    "{{ background-color: {color}; color: black; font-weight: bold; }}"
+)
+
+# QEvent::ThemeChange, which PyQt5 does not name
+THEME_CHANGE_EVENT = 210
+
+
+def detect_theme_mode():
+    """"dark" or "light", from the Windows app setting or else the application palette."""
+    if platform.system() == "Windows":
+        try:
+            import winreg
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize"
+            ) as key:
+                apps_use_light = winreg.QueryValueEx(key, "AppsUseLightTheme")[0]
+                return "dark" if apps_use_light == 0 else "light"
+        except Exception:
+            pass
+    palette = QApplication.instance().palette()
+    return "dark" if palette.color(QPalette.Window).value() < 128 else "light"
+
+
+class ThemeManager(QObject):
+    """
+    Owns the application stylesheet.  Both modes are compiled once; the
+    sheet is only replaced when the OS theme actually changes, and widget
+    states are switched with set_state(), which repolishes just that widget.
+    """
+    changed = pyqtSignal(str)
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        chart_rules = "\n".join(
+            CHART_BUTTON_STYLE.format(chart_type=chart_type, color=color)
+            for chart_type, (_label, color) in CHART_TYPES.items()
+        )
+        self.sheets = {mode: STYLESHEET.format(**colors) + chart_rules for mode, colors in THEMES.items()}
+        self.mode = None
+
+    @property
+    def colors(self):
+        return THEMES[self.mode]
+
+    def apply(self, mode=None):
+        mode = mode or detect_theme_mode()
+        if mode != self.mode:
+            self.mode = mode
+            self.app.setStyleSheet(self.sheets[mode])
+            self.changed.emit(mode)
+
+    def watch(self, window):
+        """Follow OS theme changes, as seen by the main window."""
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() in (THEME_CHANGE_EVENT, QEvent.PaletteChange, QEvent.ApplicationPaletteChange):
+            self.apply()
+        return False
+
+    @staticmethod
+    def set_state(widget, name, value):
+        """Set a dynamic property the stylesheet matches on; repolish only if it changed."""
+        if widget.property(name) != value:
+            widget.setProperty(name, value)
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+
+
 class GolfTracker(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Golf Tracker")
         self.setGeometry(100, 100, 1100, 750)
 
-        self.conn = sqlite3.connect(DB_FILE)
+        # Background imports, syncs and backups write on their own connections; wait for them
+        self.conn = sqlite3.connect(DB_FILE, timeout=30)
         self.create_table()
+        # Table, stats and charts read through here, so archived seasons are included on demand
+        self.reader = golf_archive.PartitionedReader(DB_FILE)
 
         self.current_edit_id = None
+        self.current_filter = None
+        self.round_cache = None         # RoundStore of the rounds in the table
+        self.cube = None                # aggregates of the table's rounds, for drill-down charts
+        self.drill_path = []            # (dimension, value) bars clicked into on the chart
+        self.chart_keys = []            # dimension value of each bar drawn
+        self.scatter_data = None        # ids and coordinates of the cost/score points drawn
+        self.scatter_index = None       # GridIndex over them, built on the first hover
+        self.hover_round = None         # round under the cursor on the cost/score chart
+        self.score_sketches = None      # per-course score quantile sketches of the table's rounds
+        self.photo_rounds = {}          # round id -> sha256 of its first photo
+        self.photo_round_id = None      # round whose photos the edit panel shows
+        self.api_server = None
+        self.background_tasks = set()   # keeps running BackgroundTasks alive
+        self.pending_scorecard = None   # packed scorecard waiting for add/update (b"" = remove)
         self.filter_active = False
 
         self.current_chart_type = "average_score"
 
+        # One stylesheet for the whole app, applied before any widget is polished
+        self.theme = ThemeManager(QApplication.instance())
+        self.theme.apply()
+
+        self.refresh = RefreshScheduler(self)
+        # Thumbnails are made on a pool and cached on disk; the table and edit panel ask for them lazily
+        self.thumb_bridge = ThumbnailBridge(self)
+        self.thumb_bridge.ready.connect(self.on_thumbnail_ready)
+        self.thumbs = golf_attachments.ThumbnailCache(
+            DB_FILE, max_mb=self.load_settings().get("thumbnail_cache_mb", golf_attachments.DEFAULT_CACHE_MB),
+            on_ready=self.thumb_bridge.ready.emit,
+        )
         self.initUI()
         self.load_data()
+        self.refresh.flush()   # fill the window before it is first shown
+        self.start_change_watch()
 
-        # --- Apply system theme detection AFTER everything is built ---
-        palette = QApplication.instance().palette()
-        is_dark = palette.color(QPalette.Window).value() < 128
+        # Round entry is committed by a writer thread in small groups
+        self.write_bridge = WriteResultBridge(self)
+        self.write_bridge.batch_done.connect(self.on_writes_committed)
+        self.writer = WriteBehindQueue(DB_FILE, self.write_bridge.batch_done.emit)
+        self.writer.start()
+        self.next_provisional_id = -1   # table ids for rounds not yet committed
 
-        if platform.system() == "Windows":
-            try:
-                import winreg
-                with winreg.OpenKey(
-                    winreg.HKEY_CURRENT_USER,
-                    r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize"
-                ) as key:
-                    apps_use_light = winreg.QueryValueEx(key, "AppsUseLightTheme")[0]
-                    mode = "dark" if apps_use_light == 0 else "light"
-            except Exception:
-                mode = "dark" if is_dark else "light"
-        else:
-            mode = "dark" if is_dark else "light"
+        # Follow OS light/dark switches; item colors are not covered by the stylesheet
+        self.theme.changed.connect(lambda _mode: self.refresh.mark("highlight"))
+        self.theme.watch(self)
 
-        self.set_theme(mode)
+        self.backup_running = False
+        self.start_backup_schedule()
+
+        self.watchdog = None            # golf_watchdog.StallWatchdog while stall detection is on
+        if self.stall_action.isChecked():
+            self.start_stall_watchdog()
 
     def create_table(self):
         cursor = self.conn.cursor()
@@ -70,6 +424,46 @@ class GolfTracker(QMainWindow):
                 score INTEGER
             )
         """)
+        # Optional hole-by-hole detail, one packed 72 byte record per round
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scorecards (
+                round_id INTEGER PRIMARY KEY,
+                holes BLOB NOT NULL
+            )
+        """)
+        # Imports skip rounds already recorded, matched on this fingerprint
+        install_fingerprint(self.conn)
+        # Course, score and cost indexes, so every kind of filter term is an index lookup
+        install_indexes(self.conn)
+        golf_archive.install_catalog(self.conn)
+        # Round uuids, versions and month hashes for syncing with another copy of the database
+        golf_sync.install_sync(self.conn)
+        # Photos are stored as files named by their hash; only the hash is kept here
+        golf_attachments.install_attachments(self.conn)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS scorecards_cleanup
+            AFTER DELETE ON scores
+            BEGIN
+                DELETE FROM scorecards WHERE round_id = OLD.id;
+            END
+        """)
+        self.conn.commit()
+
+        # Handicap history is maintained incrementally; build it once for older databases
+        self.handicap = HandicapEngine(self.conn)
+        if self.handicap.needs_backfill():
+            self.handicap.backfill()
+        self.conn.commit()
+
+        # Bulk edits keep their previous rows here for a single-step undo
+        self.journal = UndoJournal(self.conn)
+        self.conn.commit()
+
+        # Change log lets other instances pick up our writes (and us theirs) incrementally
+        install_change_log(self.conn)
+        self.conn.commit()
+        self.changes = ChangeTracker(self.conn)
+        self.changes.prune()
         self.conn.commit()
 
     def initUI(self):
@@ -108,10 +502,59 @@ class GolfTracker(QMainWindow):
         import_csv_action.triggered.connect(self.import_csv)
         file_menu.addAction(import_csv_action)
 
+        import_folder_action = QAction("Import CSV Folder...", self)
+        import_folder_action.triggered.connect(self.import_csv_folder)
+        file_menu.addAction(import_folder_action)
+
         export_csv_action = QAction("Export CSV", self)
         export_csv_action.triggered.connect(self.export_csv)
         file_menu.addAction(export_csv_action)
 
+        import_columnar_action = QAction("Import Parquet / Feather", self)
+        import_columnar_action.triggered.connect(self.import_columnar)
+        file_menu.addAction(import_columnar_action)
+
+        export_parquet_action = QAction("Export Parquet", self)
+        export_parquet_action.triggered.connect(lambda: self.export_columnar("parquet"))
+        file_menu.addAction(export_parquet_action)
+
+        export_feather_action = QAction("Export Feather (Arrow IPC)", self)
+        export_feather_action.triggered.connect(lambda: self.export_columnar("feather"))
+        file_menu.addAction(export_feather_action)
+
+        report_action = QAction("Generate Report...", self)
+        report_action.triggered.connect(self.generate_report)
+        file_menu.addAction(report_action)
+
+        render_pack_action = QAction("Render Chart Pack...", self)
+        render_pack_action.triggered.connect(self.render_chart_pack)
+        file_menu.addAction(render_pack_action)
+
+        archive_action = QAction("Archive Closed Seasons...", self)
+        archive_action.triggered.connect(self.archive_closed_seasons)
+        file_menu.addAction(archive_action)
+
+        backup_action = QAction("Backup Now", self)
+        backup_action.triggered.connect(self.backup_now)
+        file_menu.addAction(backup_action)
+
+        restore_action = QAction("Restore from Backup...", self)
+        restore_action.triggered.connect(self.restore_from_backup)
+        file_menu.addAction(restore_action)
+
+        sync_file_action = QAction("Sync with Database File...", self)
+        sync_file_action.triggered.connect(self.sync_with_file)
+        file_menu.addAction(sync_file_action)
+
+        sync_folder_action = QAction("Sync with Folder...", self)
+        sync_folder_action.triggered.connect(self.sync_with_folder)
+        file_menu.addAction(sync_folder_action)
+
+        self.api_action = QAction("Local API Server", self)
+        self.api_action.setCheckable(True)
+        self.api_action.toggled.connect(self.toggle_api_server)
+        file_menu.addAction(self.api_action)
+
         delete_all_action = QAction("Delete All Records", self)
         delete_all_action.triggered.connect(self.delete_all_records)
         file_menu.addAction(delete_all_action)
@@ -120,6 +563,60 @@ class GolfTracker(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        # --- Edit menu ---
+        edit_menu = menubar.addMenu("Edit")
+        edit_menu.aboutToShow.connect(self.refresh_undo_action)
+
+        self.undo_action = QAction("Undo", self)
+        self.undo_action.setShortcut("Ctrl+Z")
+        self.undo_action.triggered.connect(self.undo_last_bulk_edit)
+        edit_menu.addAction(self.undo_action)
+        edit_menu.addSeparator()
+
+        rename_action = QAction("Rename Course of Selected...", self)
+        rename_action.triggered.connect(self.bulk_rename_course)
+        edit_menu.addAction(rename_action)
+
+        adjust_cost_action = QAction("Adjust Cost of Selected...", self)
+        adjust_cost_action.triggered.connect(self.bulk_adjust_cost)
+        edit_menu.addAction(adjust_cost_action)
+
+        delete_selected_action = QAction("Delete Selected", self)
+        delete_selected_action.setShortcut("Del")
+        delete_selected_action.triggered.connect(self.delete_record)
+        edit_menu.addAction(delete_selected_action)
+
+        select_all_action = QAction("Select All Rounds", self)
+        select_all_action.setShortcut("Ctrl+A")
+        select_all_action.triggered.connect(lambda: self.table.selectAll())
+        edit_menu.addAction(select_all_action)
+
+        # --- Handicap menu ---
+        handicap_menu = menubar.addMenu("Handicap")
+
+        ratings_action = QAction("Course Ratings...", self)
+        ratings_action.triggered.connect(self.edit_course_ratings)
+        handicap_menu.addAction(ratings_action)
+
+        rebuild_action = QAction("Rebuild Handicap History", self)
+        rebuild_action.triggered.connect(self.rebuild_handicap)
+        handicap_menu.addAction(rebuild_action)
+
+        # --- View menu ---
+        view_menu = menubar.addMenu("View")
+        settings = self.load_settings()
+        self.highlight_percent = settings.get("highlight_percent", 10)
+
+        band_action = QAction("Highlight Band...", self)
+        band_action.triggered.connect(self.choose_highlight_band)
+        view_menu.addAction(band_action)
+
+        self.per_course_action = QAction("Highlight per Course", self)
+        self.per_course_action.setCheckable(True)
+        self.per_course_action.setChecked(settings.get("highlight_per_course", False))
+        self.per_course_action.toggled.connect(lambda _checked: self.refresh.mark("highlight"))
+        view_menu.addAction(self.per_course_action)
+
         # --- Help menu ---
         help_menu = menubar.addMenu("Help")
 
@@ -131,6 +628,18 @@ class GolfTracker(QMainWindow):
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
 
+        help_menu.addSeparator()
+
+        self.stall_action = QAction("Detect UI Stalls", self)
+        self.stall_action.setCheckable(True)
+        self.stall_action.setChecked(settings.get("stall_watchdog", False))
+        self.stall_action.toggled.connect(self.toggle_stall_watchdog)
+        help_menu.addAction(self.stall_action)
+
+        stall_report_action = QAction("UI Stall Report...", self)
+        stall_report_action.triggered.connect(self.show_stall_report)
+        help_menu.addAction(stall_report_action)
+
         # --- Restore column widths
         self.restore_column_widths()
 
@@ -144,85 +653,11 @@ class GolfTracker(QMainWindow):
         except Exception:
             pass
 
-    def set_theme(self, mode: str):
-        """
-        Apply light or dark mode styles to key widgets (table, labels, etc.)
-        """
-        if mode == "dark":
-            bg = "#121212"
-            fg = "#EEEEEE"
-            alt_row = "#D9D9D9"  # clear, medium-light gray for strong contrast
-            grid_color = "#B0B0B0"
-            header_bg = "#1E1E1E"    # dark gray header
-            header_fg = "#EEEEEE"
-            stats_bg = "#3b3636"     # dark footer in dark mode
-            stats_fg = "#FFFFFF"
-        else:
-            bg = "#FFFFFF"
-            fg = "#111111"
-            alt_row = "#E0E0E0"      # more pronounced light gray for alternating rows
-            grid_color = "#BFBFBF"   # darker gridlines for separation
-            header_bg = "#EAEAEA"    # soft gray header
-            header_fg = "#111111"    # dark text for readability
-            stats_bg = "#FFFFFF"     # light footer in light mode 
-            stats_fg = "#111111"
-
-        # --- QTableWidget (data grid) ---
-        self.table.setAlternatingRowColors(True)
-        self.table.setStyleSheet(f"""
-            QTableWidget {{
-                background-color: {bg};
-                color: {fg};
-                gridline-color: {grid_color};
-                selection-background-color: #3CB371;
-                selection-color: white;
-                border: none;
-            }}
-            QHeaderView::section {{
-                background-color: {header_bg};
-                color: {header_fg};
-                border: 1px solid {grid_color};
-                padding: 4px;
-                font-weight: bold;
-            }}
-        """)
-
-        # --- Stats labels (bottom bars) ---
-        for lbl in (self.stats_label_main, self.stats_label_charts):
-            lbl.setStyleSheet(
-                f"""
-                background-color: {stats_bg};
-                color: {stats_fg};
-                font-size: 14px;
-                padding: 4px 6px;
-                border: 1px solid #B7950B;
-                """
-            )
-        
-    def refresh_stats_bar_style(self):
-        """
-        Reapply the theme style to the stats bar labels
-        after text updates (like clearing filters),
-        but skip if a red (filtered) style is active.
-        """
-        palette = QApplication.instance().palette()
-        is_dark = palette.color(QPalette.Window).value() < 128
-        mode = "dark" if is_dark else "light"
-
-        # Check if any stats label is currently using the red (filtered) style
-        for lbl in (self.stats_label_main, self.stats_label_charts):
-            current_style = lbl.styleSheet().lower()
-            if any(x in current_style for x in ["#b22222", "#ff4444", "background-color: red"]):
-                # One or more labels are red → skip full theme reset
-                return
-
-        # If we reach here, no red styles are active → safe to reapply theme
-        self.set_theme(mode)
-
     def fade_stats_bar(self, duration=300):
         """
         Fade animation for the stats bar labels (smooth transition between color changes).
-        Ensures opacity is restored and animations don't stack.
+        Each label has one animation, restarted from transparent, so a fade that is
+        still running is replaced rather than stacked.
         """
         for lbl in (self.stats_label_main, self.stats_label_charts):
             # Reuse or create opacity effect
@@ -231,18 +666,15 @@ class GolfTracker(QMainWindow):
                 effect = QGraphicsOpacityEffect(lbl)
                 lbl.setGraphicsEffect(effect)
 
-            # Reset opacity before starting animation
-            effect.setOpacity(0.0)
-
-            # Create fade animation
-            anim = QPropertyAnimation(effect, b"opacity", lbl)
+            anim = getattr(lbl, "_fade_anim", None)
+            if anim is None or anim.targetObject() is not effect:
+                anim = QPropertyAnimation(effect, b"opacity", lbl)
+                anim.setStartValue(0.0)
+                anim.setEndValue(1.0)
+                lbl._fade_anim = anim
+            anim.stop()
             anim.setDuration(duration)
-            anim.setStartValue(0.0)
-            anim.setEndValue(1.0)
-            anim.start(QPropertyAnimation.DeleteWhenStopped)
-
-            # Store reference to prevent garbage collection
-            lbl._fade_anim = anim
+            anim.start()
 
     # --- Shared, single filter bar ---
     def create_shared_filter_bar(self):
@@ -253,7 +685,13 @@ class GolfTracker(QMainWindow):
         row.setSpacing(6)
 
         self.filter_input = QLineEdit()
-        self.filter_input.setPlaceholderText("filter by course name, yyyy or yyyy-mm")
+        self.filter_input.setPlaceholderText("filter: course name, yyyy, yyyy-mm, or e.g. course:pebble year:2024..2025 score<80")
+        self.filter_input.setToolTip(
+            "Terms are combined (all must match):\n"
+            "  pebble, course:\"pebble beach\", course=\"Pebble Beach\"\n"
+            "  2024, 2024-06, year:2022..2024, year>=2023, date<2024-07-01\n"
+            "  score<80, score:70..79, cost>=100, cost:50.."
+        )
         self.filter_input.returnPressed.connect(self.apply_or_clear_filter)
 
         self.apply_button = QPushButton('Apply Filter')
@@ -269,11 +707,9 @@ class GolfTracker(QMainWindow):
         self.stats_label_charts = QLabel("Stats will appear here")
 
         for lbl in (self.stats_label_main, self.stats_label_charts):
-            lbl.setStyleSheet(
-                "background-color: #3b3636; color: white; font-size: 14px; "
-                "padding: 4px 6px; border: 1px solid #B7950B;"
-            )
-            lbl.setFixedHeight(30)
+            lbl.setObjectName("statsBar")
+            lbl.setProperty("filtered", False)
+            lbl.setFixedHeight(50)   # two lines: totals, then distribution details
             lbl.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
 
         # Return both so they can be added into their respective tabs
@@ -334,6 +770,20 @@ class GolfTracker(QMainWindow):
         grid.addWidget(score_lbl, 3, 0, alignment=Qt.AlignRight)
         grid.addWidget(self.score_input, 3, 1, alignment=Qt.AlignLeft)
 
+        # --- Photos of the round being edited, then the attach button ---
+        photos_lbl = QLabel("Photos:")
+        photos_lbl.setFixedWidth(LABEL_W)
+        photo_strip = QWidget()
+        self.photo_layout = QHBoxLayout(photo_strip)
+        self.photo_layout.setContentsMargins(0, 0, 0, 0)
+        self.photo_buttons = []
+        self.attach_btn = QPushButton("Attach Photo...")
+        self.attach_btn.clicked.connect(self.attach_photos)
+        self.photo_layout.addWidget(self.attach_btn)
+        self.photo_layout.addStretch(1)
+        grid.addWidget(photos_lbl, 4, 0, alignment=Qt.AlignRight)
+        grid.addWidget(photo_strip, 4, 1, alignment=Qt.AlignLeft)
+
         # Make the second column stretch to keep left alignment and prevent drifting
         grid.setColumnStretch(0, 0)
         grid.setColumnStretch(1, 1)
@@ -355,9 +805,10 @@ class GolfTracker(QMainWindow):
         self.edit_btn = QPushButton("Edit Record")   # toggles to "Update Record"
         self.del_btn  = QPushButton("Delete Record")
         self.clear_btn= QPushButton("Clear")
+        self.card_btn = QPushButton("Scorecard...")
 
         # Make them expand equally
-        for b in (self.add_btn, self.edit_btn, self.del_btn, self.clear_btn):
+        for b in (self.add_btn, self.edit_btn, self.del_btn, self.clear_btn, self.card_btn):
             b.setMinimumHeight(28)
             b.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
@@ -366,12 +817,14 @@ class GolfTracker(QMainWindow):
         self.edit_btn.clicked.connect(self.toggle_edit_update)
         self.del_btn.clicked.connect(self.delete_record)
         self.clear_btn.clicked.connect(self.clear_inputs)
+        self.card_btn.clicked.connect(self.edit_scorecard)
 
         # Add in order; stretch not needed because buttons expand
         h.addWidget(self.add_btn)
         h.addWidget(self.edit_btn)
         h.addWidget(self.del_btn)
         h.addWidget(self.clear_btn)
+        h.addWidget(self.card_btn)
         return bar
 
 
@@ -387,11 +840,13 @@ class GolfTracker(QMainWindow):
 
         # --- Table (expanding) ---
         self.table = QTableWidget()
+        self.table.setObjectName("roundsTable")
+        self.table.setAlternatingRowColors(True)
         self.table.setColumnCount(5)
         self.table.setHorizontalHeaderLabels(['ID', 'Course', 'Date', 'Cost ($)', 'Score'])
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
 
         # Column behavior
         header = self.table.horizontalHeader()
@@ -421,6 +876,9 @@ class GolfTracker(QMainWindow):
             header.setResizeMode(3, QHeaderView.Fixed)
             header.setResizeMode(4, QHeaderView.Fixed)
 
+        # Course cells show the round's first photo, if any
+        self.table.setItemDelegateForColumn(1, PhotoDelegate(self))
+
         # Preferred fixed widths for Date/Cost/Score
         self.table.setColumnWidth(2, 110)   # Date
         self.table.setColumnWidth(3, 90)    # Cost
@@ -440,95 +898,238 @@ class GolfTracker(QMainWindow):
 
     def change_chart(self, chart_type):
         self.current_chart_type = chart_type
-        for key, (btn, color) in self.chart_buttons.items():
-            if key == chart_type:
-                btn.setStyleSheet(f"background-color: {color}; color: black; font-weight: bold;")
-            else:
-                btn.setStyleSheet("")
-        self.update_charts(self.filter_input.text())
+        self.drill_path = []
+        for key, (btn, _color) in self.chart_buttons.items():
+            self.theme.set_state(btn, "selected", key == chart_type)
+        self.refresh.mark("chart")
+
+    def chart_options(self):
+        return {
+            "trend_windows": parse_trend_windows(self.trend_windows_input.text()),
+            "trend_show_cost": self.trend_cost_checkbox.isChecked(),
+        }
 
     def update_charts(self, filter_text):
+        # The trend chart's cost axis is a separate twin axes; drop it before redrawing
+        if self.chart_twin is not None:
+            self.chart_twin.remove()
+            self.chart_twin = None
         self.chart_axes.clear()
         # Re-apply chart theme after clearing
-        # This is definitely the place to change chart color
-        # My default colors are ("#d6dbdf", "#d6dbdf")
-        # Parts of the chart  ("outside", "inside")
-        self.apply_chart_theme("#c3c7c7", "#dbe2e9")
-        cursor = self.conn.cursor()
-
-        if self.current_chart_type == "average_score":
-            if filter_text:
-                cursor.execute(
-                    "SELECT course, AVG(CAST(score AS INTEGER)) FROM scores "
-                    "WHERE course LIKE ? OR date LIKE ? GROUP BY course",
-                    (f"%{filter_text}%", f"%{filter_text}%")
-                )
-            else:
-                cursor.execute("SELECT course, AVG(CAST(score AS INTEGER)) FROM scores GROUP BY course")
-            results = sorted(cursor.fetchall(), key=lambda x: x[1])
-            title = "Average Score per Course"
-            ylabel = "Average Score"
-            bar_color = "#4CAF50"
-
-        elif self.current_chart_type == "rounds_per_course":
-            if filter_text:
-                cursor.execute(
-                    "SELECT course, COUNT(*) FROM scores "
-                    "WHERE course LIKE ? OR date LIKE ? GROUP BY course",
-                    (f"%{filter_text}%", f"%{filter_text}%")
-                )
-            else:
-                cursor.execute("SELECT course, COUNT(*) FROM scores GROUP BY course")
-            results = sorted(cursor.fetchall(), key=lambda x: x[1], reverse=True)
-            title = "Number of Rounds per Course"
-            ylabel = "Rounds Played"
-            bar_color = "#2196F3"
-            self.chart_axes.yaxis.set_major_locator(MaxNLocator(integer=True))
-
-        elif self.current_chart_type == "best_score":
-            if filter_text:
-                cursor.execute(
-                    "SELECT course, MIN(CAST(score AS INTEGER)) FROM scores "
-                    "WHERE course LIKE ? OR date LIKE ? GROUP BY course",
-                    (f"%{filter_text}%", f"%{filter_text}%")
-                )
-            else:
-                cursor.execute("SELECT course, MIN(CAST(score AS INTEGER)) FROM scores GROUP BY course")
-            results = sorted(cursor.fetchall(), key=lambda x: x[1])
-            title = "Best Score per Course"
-            ylabel = "Best Score"
-            bar_color = "#FF9800"
+        # This is definitely the place to change chart color (see golf_charts)
+        self.apply_chart_theme(CHART_FIG_BG, CHART_AX_BG)
+
+        options = self.chart_options()
+        self.scatter_data = self.scatter_index = self.hover_round = None
+        if self.current_chart_type in DRILLABLE_CHARTS:
+            data = cube_chart_data(self.chart_cube(), self.current_chart_type, self.drill_path)
+            self.chart_keys = data["keys"]
+        elif self.current_chart_type == "cost_vs_score" and self.round_cache is not None \
+                and not self.round_cache.truncated:
+            # The table's rounds are already in memory; only a cut-short cache needs SQL
+            data = self.scatter_data = store_scatter_data(self.round_cache)
+            self.chart_keys = []
+        else:
+            self.select_partitions(filter_text)
+            data = chart_data(self.reader.conn, self.current_chart_type, filter_text, options)
+            self.chart_keys = []
+            if self.current_chart_type == "cost_vs_score":
+                self.scatter_data = data
+        self.drill_up_btn.setEnabled(bool(self.drill_path))
+        if data is None:
+            return
+        self.chart_twin = draw_chart(self.chart_axes, self.current_chart_type, data, options)
+        self.chart_canvas.draw()
 
+    # --- Drill-down ---
+    def chart_cube(self):
+        """The cube of the rounds in the current filter, rebuilt from SQL if it was dropped."""
+        if self.cube is None:
+            self.select_partitions(self.current_filter)
+            self.cube = Cube.load(self.reader.conn, *compile_filter(self.current_filter))
+        return self.cube
+
+    def track_row_change(self, old=None, new=None):
+        """Mirror a table row change, (id, course, date, cost, score) before and after, in the round cache,
+        cube and sketches."""
+        if old is not None and new is not None and tuple(old[1:]) == tuple(new[1:]):
+            return
+        self.update_round_cache(old, new)
+        if self.score_sketches is not None:
+            if old is not None:
+                self.score_sketches.remove(old[1])   # re-sketched from the round cache when next read
+            if new is not None:
+                self.score_sketches.add(new[1], new[4])
+        self.update_cube(old, new)
+
+    def update_round_cache(self, old=None, new=None):
+        # The scatter chart plots straight from the cache, so it has to follow the table
+        if self.round_cache is None:
+            return
+        i = self.round_cache.index_of(old[0]) if old is not None else None
+        if new is None:
+            if i is not None:
+                self.round_cache.remove(i)
+        elif i is None:
+            self.round_cache.append(*new)
         else:
+            self.round_cache.replace(i, *new)
+
+    def update_cube(self, old=None, new=None):
+        if self.cube is None:
+            return
+        if self.round_cache is None or self.round_cache.truncated:
+            self.cube = None   # the cube holds rounds the table does not, so the table cannot patch it
+            return
+        if old is not None:
+            # The table shows a missing cost or score as 0, so such a row cannot be taken out exactly
+            if 0 in old[3:] or not self.cube.remove(*old[1:]):
+                self.cube = None
+                return
+        if new is not None:
+            self.cube.add(*new[1:])
+
+    def table_row_values(self, r):
+        cells = [self.table.item(r, c) for c in range(5)]
+        return (int(cells[0].text()), cells[1].text(), cells[2].text(),
+                cells[3].data(Qt.DisplayRole), cells[4].data(Qt.DisplayRole))
+
+    def on_chart_click(self, event):
+        """Left click on a bar drills into it; right click rolls back up a level."""
+        if self.current_chart_type == "cost_vs_score":
+            if event.button == 1:
+                self.select_scatter_round(event)
+            return
+        if self.current_chart_type not in DRILLABLE_CHARTS:
+            return
+        if event.button == 3:
+            self.drill_up()
+            return
+        if event.button != 1 or event.inaxes is not self.chart_axes or event.xdata is None:
             return
+        i = int(round(event.xdata))
+        if not 0 <= i < len(self.chart_keys) or abs(event.xdata - i) > 0.4:   # bars are 0.8 wide
+            return
+        if len(self.drill_path) + 1 >= len(DRILL_ORDER):
+            return   # weekdays are the finest level
+        self.drill_path.append((DRILL_ORDER[len(self.drill_path)], self.chart_keys[i]))
+        self.refresh.mark("chart")
+
+    def drill_up(self):
+        if self.drill_path:
+            self.drill_path.pop()
+            self.refresh.mark("chart")
+
+    # --- Cost/score picking ---
+    def scatter_pick(self, event):
+        """(point, rounds at that spot) of the cost/score point under the cursor, or None."""
+        if self.scatter_data is None or event.inaxes is not self.chart_axes or event.xdata is None:
+            return None
+        if self.scatter_index is None:
+            self.scatter_index = GridIndex(self.scatter_data["x"], self.scatter_data["y"])
+        # Pixels per data unit right now, so the pick radius is the same on screen at any size
+        (x0, y0), (x1, y1) = self.chart_axes.transData.transform([(0, 0), (1, 1)])
+        radius = SCATTER_PICK_PX * getattr(self.chart_canvas, "device_pixel_ratio", 1)
+        hit = self.scatter_index.nearest(event.xdata, event.ydata, abs(x1 - x0), abs(y1 - y0), radius)
+        if hit is None:
+            return None
+        i, _distance, ties = hit
+        return i, ties
+
+    def on_chart_hover(self, event):
+        picked = self.scatter_pick(event) if self.current_chart_type == "cost_vs_score" else None
+        if picked is None:
+            if self.hover_round is not None:
+                self.hover_round = None
+                QToolTip.hideText()
+            return
+        i, ties = picked
+        round_id = int(self.scatter_data["ids"][i])
+        if round_id == self.hover_round:
+            return
+        self.hover_round = round_id
+        row = self.reader.conn.execute("SELECT course, date FROM scores WHERE id = ?", (round_id,)).fetchone()
+        if row is None:
+            return
+        course, date_text = row
+        text = (f"{course}\n{date_text}\n"
+                f"Cost ${self.scatter_data['x'][i]:.0f}, score {self.scatter_data['y'][i]:.0f}")
+        if ties > 1:
+            text += f"\n({ties - 1:,} more round(s) here)"
+        QToolTip.showText(QCursor.pos(), text, self.chart_canvas)
+
+    def select_scatter_round(self, event):
+        """Click on a cost/score point: select that round in the table."""
+        picked = self.scatter_pick(event)
+        if picked is None:
+            return
+        round_id = int(self.scatter_data["ids"][picked[0]])
+        self.select_row_by_id(round_id)
+        current = self.table.item(self.table.currentRow(), 0) if self.table.currentRow() >= 0 else None
+        if current is None or current.text() != str(round_id):
+            self.statusBar().showMessage("That round is not in the table (round cache limit); narrow the filter.", 5000)
+            return
+        self.tabs.setCurrentWidget(self.main_tab)
 
-        courses = [row[0] for row in results]
-        values = [row[1] for row in results]
-
-        bars = self.chart_axes.bar(courses, values, color=bar_color, edgecolor='black')
-
-        self.chart_axes.set_title(title, fontsize=14, fontweight='bold')
-        self.chart_axes.set_ylabel(ylabel, fontsize=12)
-        self.chart_axes.set_xticks(range(len(courses)))
-        self.chart_axes.set_xticklabels(courses, rotation=45, ha="right", fontsize=9)
-        self.chart_axes.grid(axis='y', linestyle='--', alpha=0.7)
-
-        # Add value labels
-        for bar in bars:
-            height = bar.get_height()
-            self.chart_axes.annotate(
-                f"{height:.0f}" if height == int(height) else f"{height:.2f}",
-                xy=(bar.get_x() + bar.get_width() / 2, height),
-                xytext=(0, 4),
-                textcoords="offset points",
-                ha='center',
-                va='bottom',
-                fontsize=9,
-                color='black',
-                fontweight='bold'
-            )
+    # --- Handicap ---
+    def edit_course_ratings(self):
+        """Edit course rating and slope used for score differentials."""
+        from PyQt5.QtWidgets import QDialog, QDialogButtonBox
 
-        self.chart_canvas.draw()
+        ratings = self.handicap.course_ratings()
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Course Ratings")
+        layout = QVBoxLayout(dlg)
+
+        grid = QTableWidget(len(ratings), 3)
+        grid.setHorizontalHeaderLabels(["Course", "Rating", "Slope"])
+        grid.verticalHeader().setVisible(False)
+        for r, (course, (rating, slope)) in enumerate(ratings.items()):
+            name_item = QTableWidgetItem(course)
+            name_item.setFlags(Qt.ItemIsEnabled)
+            grid.setItem(r, 0, name_item)
+            for c, val in ((1, f"{rating:.1f}"), (2, str(slope))):
+                item = QTableWidgetItem(val)
+                item.setTextAlignment(Qt.AlignCenter)
+                grid.setItem(r, c, item)
+        grid.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(grid)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dlg.accept)
+        buttons.rejected.connect(dlg.reject)
+        layout.addWidget(buttons)
+        dlg.resize(480, 360)
+
+        if dlg.exec_() != QDialog.Accepted:
+            return
+
+        changed = []
+        for r, (course, old) in enumerate(ratings.items()):
+            try:
+                rating = float(grid.item(r, 1).text())
+                slope = int(grid.item(r, 2).text())
+            except ValueError:
+                QMessageBox.warning(self, "Input Error", f"Invalid rating or slope for {course}.")
+                return
+            if not 55 <= slope <= 155 or not 50 <= rating <= 90:
+                QMessageBox.warning(self, "Input Error",
+                                    f"{course}: slope must be 55-155 and rating 50-90.")
+                return
+            if (rating, slope) != old:
+                changed.append((course, rating, slope))
+
+        for course, rating, slope in changed:
+            self.handicap.set_course_rating(course, rating, slope)
+        if changed:
+            self.conn.commit()
+            self.load_data(self.current_filter)
+
+    def rebuild_handicap(self):
+        self.handicap.backfill()
+        self.conn.commit()
+        self.load_data(self.current_filter)
 
     # --- Menu Helpers ---
     def show_help(self):
@@ -549,68 +1150,14 @@ class GolfTracker(QMainWindow):
             QMessageBox.warning(self, "Missing Image", f"Could not find image:\n{img_path}")
             return
 
-        # --- Mode Toggle: "light" or "dark"
-        # mode = "dark"  # change to "dark" if you want dark mode manually
-
-        # --- Auto-detect mode using QPalette and platform hints
-        palette = QApplication.instance().palette()
-        is_dark = palette.color(QPalette.Window).value() < 128
-
-        if platform.system() == "Darwin":  # macOS handles dark mode nicely
-            mode = "dark" if is_dark else "light"
-        elif platform.system() == "Windows":
-            # Try to detect Windows dark mode via registry (optional, requires 'winreg')
-            try:
-                import winreg
-                with winreg.OpenKey(
-                    winreg.HKEY_CURRENT_USER,
-                    r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize"
-                ) as key:
-                    apps_use_light = winreg.QueryValueEx(key, "AppsUseLightTheme")[0]
-                    mode = "dark" if apps_use_light == 0 else "light"
-            except Exception:
-                mode = "dark" if is_dark else "light"
-        else:
-            # Default heuristic for Linux and others
-            mode = "dark" if is_dark else "light"
-
-        # --- Theme settings
-        if mode == "light":
-            bg_color = "#fdfdfd"
-            text_color = "#222"
-            accent_color = "#2E8B57"
-            button_color = "#2E8B57"
-            button_hover = "#3CB371"
-        else:  # dark mode
-            bg_color = "#202020"
-            text_color = "#ddd"
-            accent_color = "#77DD77"
-            button_color = "#3CB371"
-            button_hover = "#2E8B57"
+        # --- Colors come from the current theme; the dialog is styled by the app stylesheet
+        text_color = self.theme.colors["about_fg"]
 
         # --- Create custom dialog
         dlg = QDialog(self)
+        dlg.setObjectName("aboutDialog")
         dlg.setWindowTitle("About Golf Tracker")
         dlg.setModal(True)
-        dlg.setStyleSheet(f"""
-            QDialog {{
-                background-color: {bg_color};
-                border: 2px solid {accent_color};
-                border-radius: 12px;
-            }}
-            QLabel {{
-                color: {text_color};
-            }}
-            QPushButton {{
-                background-color: {button_color};
-                color: white;
-                padding: 6px 16px;
-                border-radius: 8px;
-            }}
-            QPushButton:hover {{
-                background-color: {button_hover};
-            }}
-        """)
 
         layout = QVBoxLayout(dlg)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -627,7 +1174,7 @@ class GolfTracker(QMainWindow):
         title_label = QLabel("Golf Tracker")
         title_label.setFont(QFont("Arial", 16, QFont.Bold))
         title_label.setAlignment(Qt.AlignCenter)
-        title_label.setStyleSheet(f"color: {accent_color};")
+        title_label.setObjectName("aboutTitle")
         layout.addWidget(title_label)
 
         # --- Description
@@ -688,6 +1235,100 @@ class GolfTracker(QMainWindow):
         self.date_input.setDate(QDate.currentDate())
         self.cost_input.clear()
         self.score_input.clear()
+        self.pending_scorecard = None
+        self.show_photos(None)
+
+    # --- Scorecards ---
+    def load_scorecard(self, round_id):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT holes FROM scorecards WHERE round_id = ?", (round_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def load_scorecards(self, where_clause="", params=()):
+        return load_scorecards(self.reader.conn, where_clause, params)
+
+    def edit_scorecard(self):
+        """
+        Hole-by-hole editor for the round in the input panel.
+        The card is saved together with the round by Add/Update Record.
+        """
+        from PyQt5.QtWidgets import QDialog, QDialogButtonBox
+
+        holes = None
+        if self.pending_scorecard:
+            holes = unpack_scorecard(self.pending_scorecard)
+        elif self.pending_scorecard is None and self.current_edit_id is not None:
+            blob = self.load_scorecard(self.current_edit_id)
+            if blob:
+                holes = unpack_scorecard(blob)
+        if holes is None:
+            holes = [(par, 0, 0, False, False) for par in DEFAULT_PARS]
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("Scorecard")
+        layout = QVBoxLayout(dlg)
+
+        grid = QTableWidget(5, HOLES)
+        grid.setVerticalHeaderLabels(["Par", "Strokes", "Putts", "Fairway", "GIR"])
+        grid.setHorizontalHeaderLabels([str(h + 1) for h in range(HOLES)])
+        for c, (par, strokes, putts, fairway, gir) in enumerate(holes):
+            for r, val in enumerate((par, strokes, putts)):
+                item = QTableWidgetItem("" if r > 0 and not strokes else str(val))
+                item.setTextAlignment(Qt.AlignCenter)
+                grid.setItem(r, c, item)
+            for r, checked in ((3, fairway), (4, gir)):
+                item = QTableWidgetItem()
+                item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+                item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
+                grid.setItem(r, c, item)
+            grid.setColumnWidth(c, 38)
+        layout.addWidget(grid)
+
+        hint = QLabel("Leave strokes empty for holes not played. Fairway is ignored on par 3s.")
+        layout.addWidget(hint)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel | QDialogButtonBox.Reset)
+        buttons.accepted.connect(dlg.accept)
+        buttons.rejected.connect(dlg.reject)
+        layout.addWidget(buttons)
+
+        def clear_card():
+            for c in range(HOLES):
+                grid.item(1, c).setText("")
+                grid.item(2, c).setText("")
+                grid.item(3, c).setCheckState(Qt.Unchecked)
+                grid.item(4, c).setCheckState(Qt.Unchecked)
+        buttons.button(QDialogButtonBox.Reset).clicked.connect(clear_card)
+
+        dlg.resize(18 * 38 + 120, 260)
+        if dlg.exec_() != QDialog.Accepted:
+            return
+
+        new_holes = []
+        try:
+            for c in range(HOLES):
+                par = int(grid.item(0, c).text() or 0)
+                strokes = int(grid.item(1, c).text() or 0)
+                putts = int(grid.item(2, c).text() or 0)
+                if not 3 <= par <= 6 or not 0 <= strokes <= 20 or not 0 <= putts <= strokes:
+                    raise ValueError
+                fairway = None if par == 3 else grid.item(3, c).checkState() == Qt.Checked
+                gir = grid.item(4, c).checkState() == Qt.Checked
+                new_holes.append((par, strokes, putts, fairway, gir))
+        except ValueError:
+            QMessageBox.warning(self, "Input Error",
+                                f"Hole {c + 1}: par must be 3-6, strokes 0-20 and putts no more than strokes.")
+            return
+
+        if not any(h[1] for h in new_holes):
+            self.pending_scorecard = b""   # empty card → remove any stored detail
+            return
+
+        self.pending_scorecard = pack_scorecard(new_holes)
+        total = scorecard_total(self.pending_scorecard)
+        if total is not None:
+            self.score_input.setText(str(total))
 
     # --- Save and Restore column widths
     def save_column_widths(self):
@@ -768,76 +1409,97 @@ class GolfTracker(QMainWindow):
         return os.path.join(os.path.dirname(__file__), "settings.json")
 
     # --- Do these things when exiting the app
+    def save_chart_settings(self):
+        settings = self.load_settings()
+        settings["trend_windows"] = self.trend_windows_input.text().strip()
+        settings["trend_show_cost"] = self.trend_cost_checkbox.isChecked()
+
+        try:
+            with open(self.get_settings_path(), "w") as f:
+                json.dump(settings, f, indent=4)
+        except Exception as e:
+            print(f"Failed to save chart settings: {e}")
+
     def closeEvent(self, event):
+        self.stop_stall_watchdog()
+        self.thumbs.shutdown()
+        self.writer.close()   # commit anything still queued
+        if self.api_server is not None:
+            self.api_server.stop()
+        self.reader.close()
         self.save_window_settings()
         self.save_column_widths()
+        self.save_chart_settings()
+        self.save_highlight_settings()
         event.accept()
 
     def safe_text(self, item):
         return item.text() if item else ""
 
     # --- Data Loading ---
+    def fill_table_row(self, r, row):
+        """Write one (id, course, date, cost, score) row into table row r."""
+        for c, val in enumerate(row):
+            text_val = "" if val is None else str(val)
+
+            # Default item
+            item = QTableWidgetItem()
+
+            if c in (2, 3, 4):  # Date, Cost, Score → center align
+                item.setTextAlignment(Qt.AlignCenter)
+
+            if c in (3, 4):  # Cost and Score
+                try:
+                    numeric_val = int(val)
+                except (TypeError, ValueError):
+                    numeric_val = 0
+                # Use numeric for sorting + display
+                item.setData(Qt.DisplayRole, numeric_val)
+                item.setText(str(numeric_val))  # display text, but sorting uses int
+            else:
+                # For non-numeric columns → just use string
+                item.setText(text_val)
+
+            self.table.setItem(r, c, item)
+
+    def select_partitions(self, filter_text):
+        """Attach the archived seasons filter_text can match to the read connection."""
+        self.reader.select_for(filter_text)
+        if self.reader.omitted:
+            self.statusBar().showMessage(
+                f"{self.reader.omitted} oldest archived season(s) left out; filter by year to see them.", 10000
+            )
+
     def load_data(self, filter_text=None):
+        """Show the rounds matching filter_text; the table, stats and chart redraw on the next event loop turn."""
+        if filter_text != self.current_filter:
+            self.drill_path = []
+        self.current_filter = filter_text
+        self.refresh.mark("table", "stats", "highlight", "chart")
+
+    def reload_table(self):
         self.table.setSortingEnabled(False)   # pause sorting
         self.table.clearContents()            # only clears the cells, keeps headers
         self.table.setRowCount(0)             # drop old rows
-        cursor = self.conn.cursor()
-        if filter_text:
-            if re.match(r"^\d{4}-\d{2}$", filter_text):  # YYYY-MM
-                cursor.execute(
-                    "SELECT id, course, date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
-                    "FROM scores WHERE date LIKE ? ORDER BY date ASC",
-                    (f"%{filter_text}%",),
-                )
-            elif re.match(r"^\d{4}$", filter_text):  # YYYY
-                cursor.execute(
-                    "SELECT id, course, date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
-                    "FROM scores WHERE strftime('%Y', date) = ? ORDER BY date ASC",
-                    (filter_text,),
-                )
-            elif re.match(r"^\d{4}-\d{2}-\d{2}$", filter_text):  # YYYY-MM-DD
-                cursor.execute(
-                    "SELECT id, course, date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
-                    "FROM scores WHERE date = ? ORDER BY date ASC",
-                    (filter_text,),
-                )
-            else:  # Course name
-                cursor.execute(
-                    "SELECT id, course, date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
-                    "FROM scores WHERE course LIKE ? COLLATE NOCASE ORDER BY date ASC",
-                    (f"%{filter_text}%",),
-                )
-        else:
-            cursor.execute(
-                "SELECT id, course, date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
-                "FROM scores ORDER BY date ASC"
+        # The matching rounds stay cached in compact column arrays, within the memory budget
+        budget_mb = self.load_settings().get("round_cache_mb", DEFAULT_BUDGET_MB)
+        self.select_partitions(self.current_filter)
+        self.round_cache = RoundStore.load(self.reader.conn, *compile_filter(self.current_filter),
+                                           budget_mb=budget_mb)
+        self.table.setRowCount(len(self.round_cache))
+        # The chart cube is built from the same arrays in one pass (from SQL, if they were cut short)
+        self.cube = None if self.round_cache.truncated else Cube.from_store(self.round_cache)
+        # Percentile bands for highlighting come from sketches of the same rounds
+        self.score_sketches = CourseSketches.from_store(self.round_cache)
+        self.photo_rounds = golf_attachments.rounds_with_attachments(self.conn)
+
+        for r, row in enumerate(self.round_cache):
+            self.fill_table_row(r, row.as_tuple())
+        if self.round_cache.truncated:
+            self.statusBar().showMessage(
+                f"Showing the first {len(self.round_cache)} rounds (round cache limit {budget_mb} MB); "
+                "narrow the filter to see the rest.", 10000
             )
-        rows = cursor.fetchall()
-        self.table.setRowCount(len(rows))
-
-        for r, row in enumerate(rows):
-            for c, val in enumerate(row):
-                text_val = "" if val is None else str(val)
-
-                # Default item
-                item = QTableWidgetItem()
-
-                if c in (2, 3, 4):  # Date, Cost, Score → center align
-                    item.setTextAlignment(Qt.AlignCenter)
-
-                if c in (3, 4):  # Cost and Score
-                    try:
-                        numeric_val = int(val)
-                    except (TypeError, ValueError):
-                        numeric_val = 0
-                    # Use numeric for sorting + display
-                    item.setData(Qt.DisplayRole, numeric_val)
-                    item.setText(str(numeric_val))  # display text, but sorting uses int
-                else:
-                    # For non-numeric columns → just use string
-                    item.setText(text_val)
-
-                self.table.setItem(r, c, item)
 
         self.table.hideColumn(0)
         self.table.setSortingEnabled(True)
@@ -853,145 +1515,247 @@ class GolfTracker(QMainWindow):
         #the view’s sort indicator will override the initial display. 
         #If you want the query itself to match, change ORDER BY date ASC to ORDER BY date DESC as well.
 
-        self.update_stats(filter_text)
-        self.apply_row_highlighting()
-        self.update_charts(filter_text)
+    # --- Changes from other instances ---
+    def start_change_watch(self):
+        """Watch the database (and its WAL) for commits by other app instances."""
+        self.db_watcher = QFileSystemWatcher(self)
+        self.db_watcher.fileChanged.connect(lambda _path: self.change_check_timer.start())
+        self.watch_database_files()
+
+        # Debounce bursts of file notifications into one check
+        self.change_check_timer = QTimer(self)
+        self.change_check_timer.setSingleShot(True)
+        self.change_check_timer.setInterval(150)
+        self.change_check_timer.timeout.connect(self.check_for_changes)
+
+        # Fallback poll: watchers are unreliable on network shares; data_version is cheap
+        self.change_poll_timer = QTimer(self)
+        self.change_poll_timer.timeout.connect(self.check_for_changes)
+        self.change_poll_timer.start(CHANGE_POLL_MS)
+
+    def watch_database_files(self):
+        # The WAL/journal files come and go, and a replaced file drops out of the watcher
+        db_path = os.path.abspath(DB_FILE)
+        watched = set(self.db_watcher.files())
+        for path in (db_path, db_path + "-wal"):
+            if os.path.exists(path) and path not in watched:
+                self.db_watcher.addPath(path)
+
+    def check_for_changes(self):
+        if self.conn.in_transaction:
+            return  # our own write is in progress; look again on the next tick
+        self.watch_database_files()
+
+        changes = self.changes.poll()
+        if changes == ChangeTracker.FULL_RELOAD or len(changes) > INCREMENTAL_REFRESH_LIMIT:
+            self.load_data(self.current_filter)
+            self.refresh.mark("autocomplete")
+        elif changes:
+            self.apply_remote_changes(changes)
+
+    def apply_remote_changes(self, changes):
+        """Patch the table for rounds changed elsewhere, then refresh stats and chart."""
+        row_of = {}
+        for r in range(self.table.rowCount()):
+            item = self.table.item(r, 0)
+            if item:
+                row_of[int(item.text())] = r
+
+        # Current versions of the changed rounds that still match the filter
+        fresh = {}
+        if changes.changed:
+            where_clause, params = compile_filter(self.current_filter)
+            where_clause = where_clause.replace(" WHERE ", " AND (", 1) + ")" if where_clause else ""
+            ids = sorted(changes.changed)
+            cursor = self.conn.cursor()
+            for i in range(0, len(ids), 500):  # stay under SQLite's bound parameter limit
+                chunk = ids[i:i + 500]
+                cursor.execute(
+                    "SELECT id, course, date, CAST(cost AS INTEGER), CAST(score AS INTEGER) "
+                    f"FROM scores WHERE id IN ({','.join('?' * len(chunk))})" + where_clause,
+                    tuple(chunk) + params,
+                )
+                for row in cursor.fetchall():
+                    fresh[row[0]] = row
+
+        self.table.setSortingEnabled(False)
+        # Remove deleted rounds and rounds that no longer match, bottom up so indexes stay valid
+        gone = [row_of[i] for i in (changes.deleted | changes.changed) if i in row_of and i not in fresh]
+        for r in sorted(gone, reverse=True):
+            self.track_row_change(old=self.table_row_values(r))
+            self.table.removeRow(r)
+        if gone:
+            row_of = {}
+            for r in range(self.table.rowCount()):
+                row_of[int(self.table.item(r, 0).text())] = r
+
+        for round_id, row in fresh.items():
+            r = row_of.get(round_id)
+            if r is None:
+                r = self.table.rowCount()
+                self.table.insertRow(r)
+                self.track_row_change(new=row)
+            else:
+                self.track_row_change(old=self.table_row_values(r), new=row)
+            self.fill_table_row(r, row)
+        self.table.setSortingEnabled(True)
+
+        self.refresh.mark("stats", "highlight", "chart", "autocomplete")
 
     def apply_row_highlighting(self):
+        """Best highlight_percent of rounds green, worst orange (overall or per course)."""
         row_count = self.table.rowCount()
         if row_count == 0:
             return
 
-        # Detect current mode from palette (light or dark)
-        palette = QApplication.instance().palette()
-        is_dark = palette.color(QPalette.Window).value() < 128
-        mode = "dark" if is_dark else "light"
-
         # Theme-aware defaults
-        default_fg = QColor("#EEEEEE") if mode == "dark" else QColor("#111111")
-
-        # Gather all scores
-        scores = []
-        for r in range(row_count):
-            item = self.table.item(r, 4)
-            if item:
-                try:
-                    scores.append(int(item.text()))
-                except ValueError:
-                    pass
-
-        if not scores:
-            return
-
-        min_score = min(scores)
-        max_score = max(scores)
+        colors = self.theme.colors
+        default_fg = QColor(colors["fg"])
+        row_bg, row_alt_bg = QColor(colors["row_bg"]), QColor(colors["row_alt_bg"])
+        best_bg, worst_bg, band_fg = QColor("#2E8B57"), QColor("#FF8C00"), QColor("#FFFFFF")
 
+        if self.score_sketches is None:
+            self.score_sketches = CourseSketches.from_store(self.round_cache)
+        else:
+            # Courses that lost or changed a round since the table was loaded are re-sketched
+            # from the round cache, which follows the table; the other courses are kept as they are
+            self.score_sketches.refresh(self.round_cache)
+        per_course = self.per_course_action.isChecked()
+        bands = {}   # course (None = all) -> (low, high) cut-offs
+
+        # Recoloring a cell of the sort column re-sorts the table; pause sorting meanwhile
+        sorting = self.table.isSortingEnabled()
+        self.table.setSortingEnabled(False)
         for r in range(row_count):
             score_item = self.table.item(r, 4)
             if not score_item:
                 continue
-            try:
-                score_val = int(score_item.text())
-            except ValueError:
-                continue
+            score_val = score_item.data(Qt.DisplayRole)
+            course = self.safe_text(self.table.item(r, 1)) if per_course else None
+            if course not in bands:
+                bands[course] = self.score_sketches.bands(self.highlight_percent, course)
+            low, high = bands[course]
+
+            # --- Manual alternating row base color ---
+            bg, fg = (row_alt_bg if r % 2 else row_bg), default_fg
+            if low is not None and low < high:
+                if score_val <= low:
+                    bg, fg = best_bg, band_fg
+                elif score_val >= high:
+                    bg, fg = worst_bg, band_fg
 
             for c in range(self.table.columnCount()):
                 item = self.table.item(r, c)
-                if not item:
-                    continue
+                if item:
+                    item.setBackground(bg)
+                    item.setForeground(fg)
+        self.table.setSortingEnabled(sorting)
+
+    def choose_highlight_band(self):
+        percent, ok = QInputDialog.getInt(
+            self, "Highlight Band", "Highlight the best and worst percent of rounds:",
+            self.highlight_percent, 1, 49,
+        )
+        if ok:
+            self.highlight_percent = percent
+            self.refresh.mark("highlight")
 
-                # --- Manual alternating row base color ---
-                if mode == "dark":
-                    base_bg = QColor("#1E1E1E") if r % 2 else QColor("#121212")
-                else:
-                    base_bg = QColor("#E0E0E0") if r % 2 else QColor("#FFFFFF")
-                base_fg = default_fg
-
-                # --- Apply highlight colors ---
-                if score_val == min_score:
-                    item.setBackground(QColor("#2E8B57"))  # green
-                    item.setForeground(QColor("#FFFFFF"))
-                elif score_val == max_score:
-                    item.setBackground(QColor("#FF8C00"))  # orange
-                    item.setForeground(QColor("#FFFFFF"))
-                else:
-                    item.setBackground(base_bg)
-                    item.setForeground(base_fg)
+    def save_highlight_settings(self):
+        settings = self.load_settings()
+        settings["highlight_percent"] = self.highlight_percent
+        settings["highlight_per_course"] = self.per_course_action.isChecked()
+
+        try:
+            with open(self.get_settings_path(), "w") as f:
+                json.dump(settings, f, indent=4)
+        except Exception as e:
+            print(f"Failed to save highlight settings: {e}")
 
     # --- Stats Bar ---
     def update_stats(self, filter_text=None):
-        cursor = self.conn.cursor()
-
-        # Base style and label suffix depend on whether a filter is active
-        style_default = (
-            "background-color: #3b3636; color: #ffffff; font-size: 14px; "
-            "padding: 4px; border: 1px solid #B7950B;"
-        )
-        # Theme-aware filtered style
-        palette = QApplication.instance().palette()
-        is_dark = palette.color(QPalette.Window).value() < 128
-        if is_dark:
-            filter_bg = "#B22222"  # dark red (Firebrick)
-            filter_fg = "#FFFFFF"
-        else:
-            filter_bg = "#FF4444"  # bright red for light mode
-            filter_fg = "#FFFFFF"
+        # The stats bar turns red while a filter is active ("filtered" property, see STYLESHEET)
+        where_clause, params = compile_filter(filter_text)
+        suffix = " (Filtered)" if filter_text else ""
+        for lbl in (self.stats_label_main, self.stats_label_charts):
+            self.theme.set_state(lbl, "filtered", bool(filter_text))
 
-        style_filtered = (
-            f"background-color: {filter_bg}; color: {filter_fg}; font-size: 14px; "
-            f"padding: 4px 6px; border: 1px solid #B7950B;"
-        )
-
-        where_clause = ""
-        params = ()
-        style = style_default
-        suffix = ""
-
-        if filter_text:
-            if len(filter_text) == 4 and filter_text.isdigit():
-                where_clause = " WHERE strftime('%Y', date) = ?"
-                params = (filter_text,)
-            elif len(filter_text) == 7 and filter_text[4] == '-':
-                where_clause = " WHERE strftime('%Y-%m', date) = ?"
-                params = (filter_text,)
-            else:
-                where_clause = " WHERE course LIKE ? COLLATE NOCASE"
-                params = (f"%{filter_text}%",)
-            style = style_filtered
-            suffix = " (Filtered)"
-
-        cursor.execute(
-            "SELECT COUNT(*), SUM(cost), AVG(cost), AVG(score), MIN(score), MAX(score) FROM scores"
-            + where_clause,
-            params,
-        )
-        rounds, total_cost, avg_cost, avg_score, best, worst = cursor.fetchone() or (0, 0, 0, 0, None, None)
+        # One load of the matching rounds; every number below is computed from these arrays
+        self.select_partitions(filter_text)
+        cols = load_columns(self.reader.conn, where_clause, params)
+        summary = summarize(cols)
+        rounds = summary["rounds"]
+        best, worst = summary["best"], summary["worst"]
 
         # If completely no data in DB and no filter: show message
         if not filter_text and rounds == 0:
             msg = "No data available."
             for lbl in (self.stats_label_main, self.stats_label_charts):
                 lbl.setText(msg)
-                lbl.setStyleSheet(style_default)
             return
 
+        # Scorecard detail (only shown when some of the matching rounds have one)
+        card_parts = []
+        card_stats = scorecard_stats(self.load_scorecards(where_clause, params))
+        if card_stats["holes"]:
+            card_parts.append(f"Avg Putts: <b>{card_stats['putts_avg']:.1f}</b>")
+            if card_stats["fairway_pct"] is not None:
+                card_parts.append(f"FIR: <b>{card_stats['fairway_pct']:.0f}%</b>")
+            card_parts.append(f"GIR: <b>{card_stats['gir_pct']:.0f}%</b>")
+
         stats_html = (
             f"Total Rounds: <b>{rounds or 0}</b> &nbsp; | &nbsp; "
-            f"Total Cost: <b>${(total_cost or 0):,.0f}</b> &nbsp; | &nbsp; "
-            f"Avg Cost: <b>${(avg_cost or 0):,.0f}</b> &nbsp; | &nbsp; "
-            f"Avg Score: <b>{(avg_score or 0):.1f}</b> &nbsp; | &nbsp; "
+            f"Total Cost: <b>${summary['total_cost']:,.0f}</b> &nbsp; | &nbsp; "
+            f"Avg Cost: <b>${summary['avg_cost']:,.0f}</b> &nbsp; | &nbsp; "
+            f"Avg Score: <b>{(summary['avg_score'] or 0):.1f}</b> &nbsp; | &nbsp; "
             f"Lowest Score: <b>{(best if best is not None else '--')}</b> &nbsp; | &nbsp; "
             f"Highest Score: <b>{(worst if worst is not None else '--')}</b>{suffix}"
         )
 
+        # Second line: distribution, scorecard detail and handicap
+        details = []
+        if summary["p50"] is not None:
+            details.append(f"Median: <b>{summary['p50']:.0f}</b>")
+            details.append(f"Std Dev: <b>{summary['std']:.1f}</b>")
+            details.append(f"P10&ndash;P90: <b>{summary['p10']:.0f}&ndash;{summary['p90']:.0f}</b>")
+        if summary["cost_per_stroke"] is not None:
+            details.append(f"$/Stroke: <b>${summary['cost_per_stroke']:.2f}</b>")
+        handicap_index = self.handicap.current_index()
+        if handicap_index is not None:
+            details.append(f"Index: <b>{handicap_index:.1f}</b>")
+        details += card_parts
+        if details:
+            stats_html += "<br>" + " &nbsp; | &nbsp; ".join(details)
+
+        tooltip = self.stats_tooltip(cols)
         for lbl in (self.stats_label_main, self.stats_label_charts):
             lbl.setText(stats_html)
-            lbl.setStyleSheet(style)
+            lbl.setToolTip(tooltip)
 
-        # --- Reapply theme styling and fade in for smooth transition ---
-        self.refresh_stats_bar_style()
+        # --- Fade in for smooth transition ---
         self.fade_stats_bar(400)  # fade over 400ms
 
+    def stats_tooltip(self, cols):
+        """Per-course and recent per-month breakdown shown when hovering the stats bar."""
+        courses = course_breakdown(cols)
+        if not courses:
+            return ""
+        parts = ["<b>By course</b><table cellspacing='4'>",
+                 "<tr><th align='left'>Course</th><th>Rounds</th><th>Avg</th><th>Best</th><th>Avg $</th></tr>"]
+        for course, n, avg, best, avg_cost in courses[:15]:
+            cost_text = "--" if avg_cost is None else f"${avg_cost:,.0f}"
+            parts.append(f"<tr><td>{html.escape(course)}</td><td align='right'>{n}</td>"
+                         f"<td align='right'>{avg:.1f}</td><td align='right'>{best}</td>"
+                         f"<td align='right'>{cost_text}</td></tr>")
+        if len(courses) > 15:
+            parts.append(f"<tr><td colspan='5'>... {len(courses) - 15} more</td></tr>")
+        parts.append("</table><br><b>Last 12 months played</b><table cellspacing='4'>")
+        parts.append("<tr><th align='left'>Month</th><th>Rounds</th><th>Avg</th><th>Cost</th></tr>")
+        for month, n, avg, cost in month_breakdown(cols)[-12:]:
+            parts.append(f"<tr><td>{month}</td><td align='right'>{n}</td><td align='right'>{avg:.1f}</td>"
+                         f"<td align='right'>${cost:,.0f}</td></tr>")
+        parts.append("</table>")
+        return "".join(parts)
+
     def select_row_by_id(self, record_id):
         """Select and center the row in the table that matches record_id."""
         for r in range(self.table.rowCount()):
@@ -1021,19 +1785,22 @@ class GolfTracker(QMainWindow):
             QMessageBox.warning(self, "Input Error", "Please enter dollars only and a numeric score.")
             return
 
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)",
-            (course, date, cost_val, score_val),
-        )
-        self.conn.commit()
-        new_id = cursor.lastrowid
-        self.load_data()
-        self.select_row_by_id(new_id)
+        # Queue the insert and show the round straight away under a provisional id;
+        # on_writes_committed swaps in the real row once the writer has committed it
+        provisional_id = self.next_provisional_id
+        self.next_provisional_id -= 1
+        self.writer.insert_round(course, date, cost_val, score_val, self.pending_scorecard or None,
+                                 token=provisional_id)
+
+        self.table.setSortingEnabled(False)
+        r = self.table.rowCount()
+        self.table.insertRow(r)
+        self.fill_table_row(r, (provisional_id, course, date, cost_val, score_val))
+        self.table.setSortingEnabled(True)
+        self.select_row_by_id(provisional_id)
 
-        # Clear inputs and refresh autocomplete (retain these!)
+        # Clear inputs (autocomplete refreshes when the write lands)
         self.clear_inputs()
-        self.refresh_autocomplete()
 
     def load_record_for_edit(self, row, col):
         item_id = self.table.item(row, 0)
@@ -1042,10 +1809,12 @@ class GolfTracker(QMainWindow):
             return
 
         self.current_edit_id = int(item_id.data(Qt.DisplayRole))
+        self.pending_scorecard = None
         self.course_input.setText(self.safe_text(self.table.item(row, 1)))
         self.date_input.setDate(QDate.fromString(self.safe_text(self.table.item(row, 2)), "yyyy-MM-dd"))
         self.cost_input.setText(self.safe_text(self.table.item(row, 3)))
         self.score_input.setText(self.safe_text(self.table.item(row, 4)))
+        self.show_photos(self.current_edit_id)
         self.edit_btn.setText("Update Record")
 
     def toggle_edit_update(self):
@@ -1059,10 +1828,12 @@ class GolfTracker(QMainWindow):
                 QMessageBox.warning(self, "Selection Error", "Could not read ID from selected row.")
                 return
             self.current_edit_id = int(id_item.data(Qt.DisplayRole))
+            self.pending_scorecard = None
             self.course_input.setText(self.safe_text(self.table.item(selected, 1)))
             self.date_input.setDate(QDate.fromString(self.safe_text(self.table.item(selected, 2)), "yyyy-MM-dd"))
             self.cost_input.setText(self.safe_text(self.table.item(selected, 3)))
             self.score_input.setText(self.safe_text(self.table.item(selected, 4)))
+            self.show_photos(self.current_edit_id)
             self.edit_btn.setText("Update Record")
         else:
             self.update_record()
@@ -1089,46 +1860,293 @@ class GolfTracker(QMainWindow):
             QMessageBox.warning(self, "Input Error", "Please enter dollars only and a numeric score.")
             return
 
-        record_id = self.table.item(selected_row, 0).text()
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "UPDATE scores SET course=?, date=?, cost=?, score=? WHERE id=?",
-            (course, date, cost_val, score_val, record_id),
-        )
-        self.conn.commit()
-        self.load_data()
+        record_id = int(self.table.item(selected_row, 0).text())
+        if record_id < 0:
+            QMessageBox.warning(self, "Update Error", "This round is still being saved; try again in a moment.")
+            return
+        if self.reader.is_archived(record_id):
+            QMessageBox.warning(self, "Update Error", "This round is in an archived season and cannot be changed.")
+            return
+
+        # Optimistic update; the writer's commit is picked up by check_for_changes
+        self.writer.update_round(record_id, course, date, cost_val, score_val, self.pending_scorecard,
+                                 token=record_id)
+        self.table.setSortingEnabled(False)
+        self.track_row_change(old=self.table_row_values(selected_row), new=(record_id, course, date, cost_val, score_val))
+        self.fill_table_row(selected_row, (record_id, course, date, cost_val, score_val))
+        self.table.setSortingEnabled(True)
         self.select_row_by_id(record_id)
 
-        # Clear inputs and refresh autocomplete (retain these!)
+        # Clear inputs (autocomplete refreshes when the write lands)
         self.clear_inputs()
-        self.refresh_autocomplete()
         self.edit_btn.setText("Edit Record")
 
+    def on_writes_committed(self, results):
+        """Writer thread finished a batch: replace provisional rows and report failures."""
+        self.show_committed_writes(results)
+
+        failures = [res for res in results if res.error]
+        if failures:
+            if any(res.op == "update" for res in failures):
+                self.load_data(self.current_filter)   # undo optimistic edits that did not stick
+            QMessageBox.warning(
+                self, "Save Error",
+                f"{len(failures)} change(s) could not be saved:\n{failures[0].error}"
+            )
+
+    def show_committed_writes(self, results):
+        """Swap a batch's provisional rows for the committed rounds, once this connection can see them."""
+        if self.conn.in_transaction:
+            # check_for_changes would skip them until the next poll; try again once our write ends
+            QTimer.singleShot(COMMIT_RETRY_MS, lambda: self.show_committed_writes(results))
+            return
+
+        provisional = {res.token for res in results if res.op == "insert"}
+        self.table.setSortingEnabled(False)
+        for r in reversed(range(self.table.rowCount())):
+            item = self.table.item(r, 0)
+            if item and int(item.text()) in provisional:
+                self.table.removeRow(r)
+        self.table.setSortingEnabled(True)
+
+        # The writer uses its own connection, so its commit shows up as an outside change
+        self.check_for_changes()
+
+        added = [res.round_id for res in results if res.op == "insert" and res.round_id is not None]
+        if added and len(results) == 1:
+            self.refresh.flush()   # a full reload may be pending; the row must exist to select it
+            self.select_row_by_id(added[-1])
+
+    def selected_round_ids(self):
+        """Ids of every selected row, in table order."""
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        ids = [int(self.table.item(r, 0).text()) for r in rows if self.table.item(r, 0)]
+        ids = [i for i in ids if i > 0]   # provisional rows are not in the database yet
+        archived = {i for i in ids if self.reader.is_archived(i)}
+        if archived:
+            self.statusBar().showMessage(f"{len(archived)} selected round(s) are archived and read-only.", 5000)
+            ids = [i for i in ids if i not in archived]
+        return ids
+
     def delete_record(self):
-        selected = self.table.currentRow()
-        if selected < 0:
+        round_ids = self.selected_round_ids()
+        if not round_ids:
             QMessageBox.warning(self, "No Selection", "Please select a record to delete.")
             return
 
-        course = self.table.item(selected, 1).text()
-        date = self.table.item(selected, 2).text()
+        if len(round_ids) == 1:
+            selected = self.table.currentRow()
+            course = self.table.item(selected, 1).text()
+            date = self.table.item(selected, 2).text()
+            question = f"Are you sure you want to delete the round at {course} on {date}?"
+        else:
+            question = f"Are you sure you want to delete the {len(round_ids)} selected rounds?"
 
         confirm = QMessageBox.question(
             self,
             "Confirm Delete",
-            f"Are you sure you want to delete the round at {course} on {date}?",
+            question,
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No,
         )
 
         if confirm == QMessageBox.Yes:
-            record_id = int(self.table.item(selected, 0).text())
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM scores WHERE id = ?", (record_id,))
-            self.conn.commit()
-            self.load_data(self.filter_input.text().strip())
+            self.finish_bulk_edit(self.journal.delete_rounds(round_ids))
             self.clear_inputs()
 
+    # --- Photos ---
+    def thumbnail_pixmap(self, sha, side):
+        """A photo's thumbnail scaled to fit side pixels, or None while it is being made."""
+        key = f"thumb:{sha}:{side}"
+        pix = QPixmapCache.find(key)
+        if pix is not None and not pix.isNull():
+            return pix
+        path = self.thumbs.get(sha)
+        if path is None:
+            self.thumbs.request(sha)
+            return None
+        pix = QPixmap(path).scaled(side, side, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        QPixmapCache.insert(key, pix)
+        return pix
+
+    def on_thumbnail_ready(self, sha, path):
+        self.table.viewport().update()
+        if any(button.property("sha") == sha for button in self.photo_buttons):
+            self.show_photos(self.photo_round_id)
+
+    def show_photos(self, round_id):
+        """Fill the edit panel's photo strip with a round's photos (None empties it)."""
+        self.photo_round_id = round_id
+        for button in self.photo_buttons:
+            self.photo_layout.removeWidget(button)
+            button.deleteLater()
+        self.photo_buttons = []
+        if round_id is None:
+            return
+        for i, (sha, name) in enumerate(golf_attachments.attachments_for(self.conn, round_id)):
+            button = QToolButton()
+            button.setProperty("sha", sha)
+            button.setToolTip(f"{name}\nClick to view; right click to remove")
+            pix = self.thumbnail_pixmap(sha, PHOTO_STRIP_PX)
+            if pix is not None:
+                button.setIcon(QIcon(pix))
+                button.setIconSize(pix.size())
+            else:
+                button.setText("...")
+                button.setFixedSize(PHOTO_STRIP_PX, PHOTO_STRIP_PX)
+            button.clicked.connect(lambda _checked=False, s=sha, n=name: self.view_photo(s, n))
+            button.setContextMenuPolicy(Qt.CustomContextMenu)
+            button.customContextMenuRequested.connect(lambda _pos, s=sha: self.remove_photo(s))
+            self.photo_layout.insertWidget(i, button)
+            self.photo_buttons.append(button)
+
+    def attach_photos(self):
+        round_id = self.photo_round_id
+        if round_id is None:
+            QMessageBox.warning(self, "Attach Photo", "Choose a round to edit first.")
+            return
+        if round_id < 0:
+            QMessageBox.warning(self, "Attach Photo", "This round is still being saved; try again in a moment.")
+            return
+        if self.reader.is_archived(round_id):
+            QMessageBox.warning(self, "Attach Photo", "This round is in an archived season and cannot be changed.")
+            return
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Attach Photos", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif *.webp);;All Files (*)"
+        )
+        if not paths:
+            return
+
+        def attach(progress):
+            # Hashing and copying large photos happens here, off the GUI thread
+            conn = sqlite3.connect(DB_FILE, timeout=30)
+            try:
+                for done, path in enumerate(paths, 1):
+                    golf_attachments.attach(conn, DB_FILE, round_id, path)
+                    progress(done, len(paths))
+                conn.commit()
+            finally:
+                conn.close()
+
+        def attached(_result):
+            self.photos_changed(round_id)
+
+        self.run_in_background("Attaching photos", attach, attached)
+
+    def remove_photo(self, sha):
+        round_id = self.photo_round_id
+        if round_id is None:
+            return
+        confirm = QMessageBox.question(self, "Remove Photo", "Remove this photo from the round?",
+                                       QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if confirm != QMessageBox.Yes:
+            return
+        golf_attachments.detach(self.conn, round_id, sha)
+        self.conn.commit()
+        self.photos_changed(round_id)
+
+    def photos_changed(self, round_id):
+        photos = golf_attachments.attachments_for(self.conn, round_id)
+        if photos:
+            self.photo_rounds[round_id] = photos[0][0]
+        else:
+            self.photo_rounds.pop(round_id, None)
+        self.table.viewport().update()
+        if self.photo_round_id == round_id:
+            self.show_photos(round_id)
+
+    def view_photo(self, sha, name):
+        from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QScrollArea
+
+        pix = QPixmap(golf_attachments.object_path(DB_FILE, sha))
+        if pix.isNull():
+            QMessageBox.warning(self, "Photo", f"{name} could not be shown as an image.")
+            return
+        # Fit the photo to most of the screen; full size in the scroll area if it is smaller
+        screen = QApplication.primaryScreen().availableGeometry()
+        if pix.width() > screen.width() * 0.8 or pix.height() > screen.height() * 0.8:
+            pix = pix.scaled(int(screen.width() * 0.8), int(screen.height() * 0.8),
+                             Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle(name)
+        layout = QVBoxLayout(dlg)
+        label = QLabel()
+        label.setPixmap(pix)
+        label.setAlignment(Qt.AlignCenter)
+        scroll = QScrollArea()
+        scroll.setWidget(label)
+        scroll.setWidgetResizable(True)
+        layout.addWidget(scroll)
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(dlg.reject)
+        layout.addWidget(buttons)
+        dlg.resize(pix.width() + 40, pix.height() + 80)
+        dlg.exec_()
+
+    # --- Bulk edits (one transaction, one refresh, one undo entry) ---
+    def finish_bulk_edit(self, first_date):
+        if first_date is not None:
+            self.handicap.round_changed(first_date, 0)
+        self.conn.commit()
+        self.load_data(self.current_filter)
+        self.refresh.mark("autocomplete")
+
+    def bulk_rename_course(self):
+        round_ids = self.selected_round_ids()
+        if not round_ids:
+            QMessageBox.warning(self, "No Selection", "Please select the rounds to rename.")
+            return
+        current = self.safe_text(self.table.item(self.table.currentRow(), 1))
+        course, ok = QInputDialog.getText(
+            self, "Rename Course", f"New course name for {len(round_ids)} round(s):", text=current
+        )
+        course = course.strip()
+        if not ok or not course:
+            return
+        self.finish_bulk_edit(self.journal.rename_course(round_ids, course))
+
+    def bulk_adjust_cost(self):
+        round_ids = self.selected_round_ids()
+        if not round_ids:
+            QMessageBox.warning(self, "No Selection", "Please select the rounds to adjust.")
+            return
+        text, ok = QInputDialog.getText(
+            self, "Adjust Cost",
+            f"Cost change for {len(round_ids)} round(s):\n"
+            "+10 or -10 (dollars), +10% or -10%, =80 (set), x1.1 (multiply)",
+        )
+        if not ok or not text.strip():
+            return
+
+        text = text.strip().replace(" ", "").replace("$", "")
+        try:
+            if text.startswith("="):
+                mode, amount = "set", float(text[1:])
+            elif text[0] in "xX*":
+                mode, amount = "scale", float(text[1:])
+            elif text.endswith("%"):
+                mode, amount = "scale", 1 + float(text[:-1]) / 100
+            else:
+                mode, amount = "add", float(text)
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", f"Could not understand cost change '{text}'.")
+            return
+        self.finish_bulk_edit(self.journal.adjust_cost(round_ids, mode, amount))
+
+    def refresh_undo_action(self):
+        label = self.journal.last_label()
+        self.undo_action.setEnabled(label is not None)
+        self.undo_action.setText(f"Undo {label}" if label else "Undo")
+
+    def undo_last_bulk_edit(self):
+        result = self.journal.undo()
+        if result is None:
+            QMessageBox.information(self, "Undo", "Nothing to undo.")
+            return
+        _label, first_date = result
+        self.finish_bulk_edit(first_date)
+
     def delete_all_records(self):
         confirm = QMessageBox.question(self, "Confirm Delete All",
                                        "Are you sure you want to delete ALL records?",
@@ -1136,12 +2154,18 @@ class GolfTracker(QMainWindow):
         if confirm == QMessageBox.Yes:
             cursor = self.conn.cursor()
             cursor.execute("DELETE FROM scores")
+            cursor.execute("DELETE FROM handicap_history")
             self.conn.commit()
             self.load_data()
 
     def apply_or_clear_filter(self):
         if not self.filter_active:
             filter_text = self.filter_input.text().strip()
+            try:
+                compile_filter(filter_text)
+            except FilterError as e:
+                QMessageBox.warning(self, "Filter Error", str(e))
+                return
             self.load_data(filter_text)
             # Update any known filter buttons if they exist
             for btn_attr in ("filter_btn", "apply_button"):
@@ -1160,19 +2184,41 @@ class GolfTracker(QMainWindow):
 
     # --- CSV ---
     def import_csv(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Import CSV", "", "CSV Files (*.csv)")
-        if not path:
+        paths, _ = QFileDialog.getOpenFileNames(self, "Import CSV", "", "CSV Files (*.csv)")
+        if paths:
+            self.ingest_csv_files(paths)
+
+    def import_csv_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Import CSV Folder")
+        if not folder:
             return
-        cursor = self.conn.cursor()
-        with open(path, "r") as f:
-            reader = csv.reader(f)
-            next(reader, None)
-            for row in reader:
-                if len(row) >= 4:
-                    cursor.execute("INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)",
-                                   (row[0].strip(), row[1].strip(), int(float(row[2].strip())), int(float(row[3].strip()))))
-        self.conn.commit()
-        self.load_data()
+        paths = golf_ingest.csv_files_in(folder)
+        if not paths:
+            QMessageBox.information(self, "Import CSV", "There are no .csv files in that folder.")
+            return
+        self.ingest_csv_files(paths)
+
+    def ingest_csv_files(self, paths):
+        """Parse the files in worker processes and insert them on a background connection."""
+        # Rounds already in the database are skipped, so importing a file twice is harmless
+        self.writer.flush()
+
+        def ingest(progress):
+            return golf_ingest.ingest_files(DB_FILE, paths, progress=progress)
+
+        def imported(result):
+            summary, files = result
+            self.load_data()
+            self.refresh.mark("autocomplete")
+            message = summary.message()
+            if len(files) > 1 or files[0].error:
+                lines = [f.describe() for f in files]
+                if len(lines) > 20:
+                    lines = lines[:20] + [f"... and {len(lines) - 20} more file(s)"]
+                message += "\n\n" + "\n".join(lines)
+            QMessageBox.information(self, "Import CSV", message)
+
+        self.run_in_background(f"Importing {len(paths)} file(s)", ingest, imported)
 
     def export_csv(self):
         today = date.today().strftime("%Y-%m-%d")
@@ -1180,14 +2226,374 @@ class GolfTracker(QMainWindow):
         path, _ = QFileDialog.getSaveFileName(self, "Export CSV", default_filename, "CSV Files (*.csv)")
         if not path:
             return
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM scores")
+        self.writer.flush()   # include rounds still in the write-behind queue
+        cursor = self.export_connection().cursor()
+        cursor.execute("SELECT course, date, cost, score FROM scores")
         rows = cursor.fetchall()
         with open(path, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(["Course", "Date", "Cost", "Score"])
             for row in rows:
-                writer.writerow(row[1:])
+                writer.writerow(row)
+        self.warn_omitted_seasons("Export CSV")
+
+    def export_connection(self):
+        """The read connection, with every season attached (archived ones included)."""
+        self.reader.select()
+        return self.reader.conn
+
+    def warn_omitted_seasons(self, title):
+        if self.reader.omitted:
+            QMessageBox.warning(
+                self, title,
+                f"The {self.reader.omitted} oldest archived season(s) could not be opened at the same time "
+                f"as the others and are not in the export."
+            )
+
+    # --- Parquet / Feather ---
+    def columnar_available(self):
+        if golf_columnar.available():
+            return True
+        QMessageBox.warning(self, "Missing Dependency",
+                            "Parquet and Feather files need the pyarrow package:\n\npip install pyarrow")
+        return False
+
+    def export_columnar(self, fmt):
+        if not self.columnar_available():
+            return
+        today = date.today().strftime("%Y-%m-%d")
+        ext = "parquet" if fmt == "parquet" else "feather"
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Rounds", f"golf_scores_{today}.{ext}", golf_columnar.FORMATS[fmt]
+        )
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.writer.flush()   # include rounds still in the write-behind queue
+            golf_columnar.export_rounds(self.export_connection(), path, fmt)
+        except Exception as e:
+            QMessageBox.warning(self, "Export Error", f"Could not export rounds:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.warn_omitted_seasons("Export Rounds")
+
+    def import_columnar(self):
+        if not self.columnar_available():
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Rounds", "", "Parquet / Feather Files (*.parquet *.feather *.arrow)"
+        )
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            summary = golf_columnar.import_rounds(self.conn, path)
+            if summary.first_date is not None:
+                self.handicap.round_changed(summary.first_date, 0)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            QMessageBox.warning(self, "Import Error", f"Could not import rounds:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.load_data()
+        self.refresh.mark("autocomplete")
+        QMessageBox.information(self, "Import Rounds", summary.message())
+
+    # --- Background tasks ---
+    def run_in_background(self, label, fn, on_done):
+        """
+        Run fn(progress) on a worker thread; on_done(result) runs on the GUI thread.
+        fn must use its own database connection.
+        """
+        task = BackgroundTask(fn)
+        self.background_tasks.add(task)
+
+        def finish(message):
+            self.background_tasks.discard(task)
+            self.statusBar().showMessage(message, 5000)
+
+        def succeeded(result):
+            finish(f"{label}: done")
+            on_done(result)
+
+        def failed(error):
+            finish(f"{label}: failed")
+            QMessageBox.warning(self, "Error", f"{label} failed:\n{error}")
+
+        task.progress.connect(lambda done, total: self.statusBar().showMessage(f"{label}: {done}/{total}"))
+        task.done.connect(succeeded)
+        task.failed.connect(failed)
+        self.statusBar().showMessage(f"{label}...")
+        task.start()
+
+    def generate_report(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT DISTINCT substr(date, 1, 4) FROM scores WHERE date IS NOT NULL ORDER BY 1 DESC")
+        seasons = [row[0] for row in cursor.fetchall() if row[0] and row[0].isdigit()]
+        cursor.execute("SELECT DISTINCT course FROM scores WHERE course IS NOT NULL AND course != '' ORDER BY 1")
+        courses = [row[0] for row in cursor.fetchall()]
+
+        # Label -> (season, course); a course name may itself end in " Season"
+        choices = {"All Rounds": (None, None)}
+        choices.update((f"{y} Season", (int(y), None)) for y in seasons)
+        choices.update((f"Course: {c}", (None, c)) for c in courses)
+        choice, ok = QInputDialog.getItem(self, "Generate Report", "Report on:", list(choices), 0, False)
+        if not ok:
+            return
+        season, course = choices[choice]
+
+        slug = golf_render.filter_slug(str(season) if season else course)
+        path, _ = QFileDialog.getSaveFileName(self, "Save Report", f"golf_report_{slug}.pdf", "PDF Files (*.pdf)")
+        if not path:
+            return
+        self.writer.flush()   # include rounds still in the write-behind queue
+        options = self.chart_options()
+
+        def build(progress):
+            return golf_report.build_report(DB_FILE, path, season, course, options, progress)
+
+        self.run_in_background(
+            "Generating report", build,
+            lambda pages: QMessageBox.information(self, "Report", f"Wrote {pages} page(s) to {path}.")
+        )
+
+    def toggle_api_server(self, enabled):
+        """Serve the rounds as JSON on localhost (see golf_api.py)."""
+        if not enabled:
+            if self.api_server is not None:
+                self.api_server.stop()
+                self.api_server = None
+                self.statusBar().showMessage("Local API server stopped", 5000)
+            return
+
+        port = self.load_settings().get("api_port", golf_api.DEFAULT_PORT)
+        server = golf_api.ApiServerThread(DB_FILE, port)
+        try:
+            server.start()
+        except OSError as e:
+            QMessageBox.warning(self, "API Server", f"Could not start the API server on port {port}:\n{e}")
+            self.api_action.blockSignals(True)
+            self.api_action.setChecked(False)
+            self.api_action.blockSignals(False)
+            return
+        self.api_server = server
+        self.statusBar().showMessage(f"Local API server on http://{golf_api.HOST}:{port}/api/")
+
+    def render_chart_pack(self):
+        out_dir = QFileDialog.getExistingDirectory(self, "Render Chart Pack To")
+        if not out_dir:
+            return
+        self.writer.flush()   # include rounds still in the write-behind queue
+        options = self.chart_options()
+
+        def render(progress):
+            return golf_render.render_all(
+                DB_FILE, out_dir, formats=("png", "svg"), options=options, progress=progress
+            )
+
+        def rendered(result):
+            files, skipped = result
+            QMessageBox.information(
+                self, "Chart Pack",
+                f"Wrote {len(files)} file(s) to {out_dir}.\n{skipped} chart(s) were unchanged."
+            )
+
+        self.run_in_background("Rendering charts", render, rendered)
+
+    def archive_closed_seasons(self):
+        this_year = date.today().year
+        before_year, ok = QInputDialog.getInt(
+            self, "Archive Closed Seasons",
+            "Move seasons before this year into read-only archive files:",
+            this_year - 1, 1900, this_year,
+        )
+        if not ok:
+            return
+        self.writer.flush()
+
+        def archive(progress):
+            return golf_archive.archive_seasons(DB_FILE, before_year, progress=progress)
+
+        def archived(moved):
+            # The moved rounds show up as deletions from the hot database; they are
+            # still there through the archives, so reload instead of patching the table
+            self.changes.poll()
+            self.load_data(self.current_filter)
+            if not moved:
+                QMessageBox.information(self, "Archive", f"There are no rounds before {before_year} to archive.")
+                return
+            QMessageBox.information(self, "Archive", "\n".join(
+                f"{year}: {rounds} round(s) archived" for year, rounds in moved
+            ))
+
+        self.run_in_background("Archiving seasons", archive, archived)
+
+    # --- Stall detection ---
+    def start_stall_watchdog(self):
+        """Log every time the event loop is blocked for stall_threshold_ms or more (see golf_watchdog.py)."""
+        threshold = self.load_settings().get("stall_threshold_ms", golf_watchdog.DEFAULT_THRESHOLD_MS)
+        self.watchdog = golf_watchdog.StallWatchdog(golf_watchdog.log_path(DB_FILE), threshold)
+        self.stall_timer = QTimer(self)
+        self.stall_timer.timeout.connect(self.watchdog.beat)
+        self.stall_timer.start(golf_watchdog.HEARTBEAT_MS)
+        self.stall_filter = StallActionFilter(self.watchdog, self)
+        QApplication.instance().installEventFilter(self.stall_filter)
+        self.watchdog.start()
+
+    def stop_stall_watchdog(self):
+        if self.watchdog is None:
+            return
+        QApplication.instance().removeEventFilter(self.stall_filter)
+        self.stall_timer.stop()
+        self.watchdog.stop()
+        self.watchdog = None
+
+    def toggle_stall_watchdog(self, enabled):
+        if enabled:
+            self.start_stall_watchdog()
+        else:
+            self.stop_stall_watchdog()
+
+        settings = self.load_settings()
+        settings["stall_watchdog"] = enabled
+        try:
+            with open(self.get_settings_path(), "w") as f:
+                json.dump(settings, f, indent=4)
+        except Exception as e:
+            print(f"Failed to save stall detection setting: {e}")
+
+    def show_stall_report(self):
+        from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QPlainTextEdit
+        from PyQt5.QtGui import QFontDatabase
+
+        path = golf_watchdog.log_path(DB_FILE)
+        text = golf_watchdog.format_summary(golf_watchdog.read_stalls(path))
+        if self.watchdog is None:
+            text += "\n\nStall detection is off (Help > Detect UI Stalls)."
+        text += f"\n\nLog: {path}"
+
+        dlg = QDialog(self)
+        dlg.setWindowTitle("UI Stall Report")
+        dlg.resize(760, 520)
+        layout = QVBoxLayout(dlg)
+        view = QPlainTextEdit(text)
+        view.setReadOnly(True)
+        view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(view)
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(dlg.reject)
+        layout.addWidget(buttons)
+        dlg.exec_()
+
+    # --- Backups ---
+    def start_backup_schedule(self):
+        """Take a snapshot whenever the newest one is older than backup_interval_hours."""
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self.backup_if_due)
+        self.backup_timer.start(BACKUP_CHECK_MS)
+        QTimer.singleShot(0, self.backup_if_due)
+
+    def backup_if_due(self):
+        hours = self.load_settings().get("backup_interval_hours", 24)
+        if not hours or hours <= 0:
+            return
+        snapshots = golf_backup.list_snapshots(DB_FILE)
+        if snapshots and (datetime.now() - snapshots[0][1]).total_seconds() < hours * 3600:
+            return
+        self.backup_now(quiet=True)
+
+    def backup_now(self, quiet=False):
+        """Snapshot the database on a worker thread; round entry carries on meanwhile."""
+        if self.backup_running:
+            return
+        self.backup_running = True
+        keep = self.load_settings().get("backup_keep", golf_backup.DEFAULT_KEEP)
+
+        def backup(progress):
+            try:
+                return golf_backup.create_snapshot(DB_FILE, keep, progress=progress)
+            finally:
+                self.backup_running = False
+
+        def backed_up(path):
+            if not quiet:
+                QMessageBox.information(self, "Backup", f"Saved a snapshot to {path}.")
+
+        self.run_in_background("Backing up", backup, backed_up)
+
+    def restore_from_backup(self):
+        snapshots = golf_backup.list_snapshots(DB_FILE)
+        if not snapshots:
+            QMessageBox.information(self, "Restore", "There are no backups to restore yet.")
+            return
+        choices = [f"{taken:%Y-%m-%d %H:%M:%S}  ({size / 1024 / 1024:.1f} MB)" for _path, taken, size in snapshots]
+        choice, ok = QInputDialog.getItem(
+            self, "Restore from Backup",
+            "Replace all rounds with this snapshot\n(the current data is backed up first):",
+            choices, 0, False,
+        )
+        if not ok:
+            return
+        path = snapshots[choices.index(choice)][0]
+        self.writer.flush()   # nothing may be half-written when the pages are replaced
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            safety = golf_backup.restore_snapshot(path, DB_FILE)
+        except (golf_backup.SnapshotError, sqlite3.Error, OSError) as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "Restore", f"The backup could not be restored:\n{e}")
+            return
+        # The restored file may be older than our handicap, journal and change log state;
+        # create_table migrates it and starts a new ChangeTracker at the restarted log
+        self.create_table()
+        self.refresh_undo_action()
+        self.load_data(self.current_filter)
+        self.refresh.mark("autocomplete")
+        QApplication.restoreOverrideCursor()
+        QMessageBox.information(
+            self, "Restore",
+            f"Restored the backup from {snapshots[choices.index(choice)][1]:%Y-%m-%d %H:%M}.\n"
+            f"The data it replaced was saved as {os.path.basename(safety)}."
+        )
+
+    # --- Sync ---
+    def sync_with_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Sync with Database", "", "Golf Tracker Databases (*.db)")
+        if not path:
+            return
+        if os.path.abspath(path) == os.path.abspath(DB_FILE):
+            QMessageBox.warning(self, "Sync", "Choose another copy of the database, not this one.")
+            return
+        self.run_sync(lambda: golf_sync.sync_databases(DB_FILE, path))
+
+    def sync_with_folder(self):
+        """Sync with the shared copy in a folder (e.g. a cloud drive) every copy syncs with."""
+        settings = self.load_settings()
+        folder = QFileDialog.getExistingDirectory(self, "Sync Folder", settings.get("sync_folder", ""))
+        if not folder:
+            return
+        settings["sync_folder"] = folder
+        try:
+            with open(self.get_settings_path(), "w") as f:
+                json.dump(settings, f, indent=4)
+        except Exception as e:
+            print(f"Failed to save sync folder: {e}")
+        self.run_sync(lambda: golf_sync.sync_with_folder(DB_FILE, folder))
+
+    def run_sync(self, sync):
+        self.writer.flush()   # queued rounds go along
+
+        def synced(report):
+            self.check_for_changes()   # what was received shows up as outside changes
+            QMessageBox.information(self, "Sync", report.message())
+
+        self.run_in_background("Syncing", lambda _progress: sync(), synced)
 
     #def apply_chart_theme(self, fig_bg="#d6dbdf", ax_bg="#d6dbdf"):
     def apply_chart_theme(self, fig_bg="#d6dbdf", ax_bg="#d6dbdf"):
@@ -1208,26 +2614,48 @@ class GolfTracker(QMainWindow):
         layout = QVBoxLayout(self.chart_tab)
 
         # --- Chart Selector Buttons ---
+        # Store chart buttons with highlight colors
+        self.chart_buttons = {}
         button_layout = QHBoxLayout()
-        btn_avg_score = QPushButton('Average Score')
-        btn_num_rounds = QPushButton('Rounds per Course')
-        btn_best_score = QPushButton('Best Score')
-        button_layout.addWidget(btn_avg_score)
-        button_layout.addWidget(btn_num_rounds)
-        button_layout.addWidget(btn_best_score)
+        for chart_type, (label, color) in CHART_TYPES.items():
+            btn = QPushButton(label)
+            btn.setObjectName(f"chart_{chart_type}")
+            btn.clicked.connect(lambda _checked, t=chart_type: self.change_chart(t))
+            button_layout.addWidget(btn)
+            self.chart_buttons[chart_type] = (btn, color)
         layout.addLayout(button_layout)
 
-        btn_avg_score.clicked.connect(lambda: self.change_chart('average_score'))
-        btn_num_rounds.clicked.connect(lambda: self.change_chart('rounds_per_course'))
-        btn_best_score.clicked.connect(lambda: self.change_chart('best_score'))
+        # --- Trend chart options ---
+        settings = self.load_settings()
+        trend_layout = QHBoxLayout()
+        trend_layout.addWidget(QLabel("Rolling averages (rounds):"))
+        self.trend_windows_input = QLineEdit(settings.get("trend_windows", "5, 20"))
+        self.trend_windows_input.setPlaceholderText("e.g. 5, 20")
+        self.trend_windows_input.setFixedWidth(120)
+        self.trend_windows_input.returnPressed.connect(lambda: self.change_chart('trend'))
+        self.trend_cost_checkbox = QCheckBox("Show Cost")
+        self.trend_cost_checkbox.setChecked(settings.get("trend_show_cost", True))
+        self.trend_cost_checkbox.toggled.connect(lambda: self.change_chart('trend'))
+        trend_layout.addWidget(self.trend_windows_input)
+        trend_layout.addWidget(self.trend_cost_checkbox)
+        trend_layout.addStretch(1)
+        # Per-course bars: click a bar to break it down, right click (or this) to go back up
+        self.drill_up_btn = QPushButton("Up a Level")
+        self.drill_up_btn.setEnabled(False)
+        self.drill_up_btn.clicked.connect(self.drill_up)
+        trend_layout.addWidget(self.drill_up_btn)
+        layout.addLayout(trend_layout)
 
         # --- Chart Canvas (expands) ---
         self.chart_canvas = FigureCanvas(Figure(figsize=(5, 3), facecolor="#d6dbdf"))
         self.chart_axes = self.chart_canvas.figure.add_subplot(111)
+        self.chart_twin = None   # secondary y axis, only used by the trend chart
         self.chart_axes.set_facecolor("#d6dbdf")
         # Apply theme (so future changes can be centralized)
         #self.apply_chart_theme("#d6dbdf", "#d6dbdf")
         self.apply_chart_theme("#d6dbdf", "#d6dbdf")
+        self.chart_canvas.mpl_connect("button_press_event", self.on_chart_click)
+        self.chart_canvas.mpl_connect("motion_notify_event", self.on_chart_hover)
         layout.addWidget(self.chart_canvas, 1)  # stretch so canvas takes extra space
 
         # --- Stats bar (BOTTOM) ---
@@ -1236,15 +2664,8 @@ class GolfTracker(QMainWindow):
         stats_wrapper.addWidget(self.stats_label_charts)
         layout.addLayout(stats_wrapper)
 
-        # Store chart buttons with highlight colors
-        self.chart_buttons = {
-            'average_score': (btn_avg_score, '#4CAF50'),
-            'rounds_per_course': (btn_num_rounds, '#2196F3'),
-            'best_score': (btn_best_score, '#FF9800')
-        }
-
         # Default highlight
-        btn_avg_score.setStyleSheet('background-color: #4CAF50; color: black; font-weight: bold;')
+        self.theme.set_state(self.chart_buttons['average_score'][0], "selected", True)
 
         self.chart_tab.setLayout(layout)
 
@@ -0,0 +1,274 @@
+"""
+Event-loop stall detection.
+
+The GUI thread calls ``beat()`` from a short repeating timer.  A watchdog
+thread checks the time since the last beat; once it is over the threshold
+the event loop is stuck in some handler, and the watchdog samples the GUI
+thread's Python stack (``sys._current_frames``) until the beats resume.
+Each stall is then logged with its length, the stack seen most often
+while it lasted and the user action that led to it:
+
+    watchdog = StallWatchdog(log_path("golf_scores.db"), threshold_ms=50)
+    watchdog.start()
+    timer.timeout.connect(watchdog.beat)        # every HEARTBEAT_MS
+    watchdog.set_action("click 'Add Record'")
+
+The log is JSON lines, rotated at LOG_BYTES with LOG_BACKUPS old files
+kept.  A stall still going after UNFINISHED_AFTER seconds is logged at
+once (marked unfinished) in case the app never recovers and is killed.
+``summarize`` groups the stalls by the innermost app function blocking.
+"""
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime, timedelta
+
+LOG_DIR = "logs"
+LOG_NAME = "stalls.log"
+LOG_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+DEFAULT_THRESHOLD_MS = 50
+HEARTBEAT_MS = 10
+UNFINISHED_AFTER = 5.0      # seconds
+MAX_STACK = 40              # frames kept per logged stack
+INNER_FRAMES = 4            # library frames kept below the innermost app frame
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def log_path(db_path):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), LOG_DIR, LOG_NAME)
+
+
+def _open_log(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    logger = logging.getLogger(f"golf_watchdog.{os.path.abspath(path)}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+def _frames(frame):
+    """[(file, line, function)] of a stack, outermost first; app files by name only and
+    installed packages from site-packages/ down."""
+    frames = []
+    for entry in traceback.extract_stack(frame):
+        filename = entry.filename
+        if os.path.dirname(os.path.abspath(filename)) == _APP_DIR:
+            filename = os.path.basename(filename)
+        elif "site-packages" + os.sep in filename:
+            filename = filename.split("site-packages" + os.sep, 1)[1]
+        frames.append((filename, entry.lineno, entry.name))
+    return tuple(frames)
+
+
+def _is_app(filename):
+    return os.sep not in filename and filename.endswith(".py")
+
+
+def culprit(stack):
+    """
+    'file:line function' of the innermost app frame of a stack.  The outermost
+    frame only runs the event loop, so when it is the only app frame the
+    handler the loop called into (say a widget's paintEvent) is blamed instead.
+    """
+    if not stack:
+        return "?"
+    for filename, line, name in reversed(stack[1:]):
+        if _is_app(filename):
+            return f"{filename}:{line} {name}"
+    filename, line, name = stack[1] if len(stack) > 1 else stack[0]
+    return f"{filename}:{line} {name}"
+
+
+def _trim(stack):
+    """For reading: the app frames of a stack, the frame each one calls into and the
+    innermost few, with gaps marked ('...', frames skipped, '')."""
+    keep = set(range(max(0, len(stack) - INNER_FRAMES), len(stack)))
+    for i, (filename, _line, _name) in enumerate(stack):
+        if _is_app(filename):
+            keep.update((i, i + 1))
+    kept, skipped = [], 0
+    for i, frame in enumerate(stack):
+        if i in keep:
+            if skipped:
+                kept.append(("...", skipped, ""))
+                skipped = 0
+            kept.append(frame)
+        else:
+            skipped += 1
+    return kept[-MAX_STACK:]
+
+
+# --- Watchdog ---
+class StallWatchdog:
+    """Logs every time the thread that created it stops calling beat() for threshold_ms or more."""
+
+    def __init__(self, path, threshold_ms=DEFAULT_THRESHOLD_MS, heartbeat_ms=HEARTBEAT_MS):
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self.heartbeat = heartbeat_ms / 1000
+        self.target = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.action = None
+        self.action_at = None
+        self.stalls = 0
+        self._logger = _open_log(path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def beat(self):
+        """Called from the watched thread's event loop."""
+        self.last_beat = time.monotonic()
+
+    def set_action(self, label):
+        """The user action now being handled; stalls are attributed to the latest one."""
+        self.action = label
+        self.action_at = time.monotonic()
+
+    def _late(self, now):
+        # The timer itself may be up to a heartbeat late without anything being wrong
+        return now - self.last_beat - self.heartbeat
+
+    def _run(self):
+        poll = min(self.threshold / 4, 0.01)
+        while not self._stop.wait(poll):
+            if self._late(time.monotonic()) >= self.threshold:
+                self._follow_stall(poll)
+
+    def _follow_stall(self, poll):
+        """Sample the stuck thread's stack until it beats again, then log the stall."""
+        beat = self.last_beat
+        action, action_at = self.action, self.action_at
+        samples = Counter()
+        started = datetime.now() - timedelta(seconds=time.monotonic() - beat - self.heartbeat)
+        logged_unfinished = False
+        while self.last_beat == beat and not self._stop.is_set():
+            frame = sys._current_frames().get(self.target)
+            if frame is None:       # the watched thread has exited
+                return
+            samples[_frames(frame)] += 1
+            del frame
+            if not logged_unfinished and time.monotonic() - beat >= UNFINISHED_AFTER:
+                self._write(started, beat, time.monotonic() - beat, samples, action, action_at, True)
+                logged_unfinished = True
+            time.sleep(poll)
+        # Measured from when the next beat was due; last_beat is when the loop got going again
+        seconds = self.last_beat - beat - self.heartbeat
+        if seconds >= self.threshold:
+            self.stalls += 1
+            self._write(started, beat, seconds, samples, action, action_at, False)
+
+    def _write(self, started, beat, seconds, samples, action, action_at, unfinished):
+        stack, hits = samples.most_common(1)[0]
+        record = {
+            "id": f"{started:%Y%m%d%H%M%S%f}",
+            "at": started.isoformat(timespec="seconds"),
+            "ms": round(seconds * 1000, 1),
+            "action": action,
+            "action_ago_ms": None if action_at is None else round((beat - action_at) * 1000),
+            "where": culprit(stack),
+            "samples": sum(samples.values()),
+            "share": round(hits / sum(samples.values()), 2),    # of samples that saw this stack
+            "stack": [list(frame) for frame in _trim(stack)],
+        }
+        if unfinished:
+            record["unfinished"] = True
+        self._logger.info(json.dumps(record))
+
+
+# --- Reading the log ---
+def read_stalls(path):
+    """Every stall in the log and its rotated files, oldest first (an unfinished entry is
+    replaced by its final one)."""
+    stalls = {}
+    for i in range(LOG_BACKUPS, -1, -1):
+        name = f"{path}.{i}" if i else path
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                stalls[record.get("id")] = record
+    return sorted(stalls.values(), key=lambda r: r.get("at", ""))
+
+
+def summarize(stalls):
+    """Stalls grouped by where they blocked, worst total first:
+    [{where, count, total_ms, max_ms, actions: Counter, last, worst}]."""
+    groups = {}
+    for s in stalls:
+        g = groups.setdefault(s["where"], {
+            "where": s["where"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "actions": Counter(), "last": None, "worst": s,
+        })
+        g["count"] += 1
+        g["total_ms"] += s["ms"]
+        g["actions"][s.get("action") or "(no recent input)"] += 1
+        g["last"] = s["at"]
+        if s["ms"] >= g["max_ms"]:
+            g["max_ms"], g["worst"] = s["ms"], s
+    return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+
+
+def format_summary(stalls, limit=10):
+    """Plain-text report of the worst code paths, with the stack of each one's longest stall."""
+    if not stalls:
+        return "No stalls recorded."
+    groups = summarize(stalls)
+    total = sum(s["ms"] for s in stalls)
+    lines = [f"{len(stalls)} stall(s), {total / 1000:.1f} s in all, "
+             f"{stalls[0]['at']} to {stalls[-1]['at']}", ""]
+    for g in groups[:limit]:
+        actions = ", ".join(f"{a} ({n})" for a, n in g["actions"].most_common(3))
+        worst = g["worst"]
+        lines.append(f"{g['where']}")
+        lines.append(f"    {g['count']} stall(s), {g['total_ms']:.0f} ms total, "
+                     f"{g['max_ms']:.0f} ms longest, last {g['last']}")
+        lines.append(f"    after: {actions}")
+        lines.append(f"    longest{' (unfinished)' if worst.get('unfinished') else ''}:")
+        for filename, line, name in worst["stack"]:
+            if filename == "...":
+                lines.append(f"        ... {line} frame(s)")
+            else:
+                lines.append(f"        {filename}:{line} {name}")
+        lines.append("")
+    if len(groups) > limit:
+        lines.append(f"... and {len(groups) - limit} more place(s)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize Golf Tracker UI stalls.")
+    parser.add_argument("--db", default="golf_scores.db", help="the log next to this database")
+    parser.add_argument("--log", help="a stall log to read instead")
+    parser.add_argument("--limit", type=int, default=10, help="places to show")
+    args = parser.parse_args()
+
+    print(format_summary(read_stalls(args.log or log_path(args.db)), args.limit))
@@ -0,0 +1,171 @@
+"""
+Write-behind queue for round entry.
+
+Inserts and updates are queued from the GUI (or a script) and applied by a
+dedicated writer thread on its own connection.  The thread group-commits:
+it takes whatever is pending, up to ``batch_size`` operations or
+``flush_interval`` seconds after the first one, applies them in a single
+transaction and calls ``on_batch_done`` with one result per operation.
+
+Every operation runs inside its own SAVEPOINT, so a bad row fails alone
+instead of taking the rest of the batch with it.  The queue is bounded:
+once ``max_pending`` operations are waiting, ``submit`` blocks, which
+throttles runaway scripts instead of growing memory without limit.
+"""
+import queue
+import sqlite3
+import threading
+import time
+
+from golf_handicap import HandicapEngine
+
+_STOP = object()
+
+
+class WriteResult:
+    """Outcome of one queued operation; round_id is None when it failed."""
+
+    __slots__ = ("token", "op", "round_id", "error")
+
+    def __init__(self, token, op, round_id=None, error=None):
+        self.token = token
+        self.op = op
+        self.round_id = round_id
+        self.error = error
+
+
+class WriteBehindQueue:
+    def __init__(self, db_path, on_batch_done, batch_size=500, flush_interval=0.005, max_pending=10000):
+        self.db_path = db_path
+        self.on_batch_done = on_batch_done
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._run, name="golf-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    # --- Producer side ---
+    def submit(self, op, args, token=None):
+        self.queue.put((op, args, token))
+
+    def insert_round(self, course, date, cost, score, holes=None, token=None):
+        """Queue a new round; holes is an optional packed scorecard."""
+        self.submit("insert", (course, date, cost, score, holes), token)
+
+    def update_round(self, round_id, course, date, cost, score, holes=None, token=None):
+        """Queue an update; holes None leaves the scorecard alone, b"" removes it."""
+        self.submit("update", (round_id, course, date, cost, score, holes), token)
+
+    def pending(self):
+        return self.queue.unfinished_tasks
+
+    def flush(self):
+        """Block until everything queued so far is committed (or failed)."""
+        self.queue.join()
+
+    def close(self):
+        """Commit what is pending and stop the writer thread."""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+
+    # --- Writer thread ---
+    def _run(self):
+        # isolation_level=None: transactions and savepoints are managed explicitly below
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        handicap = HandicapEngine(conn)
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                self.queue.task_done()
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    self.queue.task_done()
+                    break
+                batch.append(item)
+
+            results = self._commit_batch(conn, handicap, batch)
+            for _ in batch:
+                self.queue.task_done()
+            try:
+                self.on_batch_done(results)
+            except Exception as e:
+                print(f"Write-behind callback failed: {e}")
+        conn.close()
+
+    def _commit_batch(self, conn, handicap, batch):
+        results = []
+        first_date = None
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for op, args, token in batch:
+                cursor.execute("SAVEPOINT queued_op")
+                try:
+                    round_id, touched = self._apply(cursor, op, args)
+                    cursor.execute("RELEASE queued_op")
+                    results.append(WriteResult(token, op, round_id))
+                    if first_date is None or touched < first_date:
+                        first_date = touched
+                except (sqlite3.Error, ValueError, TypeError) as e:
+                    cursor.execute("ROLLBACK TO queued_op")
+                    cursor.execute("RELEASE queued_op")
+                    results.append(WriteResult(token, op, error=str(e)))
+
+            # One handicap pass for the whole batch, from its earliest round
+            if first_date is not None:
+                handicap.round_changed(first_date, 0)
+            cursor.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            return [WriteResult(token, op, error=f"Commit failed: {e}") for op, _args, token in batch]
+        return results
+
+    def _apply(self, cursor, op, args):
+        """Run one operation; returns (round_id, earliest date it affects)."""
+        if op == "insert":
+            course, date, cost, score, holes = args
+            cursor.execute(
+                "INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)",
+                (course, date, int(cost), int(score)),
+            )
+            round_id = cursor.lastrowid
+            if holes:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO scorecards (round_id, holes) VALUES (?, ?)", (round_id, holes)
+                )
+            return round_id, date
+
+        if op == "update":
+            round_id, course, date, cost, score, holes = args
+            cursor.execute("SELECT date FROM scores WHERE id = ?", (round_id,))
+            old = cursor.fetchone()
+            if old is None:
+                raise ValueError("This round was deleted before the change was saved.")
+            cursor.execute(
+                "UPDATE scores SET course=?, date=?, cost=?, score=? WHERE id=?",
+                (course, date, int(cost), int(score), round_id),
+            )
+            if holes == b"":
+                cursor.execute("DELETE FROM scorecards WHERE round_id = ?", (round_id,))
+            elif holes is not None:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO scorecards (round_id, holes) VALUES (?, ?)", (round_id, holes)
+                )
+            return round_id, min(date, old[0])
+
+        raise ValueError(f"Unknown write operation: {op}")
@@ -0,0 +1,24 @@
+"""
+Shared fixtures.  The app's modules live flat in the repository root, so it
+goes on sys.path; databases are built in each test's tmp_path.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import create_db, make_rounds  # noqa: E402
+
+
+@pytest.fixture
+def rounds():
+    return make_rounds(400)
+
+
+@pytest.fixture
+def db_path(tmp_path, rounds):
+    path = str(tmp_path / "golf_scores.db")
+    create_db(path, rounds).close()
+    return path
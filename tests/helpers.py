@@ -0,0 +1,33 @@
+"""Building test databases shaped like the shipped golf_scores.db."""
+import random
+import sqlite3
+from datetime import date, timedelta
+
+COURSES = ("Pebble Beach", "Pinehurst", "Calusa", "Torrey Pines", "Bethpage")
+
+
+def make_rounds(n, seed=1, start=date(2022, 1, 1), days=4 * 365):
+    """n random (course, date, cost, score) rounds between start and start + days."""
+    rng = random.Random(seed)
+    return [
+        (rng.choice(COURSES), (start + timedelta(days=rng.randrange(days))).isoformat(),
+         rng.randrange(20, 250), rng.randrange(68, 115))
+        for _ in range(n)
+    ]
+
+
+def create_db(path, rounds=()):
+    """A database shaped like the shipped golf_scores.db: only the scores table."""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE scores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course TEXT NOT NULL,
+            date TEXT NOT NULL,
+            cost REAL NOT NULL,
+            score INTEGER NOT NULL
+        )
+    """)
+    conn.executemany("INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)", rounds)
+    conn.commit()
+    return conn
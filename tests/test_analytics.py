@@ -0,0 +1,31 @@
+import sqlite3
+
+from golf_analytics import course_breakdown, load_columns, month_breakdown, summarize
+
+
+def columns(rounds):
+    # Older and imported databases have no NOT NULL constraints
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE scores (id INTEGER PRIMARY KEY, course TEXT, date TEXT, cost REAL, score INTEGER)")
+    conn.executemany("INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)", rounds)
+    return load_columns(conn)
+
+
+def test_missing_costs_are_left_out_of_averages():
+    cols = columns([("Calusa", "2024-01-05", 100, 80), ("Calusa", "2024-01-12", None, 90),
+                    ("Bethpage", "2024-02-01", None, 85)])
+
+    summary = summarize(cols)
+    assert summary["total_cost"] == 100
+    assert summary["avg_cost"] == 100
+    assert summary["cost_per_stroke"] == 100 / 80
+    assert course_breakdown(cols) == [("Calusa", 2, 85.0, 80, 100.0), ("Bethpage", 1, 85.0, 85, None)]
+
+
+def test_months_skip_missing_and_irregular_dates():
+    cols = columns([("Calusa", "2024-01-05", 50, 80), ("Calusa", None, 60, 82),
+                    ("Calusa", "13/02/2024", 70, 84), ("Calusa", "2024-03-01", None, 90)])
+
+    assert month_breakdown(cols) == [("2024-01", 1, 80.0, 50.0), ("2024-03", 1, 90.0, 0.0)]
+    assert month_breakdown(columns([("Calusa", None, 50, 80)])) == []
+    assert summarize(cols)["rounds"] == 4
@@ -0,0 +1,83 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import golf_archive
+from golf_archive import PartitionedReader, archive_file, archive_seasons
+from golf_dedupe import insert_rounds
+from golf_handicap import HandicapEngine
+
+
+def all_rounds(conn):
+    return sorted(conn.execute("SELECT id, course, date, cost, score FROM scores").fetchall())
+
+
+def test_archive_round_trip(db_path):
+    before = all_rounds(sqlite3.connect(db_path))
+
+    moved = archive_seasons(db_path, 2024)
+
+    assert [year for year, _n in moved] == [2022, 2023]
+    assert sum(n for _year, n in moved) == sum(r[2] < "2024" for r in before)
+    for year in (2022, 2023):
+        assert os.path.exists(archive_file(db_path, year))
+    hot = sqlite3.connect(db_path)
+    assert hot.execute("SELECT COUNT(*) FROM scores WHERE date < '2024'").fetchone()[0] == 0
+
+    reader = PartitionedReader(db_path)
+    reader.select()
+    assert all_rounds(reader.conn) == before
+    # A year filter attaches that season's file only
+    reader.select_for("2023")
+    assert list(reader.attached) == [2023]
+    count = reader.conn.execute("SELECT COUNT(*) FROM scores WHERE date >= '2023' AND date < '2024'").fetchone()[0]
+    assert count == sum(r[2].startswith("2023") for r in before)
+    reader.close()
+
+
+def test_reimport_skips_archived_rounds(db_path, rounds):
+    archive_seasons(db_path, 2025)
+    conn = sqlite3.connect(db_path)
+    summary = insert_rounds(conn, rounds)
+    assert summary.inserted == 0
+    assert summary.skipped == len(rounds)
+
+
+def test_failed_archive_leaves_no_file(db_path, monkeypatch):
+    def broken(path):
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(golf_archive, "_compact", broken)
+    before = all_rounds(sqlite3.connect(db_path))
+
+    with pytest.raises(sqlite3.OperationalError, match="disk I/O"):
+        archive_seasons(db_path, 2024)
+
+    assert not os.path.exists(archive_file(db_path, 2022))
+    assert all_rounds(sqlite3.connect(db_path)) == before
+
+
+def test_handicap_sees_archived_neighbours(db_path, tmp_path):
+    # The same database, never archived, is the reference
+    plain = str(tmp_path / "plain.db")
+    shutil.copy(db_path, plain)
+    archive_seasons(db_path, 2024)
+
+    backdated = (10_000, "Pinehurst", "2023-06-15", 80, 71)
+    for path in (db_path, plain):
+        conn = sqlite3.connect(path)
+        engine = HandicapEngine(conn)
+        if engine.needs_backfill():
+            engine.backfill()
+        conn.execute("INSERT INTO scores (id, course, date, cost, score) VALUES (?, ?, ?, ?, ?)", backdated)
+        engine.round_changed(backdated[2], backdated[0])
+        conn.commit()
+        conn.close()
+
+    def history(path):
+        return sqlite3.connect(path).execute(
+            "SELECT round_id, date, differential, handicap_index FROM handicap_history ORDER BY date, round_id"
+        ).fetchall()
+
+    assert history(db_path) == history(plain)
@@ -0,0 +1,63 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import golf_attachments
+from golf_attachments import (
+    PARTIAL_SUFFIX, ThumbnailCache, attach, collect_garbage, install_attachments, object_path,
+)
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    install_attachments(conn)
+    return conn
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def test_collect_garbage_keeps_referenced_and_partial_files(conn, db_path, tmp_path):
+    kept = attach(conn, db_path, 1, write(tmp_path / "card.txt", b"card"))
+    dropped = attach(conn, db_path, 2, write(tmp_path / "old.txt", b"old"))
+    conn.execute("DELETE FROM attachments WHERE round_id = 2")
+    conn.commit()
+    copying = write(os.path.join(os.path.dirname(object_path(db_path, kept)), "tmpx" + PARTIAL_SUFFIX), b"half")
+
+    assert collect_garbage(conn, db_path) == (1, 3)
+    assert os.path.exists(object_path(db_path, kept))
+    assert not os.path.exists(object_path(db_path, dropped))
+    assert os.path.exists(copying)
+
+
+def test_thumbnail_failures(conn, db_path, tmp_path, monkeypatch):
+    sha = attach(conn, db_path, 1, write(tmp_path / "notes.txt", b"not an image"))
+    ready = []
+    done = threading.Event()
+
+    def on_ready(sha, path):
+        ready.append(path)
+        done.set()
+
+    cache = ThumbnailCache(db_path, on_ready=on_ready)
+    try:
+        def fail(_db_path, _sha):
+            raise OSError("disk gone")
+        monkeypatch.setattr(golf_attachments, "object_path", fail)
+        cache.request(sha)
+        assert done.wait(10) and ready == [None]    # reported, not lost in the pool
+
+        monkeypatch.undo()
+        done.clear()
+        cache.request(sha)                          # an error is retried...
+        assert done.wait(10) and ready == [None, None]
+        cache.request(sha)                          # ...a file that is not an image is not
+        assert sha in cache._failed and not cache._pending
+    finally:
+        cache.shutdown()
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from golf_backup import SnapshotError, create_snapshot, list_snapshots, prune_snapshots, restore_snapshot
+from golf_changes import ChangeTracker, install_change_log
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS scorecards (round_id INTEGER PRIMARY KEY, holes BLOB NOT NULL)")
+    install_change_log(conn)
+    conn.commit()
+    return conn
+
+
+def all_rounds(conn):
+    return conn.execute("SELECT * FROM scores ORDER BY id").fetchall()
+
+
+def test_snapshot_and_restore(conn, db_path):
+    before = all_rounds(conn)
+    snapshot = create_snapshot(db_path, pause=0)
+    conn.execute("DELETE FROM scores WHERE id % 3 = 0")
+    conn.execute("UPDATE scores SET score = 0")
+    conn.commit()
+    after = all_rounds(conn)
+
+    safety = restore_snapshot(snapshot, db_path)
+
+    assert all_rounds(conn) == before      # an open connection sees the restored data
+    assert all_rounds(sqlite3.connect(safety)) == after
+    assert {path for path, _taken, _size in list_snapshots(db_path)} == {snapshot, safety}
+
+
+def test_restore_makes_other_instances_reload(conn, db_path):
+    snapshot = create_snapshot(db_path, pause=0)
+    other = sqlite3.connect(db_path)
+    tracker = ChangeTracker(other)
+    for _ in range(3):
+        conn.execute("INSERT INTO scores (course, date, cost, score) VALUES ('Calusa', '2025-01-01', 10, 80)")
+        conn.commit()
+        assert tracker.poll()
+
+    restore_snapshot(snapshot, db_path)     # the snapshot's log ends before the tracker's position
+
+    assert tracker.poll() == ChangeTracker.FULL_RELOAD
+    assert not tracker.poll()
+
+
+def test_snapshots_in_the_same_second_are_all_kept(db_path):
+    paths = [create_snapshot(db_path, pause=0) for _ in range(3)]
+    assert len(set(paths)) == 3
+    assert len(list_snapshots(db_path)) == 3
+    assert len(prune_snapshots(db_path, keep=1)) == 2
+    assert [path for path, _taken, _size in list_snapshots(db_path)] == [paths[-1]]
+
+
+def test_a_damaged_snapshot_is_not_restored(conn, db_path, tmp_path):
+    bad = tmp_path / "golf_scores_20240101-000000.db"
+    bad.write_bytes(b"SQLite format 3\0" + b"\xff" * 4096)
+    with pytest.raises(SnapshotError):
+        restore_snapshot(str(bad), db_path)
+    assert len(all_rounds(conn)) == 400
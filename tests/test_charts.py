@@ -0,0 +1,16 @@
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure  # noqa: E402
+
+from golf_charts import draw_chart  # noqa: E402
+
+
+def test_handicap_chart_skips_dates_that_do_not_parse():
+    ax = Figure().add_subplot()
+    history = [("2024-01-0%d" % day, 10.0 + day, None if day < 3 else 9.0 + day)
+               for day in range(1, 6)]
+    history[1] = ("13/02/2024", 12.0, None)
+    history[3] = (None, 14.0, 13.0)
+    draw_chart(ax, "handicap", {"history": history}, {})
+    index_line, = ax.get_lines()
+    assert len(index_line.get_xdata()) == 2    # 01-03 and 01-05; 01-04 has no date
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+import golf_cube
+from golf_cube import Cube
+from helpers import make_rounds
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    # Dates the cube cannot place, which still count towards the course totals
+    conn.executemany("INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)",
+                     [("Calusa", "spring 2023", 40, 99), ("Pinehurst", "2023-02-30", 300, 70)])
+    conn.commit()
+    return conn
+
+
+def sql_cells(conn, key, where=""):
+    """{key: (rounds, score sum, best, worst, cost sum)} straight from SQL."""
+    return {
+        row[0]: row[1:] for row in conn.execute(
+            f"SELECT {key}, COUNT(*), SUM(score), MIN(score), MAX(score), CAST(SUM(cost) AS INTEGER) "
+            f"FROM scores {where} GROUP BY 1"
+        )
+    }
+
+
+def cube_cells(cells):
+    return {key: (c.rounds, c.score_sum, c.best, c.worst, c.cost_sum) for key, c in cells.items()}
+
+
+@pytest.fixture(params=[10 ** 6, 64], ids=["one chunk", "merged chunks"])
+def cube(request, conn, monkeypatch):
+    monkeypatch.setattr(golf_cube, "FETCH_ROWS", request.param)
+    return Cube.load(conn)
+
+
+def test_course_rollup_matches_sql(conn, cube):
+    assert cube_cells(cube.rollup("course")) == sql_cells(conn, "course")
+
+
+def test_year_rollup_matches_sql(conn, cube):
+    expected = sql_cells(conn, "CAST(strftime('%Y', date) AS INTEGER)", "WHERE course = 'Calusa'")
+    assert cube_cells(cube.rollup("year", course="Calusa")) == expected
+
+
+def test_month_and_weekday_rollups_match_sql(conn, cube):
+    months = sql_cells(conn, "CAST(strftime('%m', date) AS INTEGER) - 1", "WHERE date LIKE '2024-%'")
+    assert cube_cells(cube.rollup("month", year=2024)) == months
+    # SQLite counts weekdays from Sunday, the cube from Monday
+    weekdays = sql_cells(conn, "(CAST(strftime('%w', date) AS INTEGER) + 6) % 7",
+                         "WHERE course = 'Bethpage' AND date LIKE '2023-%'")
+    assert cube_cells(cube.rollup("weekday", course="Bethpage", year=2023)) == weekdays
+
+
+def test_undated_rounds_have_their_own_bucket(cube):
+    assert cube.rollup("year", course="Calusa")[None].rounds == 1
+    assert list(cube.rollup("month", year=None)) == [None]
+    assert cube.rollup("month", year=None)[None].rounds == 2
+
+
+def test_added_rounds_match_sql(conn):
+    cube = Cube.load(conn)
+    for course, day, cost, score in make_rounds(50, seed=7):
+        cube.add(course, day, cost, score)
+        conn.execute("INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)", (course, day, cost, score))
+    assert cube_cells(cube.rollup("course")) == sql_cells(conn, "course")
+
+
+def test_remove_reports_when_a_rebuild_is_needed(conn):
+    cube = Cube.load(conn)
+    for cost, score in ((50, 80), (60, 85), (70, 90)):
+        cube.add("Links", "2025-03-03", cost, score)
+
+    assert cube.remove("Links", "2025-03-03", 60, 85) is True      # inside the cell's min and max
+    assert cube_cells(cube.rollup("course"))["Links"] == (2, 170, 80, 90, 120)
+    assert cube.remove("Links", "2025-03-03", 70, 90) is False     # was the cell's worst score
+
+
+def test_remove_of_an_unknown_round_asks_for_a_rebuild(cube):
+    assert cube.remove("Nowhere", "2024-01-01", 10, 80) is False
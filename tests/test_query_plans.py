@@ -0,0 +1,55 @@
+import pytest
+
+from helpers import create_db, make_rounds
+from golf_query import INDEXES, FilterError, check_plans, compile_filter, install_indexes
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = create_db(str(tmp_path / "plans.db"), make_rounds(2000))
+    install_indexes(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    return conn
+
+
+def test_every_filter_is_index_backed(conn):
+    assert check_plans(conn) == []
+
+
+def test_a_missing_index_is_reported(conn):
+    conn.execute("DROP INDEX idx_scores_date")
+    problems = check_plans(conn)
+    assert problems
+    assert {f for f, _detail in problems} >= {"2024", "date<2024-07-01"}
+
+
+def test_install_indexes_is_self_contained(tmp_path):
+    # Nothing but the scores table, as in a database the app has never opened
+    conn = create_db(str(tmp_path / "bare.db"))
+    install_indexes(conn)
+    assert check_plans(conn) == []
+    assert len(INDEXES) == len(conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall())
+
+
+@pytest.mark.parametrize("text, rows", [
+    ("", 3), ("pebble", 2), ('course="Pebble Beach"', 1), ("2024", 2), ("2024-06", 1),
+    ("year:2023..2024", 3), ("score<80", 2), ("score:70..79 cost>=100", 1), ("pebble 2024-06-15", 1),
+])
+def test_filters_select_the_right_rounds(tmp_path, text, rows):
+    conn = create_db(str(tmp_path / "f.db"), [
+        ("Pebble Beach", "2024-06-15", 120, 75),
+        ("Pebble Creek", "2024-02-01", 40, 79),
+        ("Pinehurst", "2023-09-09", 90, 88),
+    ])
+    where_clause, params = compile_filter(text)
+    assert conn.execute("SELECT COUNT(*) FROM scores" + where_clause, params).fetchone()[0] == rows
+
+
+@pytest.mark.parametrize("text", [
+    'course:"pebble', "foo:1", "score<abc", "year:20x", "date<2024-13", "2024-02-30", "score:", "course>x",
+])
+def test_bad_filters_raise(text):
+    with pytest.raises(FilterError):
+        compile_filter(text)
+
@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+import golf_roundstore
+from golf_query import compile_filter, load_rounds
+from golf_roundstore import RoundStore
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)",
+                     [("Calusa", "spring 2023", 40, 99), ("Calusa", "2023-2-3", 45, 97)])
+    conn.commit()
+    return conn
+
+
+def rows(store):
+    return [r.as_tuple() for r in store]
+
+
+def test_load_matches_load_rounds(conn):
+    store = RoundStore.load(conn)
+    assert rows(store) == load_rounds(conn)
+    assert not store.truncated
+    assert store.bytes_per_round() < 40
+
+
+def test_load_applies_the_filter(conn):
+    where_clause, params = compile_filter("course:Pinehurst 2023")
+    assert rows(RoundStore.load(conn, where_clause, params)) == load_rounds(conn, where_clause, params)
+
+
+def test_irregular_dates_come_back_as_written(conn):
+    store = RoundStore.load(conn)
+    assert {r.date for r in store if r.cost in (40, 45)} >= {"spring 2023", "2023-2-3"}
+    assert set(store.irregular_dates.values()) == {"spring 2023", "2023-2-3"}
+
+
+def test_budget_truncates(conn, monkeypatch):
+    monkeypatch.setattr(golf_roundstore, "FETCH_ROWS", 50)   # the budget is checked per chunk
+    store = RoundStore.load(conn, budget_mb=0.001)
+    assert store.truncated
+    assert 0 < len(store) < len(load_rounds(conn))
+
+
+def test_patching_follows_the_rows(conn):
+    store = RoundStore.load(conn)
+    expected = load_rounds(conn)
+    irregular = next(i for i, r in enumerate(expected) if r[2] == "spring 2023")
+
+    i = store.index_of(expected[3][0])
+    store.replace(i, expected[3][0], "New Course", "2030-01-01", None, 70)
+    expected[3] = (expected[3][0], "New Course", "2030-01-01", None, 70)
+    store.remove(0)
+    del expected[0]
+    store.append(9999, None, None, 10, None)
+    expected.append((9999, None, None, 10, None))
+
+    assert rows(store) == expected
+    assert store[irregular - 1].date == "spring 2023"      # shifted by the removal
+    assert store.index_of(expected[0][0]) == 0 and store.index_of(-5) is None
+    assert store[-1].id == 9999
+    with pytest.raises(IndexError):
+        store[len(store)]
@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+import pytest
+
+from golf_roundstore import RoundStore
+from golf_sketch import DEFAULT_K, CourseSketches, KLLSketch
+from helpers import make_rounds
+
+QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+# The rank error is about 1.7 / k; leave room for an unlucky compaction
+RANK_ERROR = 3 / DEFAULT_K
+
+
+def rank_error(values, sketch, q):
+    """How far from q the sketch's q-quantile really is, in rank."""
+    values = np.sort(values)
+    return abs(np.searchsorted(values, sketch.quantile(q), side="right") / len(values) - q)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_quantiles_are_within_the_rank_bound(seed):
+    rng = random.Random(seed)
+    values = [rng.gauss(90, 12) for _ in range(50000)]
+    sketch = KLLSketch(seed=seed)
+    sketch.update_many(values)
+
+    assert len(sketch) == len(values)
+    assert sketch.retained() < 3 * DEFAULT_K
+    for q in QUANTILES:
+        assert rank_error(values, sketch, q) <= RANK_ERROR
+
+
+def test_update_and_update_many_agree():
+    rng = random.Random(4)
+    values = [rng.uniform(60, 130) for _ in range(20000)]
+    one_by_one, batched = KLLSketch(seed=1), KLLSketch(seed=1)
+    for value in values:
+        one_by_one.update(value)
+    batched.update_many(values)
+    for q in QUANTILES:
+        assert rank_error(values, one_by_one, q) <= RANK_ERROR
+        assert rank_error(values, batched, q) <= RANK_ERROR
+
+
+def test_merged_sketches_keep_the_bound():
+    rng = random.Random(5)
+    parts = [[rng.expovariate(1 / (20 + 10 * i)) for _ in range(8000)] for i in range(6)]
+    merged = KLLSketch(seed=0)
+    for i, part in enumerate(parts):
+        sketch = KLLSketch(seed=i)
+        sketch.update_many(part)
+        merged.merge(sketch)
+
+    values = [v for part in parts for v in part]
+    assert len(merged) == len(values)
+    for q in QUANTILES:
+        assert rank_error(values, merged, q) <= RANK_ERROR
+
+
+def test_small_sketches_are_exact():
+    sketch = KLLSketch()
+    sketch.update_many([72, 90, 81, 85, 77])
+    assert sketch.quantile(0.5) == 81
+    assert sketch.rank(85) == 0.8
+    assert KLLSketch().quantile(0.5) is None
+
+
+def store_of(rounds):
+    store = RoundStore()
+    store.extend((i, course, day, cost, score) for i, (course, day, cost, score) in enumerate(rounds, 1))
+    return store
+
+
+def test_course_bands_match_exact_percentiles():
+    rounds = make_rounds(30000, seed=3)
+    sketches = CourseSketches.from_store(store_of(rounds))
+
+    scores = [score for _c, _d, _cost, score in rounds]
+    low, high = sketches.bands(10)
+    assert abs(np.mean(np.array(scores) <= low) - 0.1) <= RANK_ERROR + 1 / 47   # 47 distinct scores
+    assert abs(np.mean(np.array(scores) < high) - 0.9) <= RANK_ERROR + 1 / 47
+    calusa = [score for course, _d, _cost, score in rounds if course == "Calusa"]
+    assert len(sketches.courses["Calusa"]) == len(calusa)
+
+
+def test_refresh_resketches_only_stale_courses():
+    rounds = make_rounds(2000, seed=8)
+    store = store_of(rounds)
+    sketches = CourseSketches.from_store(store)
+    untouched = sketches.courses["Pinehurst"]
+
+    i = next(i for i, r in enumerate(store) if r.course == "Calusa")
+    sketches.remove("Calusa")
+    sketches.add("Calusa", 200)     # ignored until the refresh
+    store.remove(i)
+    sketches.refresh(store)
+
+    assert sketches.courses["Pinehurst"] is untouched
+    assert len(sketches.courses["Calusa"]) == sum(r.course == "Calusa" for r in store)
+    assert len(sketches.overall()) == len(store)
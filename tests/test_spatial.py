@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from golf_spatial import GridIndex
+
+
+def brute_force(x, y, qx, qy, sx, sy, radius):
+    d = np.hypot((x - qx) * sx, (y - qy) * sy)
+    best = d.min()
+    return None if best > radius else (best, int(np.count_nonzero(d == best)))
+
+
+@pytest.mark.parametrize("n, cells", [(20000, None), (500, None), (3000, 1), (3000, 200)])
+def test_nearest_matches_brute_force(n, cells):
+    rng = np.random.default_rng(n)
+    x = rng.integers(0, 300, n).astype(float)          # cost: many ties
+    y = rng.normal(88, 8, n).round()                   # score
+    index = GridIndex(x, y, cells)
+
+    for qx, qy in zip(rng.uniform(-20, 320, 300), rng.uniform(50, 130, 300)):
+        for sx, sy, radius in ((2.5, 8.0, 6), (0.5, 1.0, np.inf), (40.0, 40.0, 10)):
+            hit = index.nearest(qx, qy, sx, sy, radius)
+            expected = brute_force(x, y, qx, qy, sx, sy, radius)
+            if expected is None:
+                assert hit is None
+            else:
+                i, distance, ties = hit
+                assert np.isclose(distance, expected[0])
+                assert np.isclose(np.hypot((x[i] - qx) * sx, (y[i] - qy) * sy), expected[0])
+                assert ties == expected[1]
+
+
+def test_within_covers_every_point_in_the_box():
+    rng = np.random.default_rng(7)
+    x, y = rng.uniform(0, 1, 5000), rng.uniform(0, 1, 5000)
+    index = GridIndex(x, y)
+    for qx, qy, r in ((0.5, 0.5, 0.05), (0.0, 1.0, 0.2), (0.99, 0.01, 0.001)):
+        inside = np.flatnonzero((abs(x - qx) <= r) & (abs(y - qy) <= r))
+        assert set(inside) <= set(index.within(qx, qy, r, r))
+
+
+def test_degenerate_inputs():
+    assert GridIndex([], []).nearest(1, 1) is None
+    assert len(GridIndex([], []).within(1, 1, 5, 5)) == 0
+    same = GridIndex([5, 5, 5], [80, 80, 80])
+    assert same.nearest(5, 80, radius=1)[1:] == (0.0, 3)
+    assert same.nearest(9, 80, radius=1) is None
@@ -0,0 +1,109 @@
+import sqlite3
+import time
+
+import pytest
+
+from golf_sync import SYNC_FILE, sync_databases, sync_with_folder
+from helpers import create_db, make_rounds
+
+
+def contents(path):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(conn.execute("SELECT course, date, CAST(cost AS INTEGER), score FROM scores"))
+    finally:
+        conn.close()
+
+
+def uuid_of(path, course, day):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(
+            "SELECT r.uuid FROM sync_rows r JOIN scores s ON s.id = r.round_id WHERE s.course = ? AND s.date = ?",
+            (course, day),
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def edit(path, sql, params=()):
+    time.sleep(0.005)   # modified times are in ms; keep the later edit later
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def other_path(tmp_path):
+    path = tmp_path / "other" / "golf_scores.db"
+    path.parent.mkdir()
+    create_db(str(path), make_rounds(150, seed=2)).close()
+    return str(path)
+
+
+def test_first_sync_merges_both_copies(db_path, other_path, rounds):
+    theirs = contents(other_path)
+
+    report = sync_databases(db_path, other_path)
+
+    assert contents(db_path) == contents(other_path) == sorted(
+        [(c, d, int(cost), s) for c, d, cost, s in rounds] + theirs)
+    assert report.first_sync and report.conflicts == []
+    assert (report.pulled, report.pushed) == (len(theirs), len(rounds))
+
+    again = sync_databases(db_path, other_path)
+    assert (again.differing, again.pulled, again.pushed, again.first_sync) == (0, 0, 0, False)
+
+
+def test_changes_travel_both_ways(db_path, other_path):
+    sync_databases(db_path, other_path)
+    (course, day), (gone_course, gone_day) = contents(db_path)[0][:2], contents(db_path)[-1][:2]
+
+    edit(db_path, "UPDATE scores SET score = 150 WHERE course = ? AND date = ?", (course, day))
+    edit(other_path, "DELETE FROM scores WHERE course = ? AND date = ?", (gone_course, gone_day))
+    edit(other_path, "INSERT INTO scores (course, date, cost, score) VALUES ('New Links', '2025-06-01', 55, 88)")
+    report = sync_databases(db_path, other_path)
+
+    assert contents(db_path) == contents(other_path)
+    assert (course, day, 150) in {(c, d, s) for c, d, _cost, s in contents(other_path)}
+    assert ("New Links", "2025-06-01", 55, 88) in contents(db_path)
+    assert (report.pushed, report.pulled, report.deleted_here, report.conflicts) == (1, 1, 1, [])
+
+
+def test_a_round_changed_in_both_copies_is_a_conflict(db_path, other_path):
+    sync_databases(db_path, other_path)
+    course, day = contents(db_path)[0][:2]
+    uuid = uuid_of(db_path, course, day)
+
+    edit(db_path, "UPDATE scores SET score = 140 WHERE course = ? AND date = ?", (course, day))
+    edit(other_path, "UPDATE scores SET score = 141 WHERE course = ? AND date = ?", (course, day))   # later
+    report = sync_databases(db_path, other_path)
+
+    assert [(u, kept["score"], lost["score"]) for u, kept, lost in report.conflicts] == [(uuid, 141, 140)]
+    assert contents(db_path) == contents(other_path)
+    assert uuid_of(other_path, course, day) == uuid
+
+
+def test_rounds_entered_in_both_copies_are_linked_not_doubled(db_path, other_path):
+    same = ("Twin Oaks", "2024-04-04", 60, 79)
+    for path in (db_path, other_path):
+        edit(path, "INSERT INTO scores (course, date, cost, score) VALUES (?, ?, ?, ?)", same)
+
+    report = sync_databases(db_path, other_path)
+
+    assert report.matched == 1
+    assert contents(db_path).count(same) == 1
+    assert uuid_of(db_path, *same[:2]) == uuid_of(other_path, *same[:2])
+
+
+def test_sync_folder_copy_starts_in_step(db_path, tmp_path):
+    folder = tmp_path / "cloud"
+    folder.mkdir()
+
+    first = sync_with_folder(db_path, str(folder))
+
+    assert contents(str(folder / SYNC_FILE)) == contents(db_path)
+    assert first.differing == 0 and first.conflicts == []